@@ -0,0 +1,81 @@
+"""
+Micro-benchmark of the numeric block of get_dataset_summary.
+
+Compares the vectorized statistics (one 2-D NumPy reduction over all numeric
+columns) with the previous implementation, which called a pandas reduction
+per statistic and column.
+
+Usage (from the backend directory):
+    python benchmarks/bench_dataset_summary.py [rows:columns ...]
+
+The default cases are a wide frame (10^5 rows x 500 columns) and a long one
+(10^7 rows x 4 columns, about 320 MB of float64 values).
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.data_exploration_service import _summarize_numeric_columns
+
+DEFAULT_CASES = [(10 ** 5, 500), (10 ** 7, 4)]
+
+
+def per_column_stats(df: pd.DataFrame, numeric_columns):
+    """The previous implementation: one pandas call per statistic and column."""
+    numeric_stats = {}
+    for col in numeric_columns:
+        stats_dict = {
+            "min": df[col].min(),
+            "max": df[col].max(),
+            "mean": df[col].mean(),
+            "median": df[col].median(),
+            "std": df[col].std(),
+            "p25": df[col].quantile(0.25),
+            "p75": df[col].quantile(0.75),
+        }
+        numeric_stats[col] = {
+            key: float(value) if pd.notna(value) and np.isfinite(value) else None
+            for key, value in stats_dict.items()
+        }
+        numeric_stats[col]["missing"] = int(df[col].isna().sum())
+    return numeric_stats
+
+
+def make_frame(rows: int, columns: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    values = rng.normal(size=(rows, columns))
+    # A few missing values in every other column
+    values[::97, ::2] = np.nan
+    return pd.DataFrame(values, columns=[f"col_{i}" for i in range(columns)])
+
+
+def best_time(func, *args, repeat: int = 3) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(cases):
+    print(f"{'rows':>10} {'columns':>8} {'per-column':>12} {'vectorized':>12} {'speedup':>8}")
+    for rows, columns in cases:
+        df = make_frame(rows, columns)
+        numeric_columns = list(df.columns)
+        repeat = 1 if rows * columns > 10 ** 7 else 3
+        before = best_time(per_column_stats, df, numeric_columns, repeat=repeat)
+        after = best_time(_summarize_numeric_columns, df, numeric_columns, repeat=repeat)
+        print(f"{rows:>10} {columns:>8} {before:>11.3f}s {after:>11.3f}s {before / after:>7.1f}x")
+        del df
+
+
+if __name__ == '__main__':
+    cases = [tuple(int(part) for part in arg.split(':')) for arg in sys.argv[1:]] or DEFAULT_CASES
+    main(cases)
@@ -0,0 +1,115 @@
+"""
+Micro-benchmark of the JSON encoding of large responses.
+
+Compares src.json_encoding.dumps with the previous response path:
+
+- Plotly figures were round-tripped through json.dumps(fig, cls=PlotlyJSONEncoder)
+  and json.loads, then encoded again by Flask's default JSON provider.
+- Exploration results were cleaned with a recursive NaN-to-None walk, then
+  encoded by Flask's default JSON provider.
+
+Usage (from the backend directory):
+    python benchmarks/bench_json_encoding.py [points ...]
+
+The default cases are figures and results of 10^5 and 10^6 points.
+"""
+
+import os
+import sys
+import json
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from plotly.utils import PlotlyJSONEncoder
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.json_encoding import dumps, ORJSON_AVAILABLE
+
+DEFAULT_CASES = [10 ** 5, 10 ** 6]
+
+_flask_provider = DefaultJSONProvider(Flask('bench'))
+
+
+def replace_nan_with_none(obj):
+    """The previous recursive cleanup of exploration results."""
+    if isinstance(obj, dict):
+        return {k: replace_nan_with_none(v) for k, v in obj.items()}
+    elif isinstance(obj, list):
+        return [replace_nan_with_none(elem) for elem in obj]
+    elif isinstance(obj, float) and np.isnan(obj):
+        return None
+    elif pd.isna(obj) and not isinstance(obj, (str, bool, int)):
+        return None
+    return obj
+
+
+def make_figure(points: int):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'when': pd.date_range('2020-01-01', periods=points, freq='min'),
+        'value': rng.normal(size=points),
+        'label': rng.choice(['north', 'south', 'east', 'west'], points)
+    })
+    df.loc[::50, 'value'] = np.nan
+    return px.scatter(df, x='when', y='value', color='label', hover_name='label')
+
+
+def make_result(points: int):
+    rng = np.random.default_rng(0)
+    values = rng.normal(size=points)
+    values[::50] = np.nan
+    labels = [f"category {i}" for i in range(points)]
+    return {
+        "load_message": "benchmark",
+        "visualizations": {
+            "chart1_bar": {"xAxis": {"type": "category", "data": labels},
+                           "series": [{"type": "bar", "data": values.tolist()}]}
+        }
+    }
+
+
+def previous_figure(fig) -> bytes:
+    fig_json = json.loads(json.dumps(fig, cls=PlotlyJSONEncoder))
+    return _flask_provider.dumps(fig_json).encode('utf-8')
+
+
+def current_figure(fig) -> bytes:
+    return dumps(fig.to_plotly_json())
+
+
+def previous_result(result) -> bytes:
+    return _flask_provider.dumps(replace_nan_with_none(result)).encode('utf-8')
+
+
+def best_time(func, *args, repeat: int = 3) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(cases):
+    print(f"encoder: {'orjson' if ORJSON_AVAILABLE else 'json (standard library)'}")
+    print(f"{'payload':>8} {'points':>9} {'previous':>10} {'current':>10} {'speedup':>8}")
+    for points in cases:
+        fig = make_figure(points)
+        before = best_time(previous_figure, fig)
+        after = best_time(current_figure, fig)
+        print(f"{'figure':>8} {points:>9} {before:>9.3f}s {after:>9.3f}s {before / after:>7.1f}x")
+
+        result = make_result(points)
+        before = best_time(previous_result, result)
+        after = best_time(dumps, result)
+        print(f"{'result':>8} {points:>9} {before:>9.3f}s {after:>9.3f}s {before / after:>7.1f}x")
+
+
+if __name__ == '__main__':
+    cases = [int(arg) for arg in sys.argv[1:]] or DEFAULT_CASES
+    main(cases)
@@ -0,0 +1,92 @@
+"""
+Latency benchmark of declarative queries (POST /api/data/query).
+
+Runs representative queries against a synthetic dataset through
+src.query_service.run_query and reports the p50 and p99 latencies of
+repeated runs, once the dataset is loaded and its columns encoded.
+
+Usage (from the backend directory):
+    python benchmarks/bench_query.py [rows]
+
+The default dataset has 10^6 rows.
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.dataset_loader import load_dataframe
+from src.query_service import run_query
+
+DEFAULT_ROWS = 10 ** 6
+
+REPEAT = 50
+
+QUERIES = {
+    "group sum, top 10": {
+        "group_by": ["Provincia"],
+        "aggregations": [{"column": "Impegno", "agg": "sum"}],
+        "sort": [{"column": "sum(Impegno)", "order": "desc"}],
+        "limit": 10
+    },
+    "2 filters, 2 groups": {
+        "filters": [{"column": "Tipo", "op": "==", "value": "a"},
+                    {"column": "Impegno", "op": ">", "value": 1000}],
+        "group_by": ["Provincia", "Anno"],
+        "aggregations": [{"column": "Impegno", "agg": "sum"}, {"column": "Pagato", "agg": "mean"},
+                         {"agg": "count"}]
+    },
+    "in filter, median": {
+        "filters": [{"column": "Provincia", "op": "in", "value": ["P1", "P2"]}],
+        "group_by": ["Tipo"],
+        "aggregations": [{"column": "Pagato", "agg": "max"}, {"column": "Impegno", "agg": "median"}]
+    },
+    "no grouping": {
+        "aggregations": [{"column": "Impegno", "agg": "sum"}]
+    }
+}
+
+
+def make_dataset(rows: int, directory: str) -> str:
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'Provincia': rng.choice([f"P{i}" for i in range(100)], rows),
+        'Tipo': rng.choice(['a', 'b', 'c', 'd'], rows),
+        'Anno': rng.integers(2015, 2025, rows),
+        'Impegno': rng.normal(1000, 100, rows),
+        'Pagato': rng.normal(500, 50, rows)
+    })
+    df.loc[::13, 'Pagato'] = np.nan
+    path = os.path.join(directory, 'bench.csv')
+    df.to_csv(path, index=False)
+    return path
+
+
+def main(rows: int):
+    directory = tempfile.mkdtemp()
+    try:
+        path = make_dataset(rows, directory)
+        load_dataframe(path)
+        print(f"{'query':>22} {'groups':>7} {'p50':>8} {'p99':>8}")
+        for name, query in QUERIES.items():
+            result = run_query(path, query)
+            timings = []
+            for _ in range(REPEAT):
+                start = time.perf_counter()
+                run_query(path, query)
+                timings.append((time.perf_counter() - start) * 1000)
+            p50, p99 = np.percentile(timings, [50, 99])
+            print(f"{name:>22} {result['total_rows']:>7} {p50:>6.1f}ms {p99:>6.1f}ms")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROWS)
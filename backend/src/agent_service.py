@@ -12,6 +12,12 @@ from datetime import datetime # Added missing import
 import traceback
 import requests
 
+# Import the shared dataset loader
+from src.dataset_loader import load_dataframe
+from src.aggregation_cache import aggregate, get_dataset_key
+from src.downsampling import downsample_echarts
+from src.rollup_cube import load_rollup_cube
+from src.profiling_service import wait_for_profile
 # Import Ollama configuration
 from src.ollama_config import OLLAMA_MODELS, get_ollama_config, is_ollama_available
 
@@ -354,105 +360,10 @@ def get_visualization_suggestions(data_path, user_prompt=None, analyst_model_id=
 
         # --- Load Dataset with enhanced flexible format detection ---
         try:
-            # Try different encodings and delimiters
-            df = None
-            error_messages = []
-
-            # First try to determine file type from extension
-            file_extension = os.path.splitext(data_path)[1].lower()
-
-            # Try Excel formats first if extension suggests it
-            if file_extension in ['.xlsx', '.xls', '.xlsm', '.xlsb', '.odf', '.ods', '.odt']:
-                try:
-                    df = pd.read_excel(data_path)
-                    print(f"Successfully loaded Excel file based on extension {file_extension}")
-                except Exception as e:
-                    error_messages.append(f"Failed to load Excel file: {str(e)}")
-
-            # Try JSON if extension suggests it
-            elif file_extension in ['.json']:
-                try:
-                    df = pd.read_json(data_path)
-                    print("Successfully loaded JSON file")
-                except Exception as e:
-                    error_messages.append(f"Failed to load JSON file: {str(e)}")
-
-            # Try Parquet if extension suggests it
-            elif file_extension in ['.parquet']:
-                try:
-                    df = pd.read_parquet(data_path)
-                    print("Successfully loaded Parquet file")
-                except Exception as e:
-                    error_messages.append(f"Failed to load Parquet file: {str(e)}")
-
-            # Try Feather if extension suggests it
-            elif file_extension in ['.feather']:
-                try:
-                    df = pd.read_feather(data_path)
-                    print("Successfully loaded Feather file")
-                except Exception as e:
-                    error_messages.append(f"Failed to load Feather file: {str(e)}")
-
-            # Try HDF5 if extension suggests it
-            elif file_extension in ['.h5', '.hdf5']:
-                try:
-                    df = pd.read_hdf(data_path)
-                    print("Successfully loaded HDF5 file")
-                except Exception as e:
-                    error_messages.append(f"Failed to load HDF5 file: {str(e)}")
-
-            # Try CSV with different encodings and delimiters if still not loaded or for CSV-like extensions
-            if df is None:
-                for encoding in ['latin-1', 'utf-8', 'cp1252', 'iso-8859-1']:
-                    for delimiter in [';', ',', '\t', '|']:
-                        try:
-                            df = pd.read_csv(data_path, encoding=encoding, delimiter=delimiter)
-                            print(f"Successfully loaded CSV with encoding={encoding}, delimiter={delimiter}")
-                            break
-                        except Exception as e:
-                            error_messages.append(f"Failed with encoding={encoding}, delimiter={delimiter}: {str(e)}")
-                            continue
-                    if df is not None:
-                        break
-
-            # If all attempts failed, try one more time with pandas defaults
-            if df is None:
-                try:
-                    df = pd.read_csv(data_path)
-                    print("Successfully loaded CSV with pandas defaults")
-                except Exception as e:
-                    # Try Excel format as a last resort regardless of extension
-                    try:
-                        df = pd.read_excel(data_path)
-                        print("Successfully loaded Excel file as last resort")
-                    except Exception as excel_e:
-                        # If we still can't load the file, raise an error with all the attempts
-                        error_detail = "\n".join(error_messages)
-                        raise ValueError(f"Failed to load dataset with all attempted methods:\n{error_detail}\nExcel attempt: {str(excel_e)}")
-
-            # Auto-detect and convert numeric columns
-            numeric_columns = []
-            for col in df.columns:
-                # Skip columns that are already numeric
-                if pd.api.types.is_numeric_dtype(df[col]):
-                    numeric_columns.append(col)
-                    continue
-
-                # Check if column contains mostly numeric values
-                try:
-                    # Try to convert and count how many values were successfully converted
-                    numeric_series = pd.to_numeric(df[col], errors='coerce')
-                    non_na_count = numeric_series.count()
-                    original_non_na_count = df[col].count()
-
-                    # If at least 70% of values could be converted to numeric, do the conversion
-                    if original_non_na_count > 0 and non_na_count / original_non_na_count >= 0.7:
-                        df[col] = numeric_series
-                        numeric_columns.append(col)
-                        print(f"Converted column '{col}' to numeric type")
-                except:
-                    # Skip columns that cause errors
-                    continue
+            # Shared, cached loader: repeated requests for the same file skip parsing
+            df, load_message = load_dataframe(data_path)
+            print(load_message)
+            numeric_columns = [col for col in df.columns if pd.api.types.is_numeric_dtype(df[col])]
 
             # Get some basic info for the agents
             num_rows = len(df)
@@ -463,8 +374,12 @@ def get_visualization_suggestions(data_path, user_prompt=None, analyst_model_id=
             api_key = os.getenv("GROQ_API_KEY")
             is_groq = use_groq and api_key and api_key != "dummy_key_for_ollama"
 
+            # Prefer the description precomputed by the background profiler after upload
+            profile = wait_for_profile(data_path)
+            if profile is not None:
+                data_sample_for_prompt = profile["prompt_context"]["compact" if is_groq else "detailed"]
             # Limit rows based on model provider
-            if is_groq:
+            elif is_groq:
                 # For Groq, be extremely conservative with tokens
                 data_head = df.head(3).to_string(max_rows=3, max_cols=5)  # Limit to 3 rows and 5 columns for Groq
                 # Create a minimal summary for Groq
@@ -1102,95 +1017,15 @@ Visualization Coder: Create Python code with Plotly."""
 
             # Create enhanced default visualizations based on the dataset with real data
             try:
-                # Try to load the dataset with enhanced flexible format detection
-                df = None
-                error_messages = []
-
-                # First try to determine file type from extension
-                file_extension = os.path.splitext(data_path)[1].lower()
-
-                # Try Excel formats first if extension suggests it
-                if file_extension in ['.xlsx', '.xls', '.xlsm', '.xlsb', '.odf', '.ods', '.odt']:
-                    try:
-                        df = pd.read_excel(data_path)
-                        print(f"Default viz: Successfully loaded Excel file based on extension {file_extension}")
-                    except Exception as e:
-                        error_messages.append(f"Failed to load Excel file: {str(e)}")
-
-                # Try JSON if extension suggests it
-                elif file_extension in ['.json']:
-                    try:
-                        df = pd.read_json(data_path)
-                        print("Default viz: Successfully loaded JSON file")
-                    except Exception as e:
-                        error_messages.append(f"Failed to load JSON file: {str(e)}")
-
-                # Try Parquet if extension suggests it
-                elif file_extension in ['.parquet']:
-                    try:
-                        df = pd.read_parquet(data_path)
-                        print("Default viz: Successfully loaded Parquet file")
-                    except Exception as e:
-                        error_messages.append(f"Failed to load Parquet file: {str(e)}")
-
-                # Try CSV with different encodings and delimiters if still not loaded or for CSV-like extensions
-                if df is None:
-                    for encoding in ['latin-1', 'utf-8', 'cp1252', 'iso-8859-1']:
-                        for delimiter in [';', ',', '\t', '|']:
-                            try:
-                                df = pd.read_csv(data_path, encoding=encoding, delimiter=delimiter)
-                                print(f"Default viz: Successfully loaded CSV with encoding={encoding}, delimiter={delimiter}")
-                                break
-                            except Exception as e:
-                                error_messages.append(f"Failed with encoding={encoding}, delimiter={delimiter}: {str(e)}")
-                                continue
-                        if df is not None:
-                            break
-
-                # If all attempts failed, try with pandas defaults
-                if df is None:
-                    try:
-                        df = pd.read_csv(data_path)
-                        print("Default viz: Successfully loaded CSV with pandas defaults")
-                    except Exception:
-                        try:
-                            df = pd.read_excel(data_path)
-                            print("Default viz: Successfully loaded Excel file as last resort")
-                        except Exception as e:
-                            print(f"Default viz: Failed to load dataset: {str(e)}")
-                            # Create a minimal dataset for testing
-                            df = pd.DataFrame({
-                                'Column1': [1, 2, 3, 4, 5],
-                                'Column2': ['A', 'B', 'C', 'D', 'E']
-                            })
-
-                # Auto-detect numeric columns
-                numeric_columns = []
-                for col in df.columns:
-                    # Skip columns that are already numeric
-                    if pd.api.types.is_numeric_dtype(df[col]):
-                        numeric_columns.append(col)
-                        continue
-
-                    # Check if column contains mostly numeric values
-                    try:
-                        # Try to convert and count how many values were successfully converted
-                        numeric_series = pd.to_numeric(df[col], errors='coerce')
-                        non_na_count = numeric_series.count()
-                        original_non_na_count = df[col].count()
-
-                        # If at least 70% of values could be converted to numeric, do the conversion
-                        if original_non_na_count > 0 and non_na_count / original_non_na_count >= 0.7:
-                            df[col] = numeric_series
-                            numeric_columns.append(col)
-                            print(f"Default viz: Converted column '{col}' to numeric type")
-                    except:
-                        # Skip columns that cause errors
-                        continue
+                # Reuse the frame loaded above (shared with the dataset cache, read-only); the
+                # province and expense-type totals come from the dataset's rollup cube or the
+                # shared aggregation cache, so the overview charts' groupbys are not repeated
+                dataset_key = get_dataset_key(data_path)
+                rollup = load_rollup_cube(data_path)
 
                 # Default visualization 1: Enhanced bar chart of total commitments by province
                 if 'Provincia competente' in df.columns and 'Impegno totale' in df.columns:
-                    province_totals = df.groupby('Provincia competente')['Impegno totale'].sum().reset_index()
+                    province_totals = aggregate(df, dataset_key, 'Provincia competente', ['Impegno totale'], rollup=rollup)
                     province_totals = province_totals.sort_values('Impegno totale', ascending=False)
 
                     # Format numbers for display
@@ -1254,7 +1089,7 @@ Visualization Coder: Create Python code with Plotly."""
 
                 # Default visualization 2: Enhanced pie chart of expense types
                 if 'Tipologia di spesa' in df.columns and 'Impegno totale' in df.columns:
-                    expense_totals = df.groupby('Tipologia di spesa')['Impegno totale'].sum().reset_index()
+                    expense_totals = aggregate(df, dataset_key, 'Tipologia di spesa', ['Impegno totale'], rollup=rollup)
                     expense_totals = expense_totals.sort_values('Impegno totale', ascending=False)
 
                     # Limit to top 8 categories for better visualization
@@ -1321,10 +1156,7 @@ Visualization Coder: Create Python code with Plotly."""
                 # Default visualization 3: Stacked bar chart comparing committed vs paid amounts by province
                 if all(col in df.columns for col in ['Provincia competente', 'Impegno totale', 'Pagato totale']):
                     # Group by province and calculate totals
-                    compare_df = df.groupby('Provincia competente').agg({
-                        'Impegno totale': 'sum',
-                        'Pagato totale': 'sum'
-                    }).reset_index()
+                    compare_df = aggregate(df, dataset_key, 'Provincia competente', ['Impegno totale', 'Pagato totale'], rollup=rollup)
 
                     # Sort by total commitment
                     compare_df = compare_df.sort_values('Impegno totale', ascending=False)
@@ -1444,9 +1276,10 @@ Visualization Coder: Create Python code with Plotly."""
                     if not series.get('data') or not isinstance(series.get('data'), list):
                         series['data'] = []
 
-            # Create the response using the validated ECharts configs
+            # Create the response using the validated ECharts configs, downsampling series above the point budget
             response = {
                 "visualizations": echarts_configs,
+                "downsampling": [downsample_echarts(config) for config in echarts_configs],
                 "code_blocks": [],
                 "outputs": [],
                 "errors": []
@@ -1456,6 +1289,7 @@ Visualization Coder: Create Python code with Plotly."""
             # If Plotly code was executed successfully, prepare the response using Plotly figures
             response = {
                 "visualizations": [r.get('figure', {}) for r in visualization_results if r.get('figure')],
+                "downsampling": [r.get('downsampling') for r in visualization_results if r.get('figure')],
             "code_blocks": [r.get('code', '') for r in visualization_results],
             "outputs": [r.get('output', '') for r in visualization_results],
             "errors": [r.get('error', '') for r in visualization_results]
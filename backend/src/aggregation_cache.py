@@ -0,0 +1,209 @@
+"""
+Aggregation Cache for Agentic Dashboard App.
+
+This module caches group-by aggregations of datasets. The overview charts
+and the agents' default charts mostly group the same category column, so
+their aggregations are computed once, with one multi-column groupby per
+(group column, aggregation) pair, and later requests for any subset of those
+value columns are served from the cached result.
+
+Entries are keyed by the dataset's content hash (or, for files outside the
+upload store, by path, size and modification time), so they never go stale.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from src.dataset_loader import get_cache_key
+from src.rollup_cube import RollupCube
+from src.upload_store import get_dataset_hash
+
+# Maximum number of aggregated frames kept in memory
+AGGREGATION_CACHE_MAX_ENTRIES = int(os.getenv("AGGREGATION_CACHE_MAX_ENTRIES", "256"))
+
+
+class AggregationCache:
+    """
+    Thread-safe LRU cache of aggregated frames.
+
+    Entries are keyed by (dataset key, group column, aggregation) and hold one
+    row per group with every value column aggregated so far; requests for
+    value columns missing from an entry aggregate only those and add them to it.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[Any, str, str], pd.DataFrame]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Tuple[Any, str, str], threading.Lock] = {}
+
+    def get(self, key: Tuple[Any, str, str], value_cols: Sequence[str]) -> Optional[pd.DataFrame]:
+        """Return the cached aggregates of the value columns, or None unless all of them are cached."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or any(col not in entry.columns for col in value_cols):
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def key_lock(self, key: Tuple[Any, str, str]) -> threading.Lock:
+        """Return the lock serializing the aggregation of a key, so concurrent requests compute it once."""
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def cached_columns(self, key: Tuple[Any, str, str]) -> List[str]:
+        """Return the value columns already aggregated for a key."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return list(entry.columns) if entry is not None else []
+
+    def put(self, key: Tuple[Any, str, str], grouped: pd.DataFrame) -> pd.DataFrame:
+        """Store aggregates, adding their columns to those already cached for the key, and return the entry."""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                new_cols = [col for col in grouped.columns if col not in entry.columns]
+                grouped = entry.join(grouped[new_cols], how='outer')
+            self._entries[key] = grouped
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                self._key_locks.pop(evicted, None)
+            return grouped
+
+    def clear(self) -> None:
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._key_locks.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            }
+
+
+_aggregation_cache = AggregationCache(AGGREGATION_CACHE_MAX_ENTRIES)
+
+
+def get_dataset_key(file_path: Optional[str]) -> Optional[Any]:
+    """
+    Return the key identifying a dataset's content in the aggregation cache.
+
+    Args:
+        file_path: Path to the dataset file
+
+    Returns:
+        The content hash of stored uploads, the (path, size, mtime) cache key
+        of other files, or None if the file cannot be identified
+    """
+    if not file_path:
+        return None
+    return get_dataset_hash(file_path) or get_cache_key(file_path)
+
+
+def _group(df: pd.DataFrame, group_col: str, value_cols: List[str], agg: str) -> pd.DataFrame:
+    """Aggregate value columns per observed group, indexed by plain (object) group labels."""
+    grouped = df.groupby(group_col, observed=True)[value_cols].agg(agg)
+    if isinstance(grouped.index.dtype, pd.CategoricalDtype):
+        grouped.index = grouped.index.astype(object)
+    return grouped
+
+
+def aggregate_many(df: pd.DataFrame, dataset_key: Optional[Any],
+                   requests: Sequence[Tuple[str, Sequence[str], str]],
+                   rollup: Optional[RollupCube] = None) -> Dict[Tuple[str, Tuple[str, ...], str], pd.DataFrame]:
+    """
+    Aggregate several (group column, value columns, aggregation) requests of a dataset.
+
+    Requests with the same group column and aggregation are computed together
+    in a single groupby over the union of their value columns; value columns
+    already cached for the dataset are not aggregated again. Requests the
+    dataset's rollup cube covers are read from it without touching the rows.
+
+    Args:
+        df: The dataset's DataFrame
+        dataset_key: Key returned by get_dataset_key, or None to bypass the cache
+        requests: Tuples of (group column, value columns, aggregation such as 'sum')
+        rollup: The dataset's rollup cube (see rollup_cube.load_rollup_cube), if it has one
+
+    Returns:
+        Dictionary mapping (group column, tuple of value columns, aggregation)
+        to a frame with the group column and one aggregated column per value
+        column, one row per group (like groupby(...).agg(...).reset_index())
+    """
+    results = {}
+    needed: "OrderedDict[Tuple[str, str], List[str]]" = OrderedDict()
+    for group_col, value_cols, agg in requests:
+        if rollup is not None and rollup.covers(group_col, value_cols, agg):
+            results[(group_col, tuple(value_cols), agg)] = rollup.frame(group_col, value_cols, agg)
+            continue
+        cols = needed.setdefault((group_col, agg), [])
+        cols.extend(col for col in value_cols if col not in cols)
+
+    grouped_by = {}
+    for (group_col, agg), value_cols in needed.items():
+        if dataset_key is None:
+            grouped_by[(group_col, agg)] = _group(df, group_col, value_cols, agg)
+            continue
+        key = (dataset_key, group_col, agg)
+        # Threads asking for the same aggregation wait for the first one instead of repeating it
+        with _aggregation_cache.key_lock(key):
+            grouped = _aggregation_cache.get(key, value_cols)
+            if grouped is None:
+                cached = _aggregation_cache.cached_columns(key)
+                missing = [col for col in value_cols if col not in cached]
+                grouped = _aggregation_cache.put(key, _group(df, group_col, missing, agg))
+        grouped_by[(group_col, agg)] = grouped
+
+    for group_col, value_cols, agg in requests:
+        if (group_col, tuple(value_cols), agg) in results:
+            continue
+        # Callers get their own copy, so sorting or adding rows never alters the cache
+        frame = grouped_by[(group_col, agg)][list(value_cols)].reset_index()
+        results[(group_col, tuple(value_cols), agg)] = frame
+    return results
+
+
+def aggregate(df: pd.DataFrame, dataset_key: Optional[Any], group_col: str,
+              value_cols: Sequence[str], agg: str = 'sum', rollup: Optional[RollupCube] = None) -> pd.DataFrame:
+    """
+    Aggregate value columns of a dataset per group, using the cache.
+
+    Args:
+        df: The dataset's DataFrame
+        dataset_key: Key returned by get_dataset_key, or None to bypass the cache
+        group_col: Column to group by
+        value_cols: Columns to aggregate
+        agg: Aggregation function name (default 'sum')
+        rollup: The dataset's rollup cube, read instead of the rows when it covers the request
+
+    Returns:
+        Frame with the group column and the aggregated value columns, one row per group
+    """
+    return aggregate_many(df, dataset_key, [(group_col, value_cols, agg)], rollup)[(group_col, tuple(value_cols), agg)]
+
+
+def clear_aggregation_cache() -> None:
+    """Remove every cached aggregation."""
+    _aggregation_cache.clear()
+
+
+def get_aggregation_cache_stats() -> Dict[str, Any]:
+    """Return hit/miss counters of the aggregation cache."""
+    return _aggregation_cache.stats()
@@ -7,6 +7,7 @@ specifically for generating Plotly visualizations.
 
 import os
 import sys
+import ast
 import json
 import traceback
 import contextlib
@@ -20,7 +21,12 @@ import re
 from datetime import datetime
 import uuid
 import tempfile
-from typing import Dict, Any, Tuple, Optional
+from typing import Dict, Any, List, Set, Tuple, Optional
+
+from src.dataset_loader import load_dataframe, load_dataframe_columns, get_dataset_columns, widen_dtypes
+from src.column_index import index_frame
+from src.downsampling import downsample_plotly
+from src.profiling_service import load_column_index
 
 # Maximum execution time in seconds
 MAX_EXECUTION_TIME = 10
@@ -31,6 +37,18 @@ ALLOWED_MODULES = {
     'plotly.express', 'plotly.graph_objects', 'plotly.subplots'
 }
 
+# Attributes through which code can see every column of a frame; using any of
+# them disables column projection
+COLUMN_ENUMERATING_ATTRIBUTES = {
+    'columns', 'dtypes', 'shape', 'select_dtypes', 'describe', 'info', 'keys', 'items',
+    'iterrows', 'itertuples', 'to_dict', 'to_json', 'to_csv', 'to_string', 'to_html',
+    'to_markdown', 'to_records', 'to_numpy', 'values', 'corr', 'cov', 'melt', 'stack',
+    'T', 'transpose', 'query', 'eval', 'filter'
+}
+
+# Plotly Express keywords that name the columns a figure is built from
+PX_COLUMN_KEYWORDS = {'x', 'y', 'names', 'values', 'path', 'dimensions'}
+
 class CodeExecutionError(Exception):
     """Exception raised for errors during code execution."""
     pass
@@ -81,6 +99,192 @@ def sanitize_code(code: str) -> str:
 
     return '\n'.join(sanitized_lines)
 
+def _is_string_literal(node: ast.AST) -> bool:
+    """Check whether a node is a string constant or a list/tuple/set of them."""
+    if isinstance(node, ast.Constant):
+        return isinstance(node.value, str)
+    if isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+        return all(isinstance(elt, ast.Constant) and isinstance(elt.value, str) for elt in node.elts)
+    return False
+
+def _constant_string_names(tree: ast.AST) -> Set[str]:
+    """Return the variables that are only ever bound to string literals (or loop over them)."""
+    static_names, dynamic_names = set(), set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Assign):
+            targets, value = node.targets, node.value
+        elif isinstance(node, (ast.AnnAssign, ast.AugAssign)):
+            targets, value = [node.target], node.value
+        elif isinstance(node, (ast.For, ast.comprehension)):
+            targets, value = [node.target], node.iter
+        else:
+            continue
+        for target in targets:
+            is_static = isinstance(target, ast.Name) and value is not None and _is_string_literal(value)
+            for name in ast.walk(target):
+                if isinstance(name, ast.Name):
+                    (static_names if is_static else dynamic_names).add(name.id)
+    return static_names - dynamic_names
+
+def _is_column_key(key: ast.AST, constant_names: Set[str]) -> bool:
+    """Check whether a subscript key selects columns known before running the code."""
+    if isinstance(key, ast.Constant):
+        return True
+    if isinstance(key, (ast.List, ast.Tuple)):
+        return all(_is_column_key(elt, constant_names) for elt in key.elts)
+    return isinstance(key, ast.Name) and key.id in constant_names
+
+def _is_row_key(key: ast.AST) -> bool:
+    """Check whether a subscript key selects rows: a slice or a boolean mask such as df['Sales'] > 0."""
+    if isinstance(key, (ast.Slice, ast.Compare, ast.BoolOp, ast.BinOp, ast.UnaryOp)):
+        return True
+    # Masks such as df['Region'].isin([...]) or df['Notes'].notna()
+    return isinstance(key, ast.Call) and isinstance(key.func, ast.Attribute)
+
+def _parent(node: ast.AST) -> Optional[ast.AST]:
+    return getattr(node, 'parent', None)
+
+def _is_projectable_df_use(node: ast.AST, parent: Optional[ast.AST], constant_names: Set[str]) -> bool:
+    """
+    Check whether one use of a full-width frame (df, or rows of it) only touches the columns it names.
+
+    Only column-local uses are allowed: selecting named columns (df['Sales'],
+    df.Sales, df.loc[rows, 'Sales'], df.groupby('Region')['Sales']), passing
+    the frame to a Plotly Express call that names its columns, and len(df).
+    Row selections (df[mask], df.loc[mask]) are followed to their own use.
+    Any other method or attribute (df.dropna(), df.mean(), ...) may read every
+    column, so its result would differ on a projected frame.
+    """
+    if isinstance(parent, ast.Subscript) and parent.value is node:
+        if _is_column_key(parent.slice, constant_names):
+            return True
+        return _is_row_key(parent.slice) and _is_projectable_df_use(parent, _parent(parent), constant_names)
+    if isinstance(parent, ast.Attribute) and parent.value is node:
+        grandparent = _parent(parent)
+        if parent.attr == 'loc' and isinstance(grandparent, ast.Subscript) and grandparent.value is parent:
+            key = grandparent.slice
+            if isinstance(key, ast.Tuple) and len(key.elts) == 2:
+                return _is_row_key(key.elts[0]) and _is_column_key(key.elts[1], constant_names)
+            return _is_row_key(key) and _is_projectable_df_use(grandparent, _parent(grandparent), constant_names)
+        if parent.attr == 'groupby' and isinstance(grandparent, ast.Call) and grandparent.func is parent:
+            # Only the selected columns of the groups are aggregated: df.groupby('Region')['Sales']
+            selection = _parent(grandparent)
+            return (all(_is_column_key(arg, constant_names) for arg in grandparent.args)
+                    and all(kw.arg is not None and kw.arg != 'by' or _is_column_key(kw.value, constant_names)
+                            for kw in grandparent.keywords)
+                    and isinstance(selection, ast.Subscript) and selection.value is grandparent
+                    and _is_column_key(selection.slice, constant_names))
+        # df.Sales selects a column; find_referenced_columns records it as a reference
+        return not hasattr(pd.DataFrame, parent.attr)
+    if isinstance(parent, ast.keyword):
+        parent = _parent(parent)
+    if isinstance(parent, ast.Call):
+        func = parent.func
+        if isinstance(func, ast.Name) and func.id == 'len':
+            return True
+        # px.bar(df, x='Region', y='Sales') only reads the named columns
+        if isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name) and func.value.id == 'px':
+            return any(kw.arg in PX_COLUMN_KEYWORDS for kw in parent.keywords)
+    return False
+
+def find_referenced_columns(code: str, columns: List[Any]) -> Optional[List[Any]]:
+    """
+    Statically collect the dataset columns a code snippet refers to.
+
+    Every string literal or attribute name equal to a column name counts as a
+    reference. The analysis gives up (returns None) whenever the code could
+    see the full set of columns: it lists them (df.columns, df.describe(), ...),
+    selects columns with a computed key, hands df to a function other than a
+    Plotly Express call that names its columns, or cannot be parsed.
+
+    Args:
+        code: The sanitized Python code
+        columns: Column names of the dataset
+
+    Returns:
+        The referenced columns in dataset order, or None if the full frame is needed
+    """
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return None
+
+    for node in ast.walk(tree):
+        for child in ast.iter_child_nodes(node):
+            child.parent = node
+    constant_names = _constant_string_names(tree)
+    column_names = {str(col) for col in columns}
+
+    referenced = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Constant) and isinstance(node.value, str):
+            if node.value in column_names:
+                referenced.add(node.value)
+        elif isinstance(node, ast.Attribute):
+            if node.attr in COLUMN_ENUMERATING_ATTRIBUTES:
+                return None
+            if node.attr in column_names:
+                referenced.add(node.attr)
+        elif isinstance(node, ast.Name) and node.id == 'df' and isinstance(node.ctx, ast.Load):
+            if not _is_projectable_df_use(node, getattr(node, 'parent', None), constant_names):
+                return None
+
+    if not referenced:
+        return None
+    return [col for col in columns if str(col) in referenced]
+
+def _load_sandbox_dataframe(data_path: str, columns: Optional[List[Any]]) -> Tuple[pd.DataFrame, str]:
+    """
+    Load the frame exposed to sandboxed code as df.
+
+    The shared loader returns a cached, dtype-compacted frame; the sandbox gets
+    its own copy with plain dtypes so user code can assign values freely and
+    cannot mutate the frame seen by other requests.
+    """
+    if columns is None:
+        df, load_message = load_dataframe(data_path)
+    else:
+        df, load_message = load_dataframe_columns(data_path, columns)
+    return widen_dtypes(df), load_message
+
+def _sandbox_globals(data_path: Optional[str]) -> Dict[str, Any]:
+    """Return a fresh namespace for sandboxed code, without df."""
+    return {
+        'pd': pd,
+        'np': np,
+        'px': px,
+        'go': go,
+        'json': json,
+        'fig': None,  # Will hold the Plotly figure
+        'data_path': data_path,
+    }
+
+def _names_projected_column(error: Exception, projected_columns: List[Any], columns: List[Any]) -> bool:
+    """
+    Check whether an error raised by sandboxed code names a column of the dataset that was not loaded.
+
+    Pandas raises KeyError('Cost') or KeyError("['Cost'] not in index"); Plotly
+    Express raises ValueError("... Expected one of [...] but received: Cost").
+    Errors naming no such column are bugs of the code itself and are not retried.
+    """
+    message = str(error.args[0]) if error.args else ''
+    projected = {str(col) for col in projected_columns}
+    for col in columns:
+        name = str(col)
+        if name in projected:
+            continue
+        if message == name or f"'{name}'" in message or f'"{name}"' in message \
+                or message.rstrip().endswith(f"received: {name}"):
+            return True
+    return False
+
+def _write_dataframe_info(stdout_buffer: io.StringIO, df: pd.DataFrame, load_message: str) -> None:
+    """Write the loading message and df.info() of the sandbox frame for debugging."""
+    stdout_buffer.write(f"{load_message}\n")
+    buffer = io.StringIO()
+    df.info(buf=buffer)
+    stdout_buffer.write(f"DataFrame info:\n{buffer.getvalue()}\n")
+
 def execute_code(code: str, data_path: Optional[str] = None) -> Tuple[Dict[str, Any], str, str]:
     """
     Execute Python code in a secure sandbox and return the Plotly figure.
@@ -103,99 +307,41 @@ def execute_code(code: str, data_path: Optional[str] = None) -> Tuple[Dict[str,
     stderr_buffer = io.StringIO()
 
     # Variables to be exposed in the execution environment
-    execution_vars = {
-        'pd': pd,
-        'np': np,
-        'px': px,
-        'go': go,
-        'json': json,
-        'fig': None,  # Will hold the Plotly figure
-        'data_path': data_path,
-    }
+    execution_vars = _sandbox_globals(data_path)
 
     # Add data loading code if a data path is provided
+    projected_columns = None
+    dataset_columns = []
     if data_path and os.path.exists(data_path):
-        file_extension = os.path.splitext(data_path)[1].lower()
         try:
-            if file_extension == '.csv':
-                # Try different encodings and delimiters
-                for encoding in ['latin-1', 'utf-8', 'cp1252']:
-                    for delimiter in [';', ',', '\t']:
-                        try:
-                            execution_vars['df'] = pd.read_csv(data_path, encoding=encoding, delimiter=delimiter)
-                            # If we got here, the read was successful
-                            stdout_buffer.write(f"Successfully loaded CSV with encoding={encoding}, delimiter={delimiter}\n")
-                            break
-                        except Exception:
-                            continue
-                    if 'df' in execution_vars:
-                        break
-
-                # If all attempts failed, try one more time with pandas defaults
-                if 'df' not in execution_vars:
-                    execution_vars['df'] = pd.read_csv(data_path)
-
-            elif file_extension == '.xlsx':
-                execution_vars['df'] = pd.read_excel(data_path)
-            elif file_extension == '.json':
-                execution_vars['df'] = pd.read_json(data_path)
-            else:
-                # Try to load as CSV anyway
-                try:
-                    execution_vars['df'] = pd.read_csv(data_path)
-                except:
-                    stderr_buffer.write(f"Warning: Unsupported file extension {file_extension}. Tried CSV format but failed.\n")
-
-            # Auto-detect and convert numeric columns
-            if 'df' in execution_vars:
-                # Print dataframe info for debugging
-                buffer = io.StringIO()
-                execution_vars['df'].info(buf=buffer)
-                stdout_buffer.write(f"DataFrame info:\n{buffer.getvalue()}\n")
-
-                # Try to convert all columns that look numeric
-                for col in execution_vars['df'].columns:
-                    # Skip columns that are already numeric
-                    if pd.api.types.is_numeric_dtype(execution_vars['df'][col]):
-                        continue
+            # Only load the columns the code refers to, when they can be determined statically
+            dataset_columns = get_dataset_columns(data_path)
+            projected_columns = find_referenced_columns(sanitized_code, dataset_columns)
+            execution_vars['df'], load_message = _load_sandbox_dataframe(data_path, projected_columns)
+            _write_dataframe_info(stdout_buffer, execution_vars['df'], load_message)
 
-                    # Check if column contains mostly numeric values
-                    try:
-                        # Try to convert and count how many values were successfully converted
-                        numeric_series = pd.to_numeric(execution_vars['df'][col], errors='coerce')
-                        non_na_count = numeric_series.count()
-                        original_non_na_count = execution_vars['df'][col].count()
-
-                        # If at least 70% of values could be converted to numeric, do the conversion
-                        if original_non_na_count > 0 and non_na_count / original_non_na_count >= 0.7:
-                            execution_vars['df'][col] = numeric_series
-                            stdout_buffer.write(f"Converted column '{col}' to numeric type\n")
-                    except:
-                        # Skip columns that cause errors
-                        continue
-
-                # Also try specific columns that might be numeric based on common names
-                common_numeric_columns = [
-                    'Impegno totale', 'Pagato totale', 'amount', 'value', 'price',
-                    'cost', 'revenue', 'sales', 'quantity', 'count', 'total'
-                ]
-
-                for col in execution_vars['df'].columns:
-                    col_lower = col.lower()
-                    if any(numeric_name in col_lower for numeric_name in common_numeric_columns):
-                        try:
-                            execution_vars['df'][col] = pd.to_numeric(execution_vars['df'][col], errors='coerce')
-                            stdout_buffer.write(f"Converted column '{col}' to numeric based on name pattern\n")
-                        except:
-                            stderr_buffer.write(f"Warning: Failed to convert column '{col}' to numeric\n")
         except Exception as e:
+            projected_columns = None
             stderr_buffer.write(f"Warning: Error loading data file: {str(e)}\n{traceback.format_exc()}\n")
 
     try:
         # Redirect stdout and stderr
         with contextlib.redirect_stdout(stdout_buffer), contextlib.redirect_stderr(stderr_buffer):
             # Execute the code
-            exec(sanitized_code, execution_vars)
+            try:
+                exec(sanitized_code, execution_vars)
+            except (KeyError, ValueError) as e:
+                if projected_columns is None or not _names_projected_column(e, projected_columns, dataset_columns):
+                    raise
+                # The static analysis missed a column (pandas raises KeyError, Plotly Express
+                # ValueError): run again from scratch on the full frame
+                for buffer in (stdout_buffer, stderr_buffer):
+                    buffer.seek(0)
+                    buffer.truncate()
+                execution_vars = _sandbox_globals(data_path)
+                execution_vars['df'], load_message = _load_sandbox_dataframe(data_path, None)
+                _write_dataframe_info(stdout_buffer, execution_vars['df'], load_message)
+                exec(sanitized_code, execution_vars)
 
         # Get the output
         stdout = stdout_buffer.getvalue()
@@ -224,8 +370,13 @@ def execute_code(code: str, data_path: Optional[str] = None) -> Tuple[Dict[str,
                             financial_cols = [col for col in available_columns if 'Previsioni risultanti' in col or 'Variazioni proposte' in col]
                             stderr = f"Columns not found for '{missing_column}'. Try using financial columns like: {', '.join(financial_cols[:3])}"
                         else:
-                            # Provide a general list of available columns
-                            stderr = f"Columns not found for '{missing_column}'. Available columns include: {', '.join(available_columns[:5])}"
+                            # Suggest similar columns from the dataset's column index, then list the others
+                            index = (load_column_index(data_path) if data_path else None) or index_frame(df)
+                            suggestions = index.suggest(missing_column)
+                            stderr = f"Columns not found for '{missing_column}'."
+                            if suggestions:
+                                stderr += f" Did you mean {', '.join(repr(col) for col in suggestions)}?"
+                            stderr += f" Available columns include: {', '.join(str(col) for col in available_columns[:5])}"
                             if len(available_columns) > 5:
                                 stderr += f" and {len(available_columns) - 5} more."
 
@@ -244,9 +395,12 @@ def execute_code(code: str, data_path: Optional[str] = None) -> Tuple[Dict[str,
         if fig is None:
             return {}, stdout, "No Plotly figure was created. Make sure to assign your figure to a variable named 'fig'."
 
-        # Convert the figure to JSON
+        # Convert the figure to a dict; NumPy arrays and dates in it are encoded with the response
         try:
-            fig_json = json.loads(json.dumps(fig, cls=PlotlyJSONEncoder))
+            if hasattr(fig, 'to_plotly_json'):
+                fig_json = fig.to_plotly_json()
+            else:
+                fig_json = json.loads(json.dumps(fig, cls=PlotlyJSONEncoder))
             return fig_json, stdout, stderr
         except Exception as json_err:
             # Handle JSON serialization errors
@@ -272,6 +426,8 @@ def execute_plotly_code(code: str, data_path: Optional[str] = None) -> Dict[str,
         - 'output': The output of the code execution
         - 'error': Any error messages
         - 'code': The sanitized code that was executed
+        - 'downsampling': Present when traces above DOWNSAMPLE_MAX_POINTS were
+          downsampled; their original and kept point counts
     """
     try:
         # Fix common string formatting issues in the code
@@ -387,8 +543,8 @@ def execute_plotly_code(code: str, data_path: Optional[str] = None) -> Dict[str,
                 # Create a more helpful error message with available columns
                 if 'df' in locals() and data_path and os.path.exists(data_path):
                     try:
-                        # Try to load the dataframe to get column names
-                        temp_df = pd.read_csv(data_path)
+                        # Get the column names from the shared (cached) loader
+                        temp_df, _ = load_dataframe(data_path)
                         available_columns = list(temp_df.columns)
                         # Format a helpful error message with available columns
                         stderr = f"Columns not found for '{missing_column}'. Available columns are: {', '.join(available_columns[:10])}"
@@ -508,13 +664,17 @@ def execute_plotly_code(code: str, data_path: Optional[str] = None) -> Dict[str,
                     # Get the first non-None group (the column name)
                     missing_column = next((g for g in column_match.groups() if g is not None), "")
                     
-                    # Try to load the dataframe to get column names for better error message
+                    # Use the dataset's column index (or the dataframe) for a better error message
                     if data_path and os.path.exists(data_path):
                         try:
-                            temp_df = pd.read_csv(data_path)
-                            available_columns = list(temp_df.columns)
-                            # Format a helpful error message with available columns
-                            stderr = f"Columns not found for '{missing_column}'. Available columns include: {', '.join(available_columns[:5])}"
+                            index = load_column_index(data_path) or index_frame(load_dataframe(data_path)[0])
+                            available_columns = index.columns
+                            suggestions = index.suggest(missing_column)
+                            # Format a helpful error message with similar and available columns
+                            stderr = f"Columns not found for '{missing_column}'."
+                            if suggestions:
+                                stderr += f" Did you mean {', '.join(repr(col) for col in suggestions)}?"
+                            stderr += f" Available columns include: {', '.join(str(col) for col in available_columns[:5])}"
                             if len(available_columns) > 5:
                                 stderr += f" and {len(available_columns) - 5} more."
                         except Exception:
@@ -529,6 +689,11 @@ def execute_plotly_code(code: str, data_path: Optional[str] = None) -> Dict[str,
             'code': sanitized_code
         }
 
+        # Traces with more points than the browser can draw smoothly are downsampled
+        downsampling = downsample_plotly(fig_json) if fig_json else None
+        if downsampling:
+            response['downsampling'] = downsampling
+
         return response
     except Exception as e:
         # Catch any unexpected errors in our error handling code
@@ -0,0 +1,248 @@
+"""
+Column Index for Agentic Dashboard App.
+
+This module builds a per-dataset index of column profiles: normalized name
+tokens, semantic role, dtype, cardinality, null ratio and numeric range. The
+index is built once, from a dataset summary or a DataFrame, and stored in the
+dataset profile; choosing chart columns by name hints, describing the
+columns to the agents and suggesting columns for a misspelled name are then
+dictionary lookups instead of scans over hint lists and columns.
+
+Name hints match the start of a name token, so 'total' matches
+'Impegno totale' and 'value' matches 'Value1' or 'TotalValue'.
+"""
+
+import re
+import difflib
+import unicodedata
+from typing import Dict, Any, Iterable, List, Optional
+
+import pandas as pd
+
+# Label columns with fewer distinct values than this are preferred as chart categories
+MAX_CATEGORY_VALUES = 50
+
+# Label columns whose non-null values are at least this share distinct hold identifiers or free text
+IDENTIFIER_UNIQUE_RATIO = 0.9
+
+# Name tokens marking numeric columns as identifiers rather than measures
+IDENTIFIER_TOKENS = {'id', 'code', 'codice', 'cod', 'key', 'uuid'}
+
+_TOKEN_PATTERN = re.compile(r'[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|[0-9]+')
+
+_LABEL_DTYPES = {'object', 'category', 'string', 'str'}
+
+
+def tokenize(name: Any) -> List[str]:
+    """Split a column name into lowercase, accent-free word and number tokens."""
+    text = unicodedata.normalize('NFKD', str(name))
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return [token.lower() for token in _TOKEN_PATTERN.findall(text)]
+
+
+def classify_columns(df: pd.DataFrame) -> Dict[str, str]:
+    """Classify every column as "numeric", "datetime" or "categorical"."""
+    column_types = {}
+    for col in df.columns:
+        if pd.api.types.is_numeric_dtype(df[col]):
+            column_types[col] = "numeric"
+        elif pd.api.types.is_datetime64_dtype(df[col]):
+            column_types[col] = "datetime"
+        else:
+            column_types[col] = "categorical"
+    return column_types
+
+
+def is_label_column(series: pd.Series) -> bool:
+    """Check whether a column holds labels (object strings or a pandas categorical)."""
+    return pd.api.types.is_object_dtype(series) or isinstance(series.dtype, pd.CategoricalDtype)
+
+
+def _role(kind: str, labels: bool, tokens: List[str], unique_values: Optional[int], non_null: int) -> str:
+    if kind == "numeric":
+        return "identifier" if IDENTIFIER_TOKENS.intersection(tokens) else "measure"
+    if kind == "datetime":
+        return "time"
+    if not labels:
+        return "other"
+    if unique_values is not None and unique_values >= MAX_CATEGORY_VALUES \
+            and unique_values >= IDENTIFIER_UNIQUE_RATIO * non_null:
+        return "identifier"
+    return "dimension"
+
+
+class ColumnIndex:
+    """
+    Column profiles of a dataset, in column order, with lookups by name token.
+
+    Every profile holds the column 'name', its 'tokens', 'kind' (as in the
+    dataset summary), 'dtype', whether it holds 'labels', its 'role'
+    ("dimension", "measure", "time", "identifier" or "other"),
+    'unique_values' (known for label columns), 'null_ratio' (None when
+    unknown) and, for numeric columns, 'min' and 'max'.
+    """
+
+    def __init__(self, profiles: List[Dict[str, Any]]):
+        self.profiles = {profile["name"]: profile for profile in profiles}
+        # Every prefix of every token -> columns having it, in column order
+        self._prefixes: Dict[str, List[str]] = {}
+        for profile in profiles:
+            for token in profile["tokens"]:
+                for end in range(1, len(token) + 1):
+                    columns = self._prefixes.setdefault(token[:end], [])
+                    if not columns or columns[-1] != profile["name"]:
+                        columns.append(profile["name"])
+        self._by_normalized_name = {' '.join(profile["tokens"]): profile["name"] for profile in profiles}
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self.profiles)
+
+    def columns_with(self, **criteria: Any) -> List[str]:
+        """Return the columns whose profile has all the given values, e.g. columns_with(kind="numeric")."""
+        return [name for name, profile in self.profiles.items()
+                if all(profile.get(key) == value for key, value in criteria.items())]
+
+    def find(self, hints: Iterable[str], candidates: Iterable[str]) -> Optional[str]:
+        """
+        Find a column by name hints.
+
+        Args:
+            hints: Lowercase hints in order of preference
+            candidates: Columns that may be returned
+
+        Returns:
+            The first candidate (in column order) matching the first hint that
+            matches any candidate, or None
+        """
+        candidates = set(candidates)
+        for hint in hints:
+            for name in self._prefixes.get(hint, ()):
+                if name in candidates:
+                    return name
+        return None
+
+    def suggest(self, name: str, limit: int = 3) -> List[str]:
+        """
+        Suggest existing columns for a column name that does not exist.
+
+        Columns sharing name tokens rank first, then columns with similar names.
+
+        Args:
+            name: The unknown column name
+            limit: Maximum number of suggestions
+
+        Returns:
+            Up to limit column names, best match first
+        """
+        tokens = tokenize(name)
+        scores: Dict[str, float] = {}
+        for token in tokens:
+            for column in self._prefixes.get(token, ()):
+                scores[column] = scores.get(column, 0) + 1
+        close = difflib.get_close_matches(' '.join(tokens), list(self._by_normalized_name), n=limit, cutoff=0.6)
+        for rank, normalized in enumerate(close):
+            column = self._by_normalized_name[normalized]
+            scores[column] = scores.get(column, 0) + 1 - rank / (limit + 1)
+        order = {column: position for position, column in enumerate(self.profiles)}
+        ranked = sorted(scores, key=lambda column: (-scores[column], order[column]))
+        return ranked[:limit]
+
+    def describe(self, max_columns: int = 8) -> str:
+        """Describe the columns by role in a few lines, for the agents' prompts."""
+        lines = []
+        for role, title in [("dimension", "Category columns"), ("measure", "Measure columns"),
+                            ("time", "Date columns"), ("identifier", "Identifier columns")]:
+            names = self.columns_with(role=role)
+            if names:
+                suffix = "... (truncated)" if len(names) > max_columns else ""
+                lines.append(f"{title}: {names[:max_columns]}{suffix}")
+        return "\n".join(lines)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"profiles": list(self.profiles.values())}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ColumnIndex':
+        return cls(data["profiles"])
+
+
+def _profile(name: Any, kind: str, dtype: str, labels: bool, num_rows: int, missing: Optional[int],
+             unique_values: Optional[int] = None, minimum: Optional[float] = None,
+             maximum: Optional[float] = None) -> Dict[str, Any]:
+    tokens = tokenize(name)
+    profile = {
+        "name": name,
+        "tokens": tokens,
+        "kind": kind,
+        "dtype": dtype,
+        "labels": labels,
+        "role": _role(kind, labels, tokens, unique_values, num_rows - (missing or 0)),
+        "unique_values": unique_values,
+        "null_ratio": (missing / num_rows if num_rows else 0.0) if missing is not None else None
+    }
+    if kind == "numeric":
+        profile["min"] = minimum
+        profile["max"] = maximum
+    return profile
+
+
+def build_column_index(summary: Dict[str, Any], dtypes: Optional[Dict[Any, Any]] = None) -> ColumnIndex:
+    """
+    Build the column index of a dataset from its summary.
+
+    Args:
+        summary: Summary returned by get_dataset_summary (or a streaming summary)
+        dtypes: Optional dtype of every column; without it categorical
+            columns are taken to hold labels
+
+    Returns:
+        The ColumnIndex of the dataset
+    """
+    num_rows = summary.get("num_rows", 0)
+    numeric_stats = summary.get("numeric_stats", {})
+    categorical_stats = summary.get("categorical_stats", {})
+    profiles = []
+    column_types = summary.get("column_types") or {}
+    numeric_columns = set(summary.get("numeric_columns", []))
+    date_columns = set(summary.get("date_columns", []))
+    for col in summary.get("columns", []):
+        kind = column_types.get(col) or (
+            "numeric" if col in numeric_columns else "datetime" if col in date_columns else "categorical")
+        dtype = str(dtypes[col]) if dtypes is not None and col in dtypes else kind
+        labels = dtype in _LABEL_DTYPES if dtypes is not None else kind == "categorical"
+        stats = numeric_stats.get(col) or categorical_stats.get(col) or {}
+        profiles.append(_profile(
+            col, kind, dtype, labels, num_rows, stats.get("missing"),
+            unique_values=stats.get("unique_values"), minimum=stats.get("min"), maximum=stats.get("max")))
+    return ColumnIndex(profiles)
+
+
+def index_frame(df: pd.DataFrame) -> ColumnIndex:
+    """
+    Build the column index of a DataFrame that has not been summarized.
+
+    Distinct values are counted for label columns only.
+
+    Args:
+        df: The DataFrame (or a representative first chunk of a dataset)
+
+    Returns:
+        The ColumnIndex of the DataFrame
+    """
+    column_types = classify_columns(df)
+    num_rows = len(df)
+    missing = df.isna().sum()
+    numeric = [col for col in df.columns if column_types[col] == "numeric"]
+    minimum = df[numeric].min() if numeric else pd.Series(dtype=float)
+    maximum = df[numeric].max() if numeric else pd.Series(dtype=float)
+    profiles = []
+    for col in df.columns:
+        labels = is_label_column(df[col])
+        unique_values = int(df[col].nunique()) if labels else None
+        profiles.append(_profile(
+            col, column_types[col], str(df[col].dtype), labels, num_rows, int(missing[col]),
+            unique_values=unique_values,
+            minimum=float(minimum[col]) if col in minimum and pd.notna(minimum[col]) else None,
+            maximum=float(maximum[col]) if col in maximum and pd.notna(maximum[col]) else None))
+    return ColumnIndex(profiles)
@@ -0,0 +1,370 @@
+"""
+Column Overview for Agentic Dashboard App.
+
+This module describes the distribution of every column of a dataset at once:
+a fixed-bin histogram of each numeric column and the most frequent values of
+each categorical column, each with a compact ECharts mini-chart, so the
+dashboard can show them all without asking the agents for one histogram at
+a time.
+
+Numeric columns are binned together: their values are converted to one 2-D
+float array (in blocks bounded by NUMERIC_STATS_BLOCK_BYTES), every value is
+mapped to a bin of its column with array arithmetic, and the bins of all
+columns are counted with a single np.bincount. Categorical columns are
+counted through their integer codes in the same pass over the rows. Files
+summarized in streaming mode are binned chunk by chunk over the ranges of
+their stored profile, and their top values come from Space-Saving sketches.
+
+The overview is stored next to the dataset and cached in memory until the
+file changes.
+"""
+
+import os
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.column_index import classify_columns
+from src.data_exploration_service import NUMERIC_STATS_BLOCK_BYTES
+from src.dataset_loader import load_dataframe
+from src.json_encoding import dumps
+from src.profiling_service import load_profile
+from src.sketches import SpaceSaving
+from src.streaming_summary import should_stream, iter_typed_chunks
+from src.upload_store import get_artifact_path
+
+# Number of histogram bins of numeric columns; integer columns with fewer
+# distinct values in their range get one bin per value
+COLUMN_OVERVIEW_BINS = int(os.getenv("COLUMN_OVERVIEW_BINS", "20"))
+
+# Number of most frequent values reported per categorical column
+COLUMN_OVERVIEW_TOP_K = int(os.getenv("COLUMN_OVERVIEW_TOP_K", "10"))
+
+# Name of the overview artifact stored with each dataset
+OVERVIEW_ARTIFACT_NAME = 'column_overview.json'
+
+# Bumped whenever the overview layout changes, so older overviews are recomputed
+OVERVIEW_VERSION = 1
+
+# Number of loaded overviews kept in memory
+_LOADED_MAX_ENTRIES = 16
+
+
+def _bin_layout(minimum: np.ndarray, maximum: np.ndarray, integer: np.ndarray,
+                bins: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Choose the bins of numeric columns from their ranges.
+
+    Returns:
+        Arrays of the lower edge, bin width and number of bins of each column
+        (no bins for columns without values)
+    """
+    empty = ~np.isfinite(minimum) | ~np.isfinite(maximum)
+    minimum = np.where(empty, 0.0, minimum)
+    maximum = np.where(empty, 0.0, maximum)
+    # Small integer ranges get one bin per value, centered on it
+    per_value = integer & (maximum - minimum + 1 <= bins)
+    count = np.where(per_value, maximum - minimum + 1, np.where(maximum > minimum, bins, 1))
+    lower = np.where(per_value, minimum - 0.5, minimum)
+    width = np.where(per_value, 1.0, np.where(maximum > minimum, (maximum - minimum) / bins, 1.0))
+    return lower, width, np.where(empty, 0, count).astype(np.int64)
+
+
+def _histogram_counts(values: np.ndarray, lower: np.ndarray, width: np.ndarray, count: np.ndarray,
+                      bins: int) -> np.ndarray:
+    """
+    Count the values of several columns into their bins at once.
+
+    Args:
+        values: One row of values per column (modified in place)
+        lower, width, count: Bin layout of each column, see _bin_layout
+        bins: Maximum number of bins of a column
+
+    Returns:
+        Array of shape (number of columns, bins + 1) whose last column counts
+        the values that are missing or outside the layout's range
+    """
+    missing = ~np.isfinite(values)
+    values -= lower[:, None]
+    values /= width[:, None]
+    np.floor(values, out=values)
+    # The maximum falls on the upper edge of the last bin
+    outside = missing | (values < 0) | (values > count[:, None])
+    np.minimum(values, (count - 1)[:, None], out=values)
+    values[outside] = bins
+    slots = values.astype(np.int64)
+    slots += (np.arange(len(values)) * (bins + 1))[:, None]
+    return np.bincount(slots.ravel(), minlength=len(values) * (bins + 1)).reshape(len(values), bins + 1)
+
+
+def _label_counts(series: pd.Series, keep: int) -> Tuple[pd.Series, int]:
+    """
+    Count the values of a label column through its integer codes.
+
+    Returns:
+        The counts of (at most) the keep most frequent values, and the number
+        of non-missing values
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes, uniques = series.cat.codes.to_numpy(), series.cat.categories
+    else:
+        codes, uniques = pd.factorize(series)
+    counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+    non_null = int(counts.sum())
+    if len(counts) > keep:
+        kept = np.argpartition(counts, len(counts) - keep)[len(counts) - keep:]
+        counts, uniques = counts[kept], uniques[kept]
+    return pd.Series(counts, index=pd.Index(uniques, dtype=object).astype(str)), non_null
+
+
+def _value_range(series: pd.Series) -> Tuple[Optional[float], Optional[float]]:
+    """Return the smallest and largest finite values of a numeric column."""
+    array = series.to_numpy() if series.dtype.kind == 'f' else series.to_numpy(dtype=float, na_value=np.nan)
+    if not len(array):
+        return None, None
+    low, high = np.fmin.reduce(array), np.fmax.reduce(array)
+    if np.isinf(low) or np.isinf(high):
+        array = array[np.isfinite(array)]
+        if not len(array):
+            return None, None
+        low, high = array.min(), array.max()
+    return (None, None) if np.isnan(low) else (float(low), float(high))
+
+
+class ColumnOverviewBuilder:
+    """
+    Accumulate the histograms and top values of a dataset's columns over one or more chunks.
+
+    The bins of numeric columns are fixed up front from their ranges, so the
+    counts of successive chunks simply add up.
+    """
+
+    def __init__(self, column_types: Dict[Any, str], ranges: Dict[Any, Tuple[Optional[float], Optional[float]]],
+                 integer_columns: Iterable[Any], bins: Optional[int] = None):
+        self.bins = bins or COLUMN_OVERVIEW_BINS
+        self.numeric = [col for col, kind in column_types.items() if kind == "numeric"]
+        self.categorical = [col for col, kind in column_types.items() if kind == "categorical"]
+        self.column_order = list(column_types)
+        self.num_rows = 0
+        bounds = np.array([[np.nan if value is None else value for value in ranges.get(col, (None, None))]
+                           for col in self.numeric], dtype=float).reshape(len(self.numeric), 2)
+        integer = np.array([col in set(integer_columns) for col in self.numeric], dtype=bool)
+        self.lower, self.width, self.count = _bin_layout(bounds[:, 0], bounds[:, 1], integer, self.bins)
+        self.histograms = np.zeros((len(self.numeric), self.bins + 1), dtype=np.int64)
+        self.missing = {col: 0 for col in self.categorical}
+        self.top_values = {col: SpaceSaving() for col in self.categorical}
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        """Add the rows of one chunk (or of a whole DataFrame)."""
+        self.num_rows += len(chunk)
+        block_columns = max(1, NUMERIC_STATS_BLOCK_BYTES // max(8 * len(chunk), 1))
+        for start in range(0, len(self.numeric), block_columns):
+            columns = self.numeric[start:start + block_columns]
+            # One row per column, so every step reads contiguous memory
+            values = np.array(chunk[columns].to_numpy(dtype=float, na_value=np.nan).T, order='C')
+            rows = slice(start, start + len(columns))
+            self.histograms[rows] += _histogram_counts(values, self.lower[rows], self.width[rows],
+                                                       self.count[rows], self.bins)
+        for col in self.categorical:
+            sketch = self.top_values[col]
+            # One more value than the sketch tracks still sets its floor exactly
+            counts, non_null = _label_counts(chunk[col], sketch.capacity + 1)
+            self.missing[col] += len(chunk) - non_null
+            sketch.update_counts(counts)
+
+    def result(self, top_k: Optional[int] = None) -> Dict[str, Any]:
+        """Return the overview of every column, with its mini-chart."""
+        top_k = top_k or COLUMN_OVERVIEW_TOP_K
+        columns = {}
+        for position, col in enumerate(self.numeric):
+            count = int(self.count[position])
+            edges = self.lower[position] + self.width[position] * np.arange(count + 1)
+            counts = self.histograms[position, :count]
+            columns[col] = {
+                "kind": "numeric",
+                "edges": edges.tolist(),
+                "counts": counts.tolist(),
+                "missing": int(self.histograms[position, self.bins]),
+                "chart": _mini_chart(col, [f"{edges[i]:.4g} – {edges[i + 1]:.4g}" for i in range(count)],
+                                     counts.tolist(), histogram=True)
+            }
+        for col in self.categorical:
+            sketch = self.top_values[col]
+            top = sketch.top(top_k)
+            non_null = self.num_rows - self.missing[col]
+            columns[col] = {
+                "kind": "categorical",
+                "top_values": top,
+                # Counts are upper bounds once values were dropped from the sketch between chunks
+                "approximate": bool((sketch.errors.reindex(list(top)) > 0).any()),
+                "other": max(non_null - sum(top.values()), 0),
+                "missing": self.missing[col],
+                "chart": _mini_chart(col, list(top), list(top.values()), histogram=False)
+            }
+        return {
+            "num_rows": self.num_rows,
+            "bins": self.bins,
+            "top_k": top_k,
+            "columns": {col: columns[col] for col in self.column_order if col in columns}
+        }
+
+
+def _mini_chart(name: Any, labels: List[str], counts: List[int], histogram: bool) -> Dict[str, Any]:
+    """Build a small axis-less ECharts bar chart; labels are shown in the tooltip."""
+    return {
+        "grid": {"left": 2, "right": 2, "top": 2, "bottom": 2},
+        "tooltip": {"trigger": "axis", "confine": True},
+        "xAxis": {"type": "category", "data": labels, "show": False},
+        "yAxis": {"type": "value", "show": False},
+        "series": [{
+            "name": str(name),
+            "type": "bar",
+            "data": counts,
+            # Adjacent bins touch, as in a histogram
+            "barCategoryGap": "1%" if histogram else "20%",
+            "itemStyle": {"color": "#5470c6"}
+        }]
+    }
+
+
+def _integer_columns(df: pd.DataFrame) -> List[Any]:
+    return [col for col in df.columns if df[col].dtype.kind in 'iub' or pd.api.types.is_integer_dtype(df[col])]
+
+
+def compute_column_overview(df: pd.DataFrame, bins: Optional[int] = None,
+                            top_k: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Compute the histograms and top values of every column of a DataFrame.
+
+    Args:
+        df: The DataFrame to describe
+        bins: Number of histogram bins (default COLUMN_OVERVIEW_BINS)
+        top_k: Number of top values (default COLUMN_OVERVIEW_TOP_K)
+
+    Returns:
+        Dictionary with 'num_rows', 'bins', 'top_k' and the overview of each
+        numeric and categorical column in 'columns'
+    """
+    column_types = classify_columns(df)
+    ranges = {col: _value_range(df[col]) for col, kind in column_types.items() if kind == "numeric"}
+    builder = ColumnOverviewBuilder(column_types, ranges, _integer_columns(df), bins)
+    builder.update(df)
+    return builder.result(top_k)
+
+
+def _stream_column_overview(file_path: str) -> Dict[str, Any]:
+    """Build the overview of a file summarized in streaming mode, chunk by chunk."""
+    profile = load_profile(file_path)
+    summary = profile["exploration"]["summary"] if profile is not None else None
+    chunks = iter_typed_chunks(file_path)
+    first = next(chunks)
+    column_types = classify_columns(first)
+    if summary is not None:
+        stats = summary.get("numeric_stats", {})
+        ranges = {col: (stats.get(col, {}).get("min"), stats.get(col, {}).get("max")) for col in column_types}
+    else:
+        # Without a profile the ranges need a pass of their own
+        ranges = {}
+        for chunk in iter_typed_chunks(file_path):
+            for col, kind in column_types.items():
+                if kind == "numeric":
+                    bounds = [bound for bound in (ranges.get(col), _value_range(chunk[col]))
+                              if bound is not None and bound[0] is not None]
+                    ranges[col] = (min(low for low, _ in bounds), max(high for _, high in bounds)) \
+                        if bounds else (None, None)
+    builder = ColumnOverviewBuilder(column_types, ranges, _integer_columns(first))
+    builder.update(first)
+    for chunk in chunks:
+        builder.update(chunk)
+    return builder.result()
+
+
+def _source_signature(file_path: str) -> Dict[str, int]:
+    stat = os.stat(file_path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def get_overview_path(file_path: str) -> str:
+    """Return the path of the stored column overview of a dataset."""
+    return get_artifact_path(file_path, OVERVIEW_ARTIFACT_NAME)
+
+
+_loaded: "OrderedDict[str, Tuple[Dict[str, int], Dict[str, Any]]]" = OrderedDict()
+_loaded_lock = threading.Lock()
+
+
+def _remember(key: str, signature: Dict[str, int], overview: Dict[str, Any]) -> None:
+    with _loaded_lock:
+        _loaded[key] = (signature, overview)
+        _loaded.move_to_end(key)
+        while len(_loaded) > _LOADED_MAX_ENTRIES:
+            _loaded.popitem(last=False)
+
+
+def load_column_overview(file_path: str) -> Optional[Dict[str, Any]]:
+    """
+    Return the stored column overview of a dataset if it matches the current file.
+
+    Args:
+        file_path: Path to the dataset file
+
+    Returns:
+        The overview, or None if it is missing, outdated or unreadable
+    """
+    try:
+        signature = _source_signature(file_path)
+    except OSError:
+        return None
+    key = os.path.abspath(file_path)
+    with _loaded_lock:
+        entry = _loaded.get(key)
+        if entry is not None and entry[0] == signature:
+            _loaded.move_to_end(key)
+            return entry[1]
+    try:
+        with open(get_overview_path(file_path)) as f:
+            stored = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if stored.get("version") != OVERVIEW_VERSION or stored.get("source") != signature:
+        return None
+    _remember(key, signature, stored["overview"])
+    return stored["overview"]
+
+
+def get_column_overview(file_path: str) -> Dict[str, Any]:
+    """
+    Return the column overview of a dataset, computing and storing it if it is missing or outdated.
+
+    Args:
+        file_path: Path to the dataset file
+
+    Returns:
+        The overview of the current file (see compute_column_overview)
+    """
+    overview = load_column_overview(file_path)
+    if overview is not None:
+        return overview
+    signature = _source_signature(file_path)
+    if should_stream(file_path):
+        overview = _stream_column_overview(file_path)
+    else:
+        df, _ = load_dataframe(file_path)
+        overview = compute_column_overview(df)
+    # Round-trip through the JSON encoding, so cached and stored overviews are identical
+    encoded = dumps({"version": OVERVIEW_VERSION, "source": signature, "overview": overview})
+    overview_path = get_overview_path(file_path)
+    temp_path = f"{overview_path}.tmp-{os.getpid()}-{threading.get_ident()}"
+    try:
+        with open(temp_path, 'wb') as f:
+            f.write(encoded)
+        os.replace(temp_path, overview_path)
+    except OSError as e:
+        print(f"Could not store the column overview of {file_path}: {str(e)}")
+    overview = json.loads(encoded)["overview"]
+    _remember(os.path.abspath(file_path), signature, overview)
+    return overview
@@ -0,0 +1,271 @@
+"""
+Correlation Engine for Agentic Dashboard App.
+
+This module computes the Pearson and Spearman correlation matrices of all
+numeric columns of a dataset, with pairwise handling of missing values as in
+pandas' DataFrame.corr: each pair of columns is correlated over the rows
+where both have a value.
+
+Instead of one pass per pair, the pairwise sums of all columns are
+accumulated with a few matrix products over blocks of rows: the products of
+the value and presence matrices give, for every pair at once, the number of
+complete rows and the sums, sums of squares and cross products over them.
+Spearman correlations are Pearson correlations of average ranks; columns are
+ranked once, and only pairs whose missing rows differ are re-ranked over
+their complete rows.
+
+The matrices are computed once per dataset and method, stored next to the
+dataset and cached in memory until the file changes; prompts asking for
+correlations are answered from them without the agents (see
+data_exploration_service.get_correlation_visualization).
+"""
+
+import os
+import re
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.column_index import classify_columns
+from src.dataset_loader import get_dataset_schema, load_dataframe_columns
+from src.json_encoding import dumps
+from src.upload_store import get_artifact_path
+
+# Supported correlation methods
+CORRELATION_METHODS = ('pearson', 'spearman')
+
+# Upper bound on the memory of the row blocks the pairwise sums are accumulated over
+CORRELATION_BLOCK_BYTES = 64 * 1024 * 1024
+
+# Name of the correlation artifact stored with each dataset
+CORRELATION_ARTIFACT_NAME = 'correlations.json'
+
+# Bumped whenever the stored layout changes, so older matrices are recomputed
+CORRELATION_VERSION = 1
+
+# Number of datasets whose matrices are kept in memory
+_LOADED_MAX_ENTRIES = 16
+
+# Prompts asking for correlations; scatter plots of a pair are left to the agents
+_CORRELATION_PROMPT = re.compile(r'correla|\bcorr\b|\bcorr\(', re.IGNORECASE)
+_SPEARMAN_PROMPT = re.compile(r'spearman|\brank', re.IGNORECASE)
+_SCATTER_PROMPT = re.compile(r'scatter|dispersione', re.IGNORECASE)
+
+
+def _pairwise_pearson(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Correlate every pair of columns over the rows where both have a value.
+
+    Args:
+        values: Array of shape (rows, columns), NaN for missing values
+
+    Returns:
+        The correlation matrix (NaN where undefined) and the number of
+        complete rows of every pair
+    """
+    num_rows, k = values.shape
+    present = np.isfinite(values)
+    counts = present.sum(axis=0)
+    # Shifting every column by its mean keeps the sums small, so the differences below lose little precision
+    with np.errstate(invalid='ignore', divide='ignore'):
+        shift = np.where(counts > 0, np.where(present, values, 0.0).sum(axis=0) / counts, 0.0)
+
+    pairs = np.zeros((k, k))
+    sums = np.zeros((k, k))
+    squares = np.zeros((k, k))
+    products = np.zeros((k, k))
+    block_rows = max(1, CORRELATION_BLOCK_BYTES // max(3 * 8 * k, 1))
+    for start in range(0, num_rows, block_rows):
+        mask = present[start:start + block_rows]
+        block = np.where(mask, values[start:start + block_rows] - shift, 0.0)
+        weights = mask.astype(float)
+        pairs += weights.T @ weights
+        # sums[i, j]: sum of column i over the rows where column j has a value
+        sums += block.T @ weights
+        squares += (block * block).T @ weights
+        products += block.T @ block
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        covariance = products - sums * sums.T / pairs
+        variance = squares - sums * sums / pairs
+        # Variances within rounding error of zero (constant columns) leave the correlation undefined
+        variance = np.where(variance > 1e-12 * squares, variance, np.nan)
+        correlation = covariance / np.sqrt(variance * variance.T)
+    correlation = np.clip(np.where(pairs >= 2, correlation, np.nan), -1.0, 1.0)
+    return correlation, pairs.round().astype(np.int64)
+
+
+def _average_ranks(values: np.ndarray, order: np.ndarray) -> np.ndarray:
+    """
+    Rank values from 1, giving tied values the mean of their ranks.
+
+    Args:
+        values: Values of a column
+        order: Positions of the values to rank, in ascending order of value
+
+    Returns:
+        Array like values holding the ranks at the given positions and NaN elsewhere
+    """
+    ordered = values[order]
+    starts = np.flatnonzero(np.r_[True, ordered[1:] != ordered[:-1]])
+    ends = np.r_[starts[1:], len(order)]
+    ranks = np.full(len(values), np.nan)
+    ranks[order] = np.repeat((starts + ends + 1) / 2.0, ends - starts)
+    return ranks
+
+
+def _pairwise_spearman(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Spearman counterpart of _pairwise_pearson."""
+    present = np.isfinite(values)
+    orders = []
+    for j in range(values.shape[1]):
+        rows = np.flatnonzero(present[:, j])
+        orders.append(rows[np.argsort(values[rows, j], kind='stable')])
+    ranks = np.column_stack([_average_ranks(values[:, j], order) for j, order in enumerate(orders)]) \
+        if orders else np.empty(values.shape)
+    correlation, pairs = _pairwise_pearson(ranks)
+
+    # Ranks over a column's own values are only exact for pairs that are missing the same rows;
+    # the others are re-ranked over their complete rows, whose order is that of the whole column
+    counts = present.sum(axis=0)
+    differ = (pairs != counts[:, None]) | (pairs != counts[None, :])
+    for i, j in zip(*np.nonzero(np.triu(differ & (pairs >= 2), k=1))):
+        both = present[:, i] & present[:, j]
+        x = _average_ranks(values[:, i], orders[i][both[orders[i]]])[both]
+        y = _average_ranks(values[:, j], orders[j][both[orders[j]]])[both]
+        # Ranks of complete rows: no missing values to mask, and the mean rank is known
+        x -= (len(x) + 1) / 2.0
+        y -= (len(y) + 1) / 2.0
+        scale = np.sqrt(np.dot(x, x) * np.dot(y, y))
+        correlation[i, j] = correlation[j, i] = np.clip(np.dot(x, y) / scale, -1.0, 1.0) if scale > 0 else np.nan
+    return correlation, pairs
+
+
+def correlation_columns(df: pd.DataFrame) -> List[Any]:
+    """Return the numeric columns of a DataFrame that take part in its correlation matrix."""
+    column_types = classify_columns(df)
+    return [col for col in df.columns if column_types[col] == "numeric" and not pd.api.types.is_bool_dtype(df[col])]
+
+
+def compute_correlations(df: pd.DataFrame, method: str = 'pearson',
+                         columns: Optional[List[Any]] = None) -> Dict[str, Any]:
+    """
+    Compute the correlation matrix of numeric columns, pairwise over complete rows.
+
+    Args:
+        df: The DataFrame
+        method: "pearson" or "spearman"
+        columns: Numeric columns to correlate (default: all, see correlation_columns)
+
+    Returns:
+        Dictionary with the 'method', the 'columns', the 'matrix' of
+        correlations (None where undefined, e.g. for constant columns) and the
+        'counts' of complete rows of every pair
+
+    Raises:
+        ValueError: If the method is not supported
+    """
+    if method not in CORRELATION_METHODS:
+        raise ValueError(f"Unsupported correlation method: {method} (expected one of {', '.join(CORRELATION_METHODS)})")
+    columns = correlation_columns(df) if columns is None else list(columns)
+    values = df[columns].to_numpy(dtype=float, na_value=np.nan) if columns else np.empty((len(df), 0))
+    compute = _pairwise_spearman if method == 'spearman' else _pairwise_pearson
+    matrix, counts = compute(values)
+    return {
+        "method": method,
+        "columns": columns,
+        "matrix": [[None if np.isnan(value) else float(value) for value in row] for row in matrix],
+        "counts": counts.tolist()
+    }
+
+
+def _source_signature(file_path: str) -> Dict[str, int]:
+    stat = os.stat(file_path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def get_correlations_path(file_path: str) -> str:
+    """Return the path of the stored correlation matrices of a dataset."""
+    return get_artifact_path(file_path, CORRELATION_ARTIFACT_NAME)
+
+
+_loaded: "OrderedDict[str, Tuple[Dict[str, int], Dict[str, Any]]]" = OrderedDict()
+_loaded_lock = threading.Lock()
+
+
+def _stored_methods(file_path: str, signature: Dict[str, int]) -> Dict[str, Any]:
+    """Return the matrices stored for the current file, by method."""
+    key = os.path.abspath(file_path)
+    with _loaded_lock:
+        entry = _loaded.get(key)
+        if entry is not None and entry[0] == signature:
+            _loaded.move_to_end(key)
+            return entry[1]
+    try:
+        with open(get_correlations_path(file_path)) as f:
+            stored = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if stored.get("version") != CORRELATION_VERSION or stored.get("source") != signature:
+        return {}
+    return stored["methods"]
+
+
+def get_correlations(file_path: str, method: str = 'pearson') -> Dict[str, Any]:
+    """
+    Return the correlation matrix of a dataset's numeric columns, computing and storing it once per method.
+
+    Args:
+        file_path: Path to the dataset file
+        method: "pearson" or "spearman"
+
+    Returns:
+        The correlations of the current file (see compute_correlations)
+
+    Raises:
+        ValueError: If the method is not supported
+    """
+    if method not in CORRELATION_METHODS:
+        raise ValueError(f"Unsupported correlation method: {method} (expected one of {', '.join(CORRELATION_METHODS)})")
+    signature = _source_signature(file_path)
+    methods = _stored_methods(file_path, signature)
+    if method not in methods:
+        # Only the numeric columns are loaded (from the cached frame or the columnar sidecar)
+        numeric = [col for col, spec in get_dataset_schema(file_path).items() if spec.get("type") in ("int", "float")]
+        df, _ = load_dataframe_columns(file_path, numeric)
+        methods = dict(methods, **{method: compute_correlations(df, method)})
+        encoded = dumps({"version": CORRELATION_VERSION, "source": signature, "methods": methods})
+        correlations_path = get_correlations_path(file_path)
+        temp_path = f"{correlations_path}.tmp-{os.getpid()}-{threading.get_ident()}"
+        try:
+            with open(temp_path, 'wb') as f:
+                f.write(encoded)
+            os.replace(temp_path, correlations_path)
+        except OSError as e:
+            print(f"Could not store the correlations of {file_path}: {str(e)}")
+    with _loaded_lock:
+        _loaded[os.path.abspath(file_path)] = (signature, methods)
+        _loaded.move_to_end(os.path.abspath(file_path))
+        while len(_loaded) > _LOADED_MAX_ENTRIES:
+            _loaded.popitem(last=False)
+    return methods[method]
+
+
+def match_correlation_prompt(prompt: Optional[str]) -> Optional[str]:
+    """
+    Recognize a prompt asking for the correlations of the dataset.
+
+    Args:
+        prompt: The user's prompt
+
+    Returns:
+        The correlation method the prompt asks for ("spearman" if it mentions
+        ranks, otherwise "pearson"), or None if it does not ask for correlations
+    """
+    if not prompt or not _CORRELATION_PROMPT.search(prompt) or _SCATTER_PROMPT.search(prompt):
+        return None
+    return 'spearman' if _SPEARMAN_PROMPT.search(prompt) else 'pearson'
@@ -5,129 +5,167 @@ This module provides functions for exploring datasets and generating ECharts vis
 """
 
 import os
+import time
+import itertools
 import pandas as pd
 import json
 import numpy as np
-from typing import Dict, List, Any, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Any, Optional, Tuple
+
+from src import streaming_summary
+from src.aggregation_cache import aggregate, get_dataset_key
+from src.column_index import ColumnIndex, MAX_CATEGORY_VALUES, build_column_index, classify_columns, index_frame
+from src.correlation import compute_correlations, get_correlations, match_correlation_prompt
+from src.dataset_loader import load_dataframe, get_dataset_schema, iter_csv_chunks, widen_dtypes, DatasetLoadError
+from src.downsampling import downsample_echarts
+from src.rollup_cube import load_rollup_cube
+from src.schema_inference import infer_schema, apply_schema
+from src.streaming_summary import (
+    should_stream, summarize_with_sketches, SummaryAccumulator, SummaryState, GroupedSums,
+    SKETCH_SUMMARY_MIN_ROWS
+)
 
 def load_dataset(file_path: str) -> Tuple[pd.DataFrame, str]:
     """
     Load a dataset from a file with enhanced flexible format detection.
 
+    Parsed frames are served from the shared dataset cache, so repeated calls
+    for an unchanged file do not touch the disk again.
+
     Args:
         file_path: Path to the dataset file
 
     Returns:
         Tuple containing the loaded DataFrame and a message about the loading process
     """
-    message = ""
-    df = None
-    error_messages = []
+    try:
+        return load_dataframe(file_path)
+    except DatasetLoadError as e:
+        message = f"Failed to load dataset: {str(e)}"
+        # Create a minimal dataset for testing
+        df = pd.DataFrame({
+            'Column1': [1, 2, 3, 4, 5],
+            'Column2': ['A', 'B', 'C', 'D', 'E']
+        })
+        return df, message
+
+# Number of threads building the charts of a dataset concurrently
+CHART_WORKERS = int(os.getenv("CHART_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Numeric columns are summarized in blocks of at most this many bytes of float64 values
+NUMERIC_STATS_BLOCK_BYTES = 64 * 1024 * 1024
+
+def _select_quantiles(block: np.ndarray, count: int, fractions: List[float]) -> np.ndarray:
+    """
+    Linearly interpolated quantiles of every row of a 2-D array, selected in place.
 
-    # First try to determine file type from extension
-    file_extension = os.path.splitext(file_path)[1].lower()
+    Each row holds one column's values, with its count valid values first in
+    sort order (NaN replaced by +inf). The middle fraction is selected with a
+    single np.partition, after which the lower fractions are searched in the
+    left part and the higher ones in the right part only.
 
-    # Try Excel formats first if extension suggests it
-    if file_extension in ['.xlsx', '.xls', '.xlsm', '.xlsb', '.odf', '.ods', '.odt']:
-        try:
-            df = pd.read_excel(file_path)
-            message = f"Successfully loaded Excel file based on extension {file_extension}"
-        except Exception as e:
-            error_messages.append(f"Failed to load Excel file: {str(e)}")
-
-    # Try JSON if extension suggests it
-    elif file_extension in ['.json']:
-        try:
-            df = pd.read_json(file_path)
-            message = "Successfully loaded JSON file"
-        except Exception as e:
-            error_messages.append(f"Failed to load JSON file: {str(e)}")
+    Returns:
+        Array of shape (len(fractions), number of rows)
+    """
+    result = np.empty((len(fractions), block.shape[0]))
+    positions = [fraction * (count - 1) for fraction in fractions]
+    width = block.shape[1]
+
+    def select(lo, hi, items):
+        if not items:
+            return
+        lower = int(np.floor(positions[items[len(items) // 2]]))
+        block[:, lo:hi].partition(lower - lo, axis=1)
+        low_value = block[:, lower]
+        # The next order statistic is the smallest value right of the partition point;
+        # the element at hi, if any, bounds the segment from above
+        high_value = block[:, lower + 1:min(hi + 1, width)].min(axis=1) if lower + 1 < width else low_value
+        for item in items:
+            if int(np.floor(positions[item])) == lower:
+                weight = positions[item] - lower
+                # Without a fractional part the value is exact (and the next one may be a missing +inf)
+                result[item] = low_value + (high_value - low_value) * weight if weight else low_value
+        select(lo, lower, [item for item in items if int(np.floor(positions[item])) < lower])
+        select(lower + 1, hi, [item for item in items if int(np.floor(positions[item])) > lower])
+
+    select(0, width, sorted(range(len(fractions)), key=lambda item: positions[item]))
+    return result
+
+def _summarize_numeric_columns(df: pd.DataFrame, numeric_columns: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Compute min, max, mean, median, std, quartiles and missing counts of numeric columns.
 
-    # Try Parquet if extension suggests it
-    elif file_extension in ['.parquet']:
-        try:
-            df = pd.read_parquet(file_path)
-            message = "Successfully loaded Parquet file"
-        except Exception as e:
-            error_messages.append(f"Failed to load Parquet file: {str(e)}")
+    The columns are converted to one 2-D float array (in blocks bounded by
+    NUMERIC_STATS_BLOCK_BYTES) and reduced with NaN-aware NumPy operations,
+    instead of one pandas call per statistic and column; medians and
+    quartiles come from partial selection rather than sorting.
 
-    # Try Feather if extension suggests it
-    elif file_extension in ['.feather']:
-        try:
-            df = pd.read_feather(file_path)
-            message = "Successfully loaded Feather file"
-        except Exception as e:
-            error_messages.append(f"Failed to load Feather file: {str(e)}")
+    Args:
+        df: The DataFrame to summarize
+        numeric_columns: Names of its numeric columns
 
-    # Try HDF5 if extension suggests it
-    elif file_extension in ['.h5', '.hdf5']:
-        try:
-            df = pd.read_hdf(file_path)
-            message = "Successfully loaded HDF5 file"
-        except Exception as e:
-            error_messages.append(f"Failed to load HDF5 file: {str(e)}")
-
-    # Try CSV with different encodings and delimiters if still not loaded or for CSV-like extensions
-    if df is None:
-        for encoding in ['latin-1', 'utf-8', 'cp1252', 'iso-8859-1']:
-            for delimiter in [';', ',', '\t', '|']:
-                try:
-                    df = pd.read_csv(file_path, encoding=encoding, delimiter=delimiter)
-                    message = f"Successfully loaded CSV with encoding={encoding}, delimiter={delimiter}"
-                    break
-                except Exception as e:
-                    error_messages.append(f"Failed with encoding={encoding}, delimiter={delimiter}: {str(e)}")
-                    continue
-            if df is not None:
-                break
-
-    # If all attempts failed, try with pandas defaults
-    if df is None:
-        try:
-            df = pd.read_csv(file_path)
-            message = "Successfully loaded CSV with pandas defaults"
-        except Exception:
-            try:
-                df = pd.read_excel(file_path)
-                message = "Successfully loaded Excel file as last resort"
-            except Exception as e:
-                message = f"Failed to load dataset: {str(e)}"
-                # Create a minimal dataset for testing
-                df = pd.DataFrame({
-                    'Column1': [1, 2, 3, 4, 5],
-                    'Column2': ['A', 'B', 'C', 'D', 'E']
-                })
-
-    # Auto-detect and convert numeric columns
-    numeric_columns = []
-    for col in df.columns:
-        # Skip columns that are already numeric
-        if pd.api.types.is_numeric_dtype(df[col]):
-            numeric_columns.append(col)
-            continue
-
-        # Check if column contains mostly numeric values
-        try:
-            # Try to convert and count how many values were successfully converted
-            numeric_series = pd.to_numeric(df[col], errors='coerce')
-            non_na_count = numeric_series.count()
-            original_non_na_count = df[col].count()
-
-            # If at least 70% of values could be converted to numeric, do the conversion
-            if original_non_na_count > 0 and non_na_count / original_non_na_count >= 0.7:
-                df[col] = numeric_series
-                numeric_columns.append(col)
-                message += f"\nConverted column '{col}' to numeric type"
-        except:
-            # Skip columns that cause errors
-            continue
-
-    return df, message
+    Returns:
+        Dictionary mapping each column to its statistics, with None for values
+        that are undefined (e.g. the std of a single value)
+    """
+    numeric_stats = {}
+    if not numeric_columns:
+        return numeric_stats
+    num_rows = len(df)
+    block_columns = max(1, NUMERIC_STATS_BLOCK_BYTES // max(8 * num_rows, 1))
+
+    for start in range(0, len(numeric_columns), block_columns):
+        columns = numeric_columns[start:start + block_columns]
+        # One row per column, so every reduction and partition reads contiguous memory
+        values = np.array(df[columns].to_numpy(dtype=float, na_value=np.nan).T, order='C')
+        mask = np.isnan(values)
+        missing = mask.sum(axis=1)
+        counts = num_rows - missing
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            # fmin/fmax skip NaN and give NaN for columns without values, without warnings
+            minimum = np.fmin.reduce(values, axis=1) if num_rows else np.full(len(columns), np.nan)
+            maximum = np.fmax.reduce(values, axis=1) if num_rows else np.full(len(columns), np.nan)
+            values[mask] = 0.0
+            mean = values.sum(axis=1) / counts
+            deviations = values - mean[:, None]
+            deviations[mask] = 0.0
+            squares = np.einsum('ij,ij->i', deviations, deviations)
+            del deviations
+            std = np.where(counts > 1, np.sqrt(squares / (counts - 1)), np.nan)
+
+        # Medians and quartiles: missing values sort last, columns with equal counts are selected together
+        values[mask] = np.inf
+        quantiles = np.full((3, len(columns)), np.nan)
+        for count in np.unique(counts):
+            if count > 0:
+                rows = np.flatnonzero(counts == count)
+                block = values if len(rows) == len(columns) else values[rows]
+                quantiles[:, rows] = _select_quantiles(block, int(count), [0.25, 0.5, 0.75])
+        p25, median, p75 = quantiles
+
+        stats = {"min": minimum, "max": maximum, "mean": mean, "median": median, "std": std, "p25": p25, "p75": p75}
+        for key in stats:
+            # Undefined or infinite statistics are reported as None
+            stats[key] = np.where(np.isfinite(stats[key]), stats[key], np.nan).tolist()
+        for index, col in enumerate(columns):
+            numeric_stats[col] = {
+                key: None if np.isnan(column_values[index]) else column_values[index]
+                for key, column_values in stats.items()
+            }
+            numeric_stats[col]["missing"] = int(missing[index])
+    # Keep the columns in their original order
+    return {col: numeric_stats[col] for col in numeric_columns}
 
 def get_dataset_summary(df: pd.DataFrame) -> Dict[str, Any]:
     """
     Generate a summary of the dataset.
 
+    DataFrames with at least SKETCH_SUMMARY_MIN_ROWS rows are summarized in a
+    single pass with sketches, so distinct counts, medians, quartiles and top
+    values are estimates (see src.sketches for their error bounds).
+
     Args:
         df: The DataFrame to summarize
 
@@ -138,40 +176,16 @@ def get_dataset_summary(df: pd.DataFrame) -> Dict[str, Any]:
     num_rows, num_cols = df.shape
 
     # Column types
-    column_types = {}
-    numeric_columns = []
-    categorical_columns = []
-    date_columns = []
-
-    for col in df.columns:
-        if pd.api.types.is_numeric_dtype(df[col]):
-            column_types[col] = "numeric"
-            numeric_columns.append(col)
-        elif pd.api.types.is_datetime64_dtype(df[col]):
-            column_types[col] = "datetime"
-            date_columns.append(col)
-        else:
-            column_types[col] = "categorical"
-            categorical_columns.append(col)
-
-    # Summary statistics for numeric columns
-    numeric_stats = {}
-    for col in numeric_columns:
-        # Ensure NaN values from pandas aggregations are converted to None
-        stats_dict = {
-            "min": df[col].min(),
-            "max": df[col].max(),
-            "mean": df[col].mean(),
-            "median": df[col].median(),
-            "std": df[col].std(),
-        }
-        # Convert values to float if not NaN, otherwise None
-        numeric_stats[col] = {
-            key: float(value) if pd.notna(value) and np.isfinite(value) else None
-            for key, value in stats_dict.items()
-        }
-        # Add missing count separately
-        numeric_stats[col]["missing"] = int(df[col].isna().sum())
+    column_types = classify_columns(df)
+    if num_rows >= SKETCH_SUMMARY_MIN_ROWS:
+        return summarize_with_sketches(df, column_types)
+
+    numeric_columns = [col for col in df.columns if column_types[col] == "numeric"]
+    categorical_columns = [col for col in df.columns if column_types[col] == "categorical"]
+    date_columns = [col for col in df.columns if column_types[col] == "datetime"]
+
+    # Summary statistics for numeric columns, computed for all of them at once
+    numeric_stats = _summarize_numeric_columns(df, numeric_columns)
 
     # Value counts for categorical columns (limited to top 10)
     categorical_stats = {}
@@ -204,43 +218,55 @@ def get_dataset_summary(df: pd.DataFrame) -> Dict[str, Any]:
     # depending on how Flask serializes. For now, assume the explicit conversions are sufficient.
     return summary_dict
 
-def _find_columns(df: pd.DataFrame, categorical_hints: List[str], numerical_hints: List[str]) -> Tuple[Optional[str], Optional[str]]:
-    """Helper to find the best categorical and numerical columns based on hints."""
-    categorical_col = None
-    numerical_col = None
-
-    # Find categorical column
-    for hint in categorical_hints:
-        for col in df.columns:
-            if hint in col.lower() and pd.api.types.is_object_dtype(df[col]):
-                categorical_col = col
-                break
-        if categorical_col:
-            break
-    # Fallback: Find first object/category column with reasonable unique values
+def _find_columns(df: pd.DataFrame, categorical_hints: List[str], numerical_hints: List[str],
+                  index: Optional[ColumnIndex] = None) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Helper to find the best categorical and numerical columns based on hints.
+
+    index, when given (built from the dataset summary), supplies the column
+    profiles so the DataFrame is not inspected again.
+    """
+    index = index or index_frame(df)
+    label_cols = index.columns_with(labels=True)
+    numeric_cols = index.columns_with(kind="numeric")
+
+    # Find categorical column, falling back to the first label column with a reasonable
+    # number of distinct values (avoiding IDs and overly diverse columns)
+    categorical_col = index.find(categorical_hints, label_cols)
     if not categorical_col:
-        for col in df.select_dtypes(include=['object', 'category']).columns:
-            if 1 < df[col].nunique() < 50: # Avoid IDs or overly diverse columns
-                 categorical_col = col
-                 break
-
-    # Find numerical column
-    for hint in numerical_hints:
-        for col in df.columns:
-            if hint in col.lower() and pd.api.types.is_numeric_dtype(df[col]):
-                numerical_col = col
-                break
-        if numerical_col:
-            break
-    # Fallback: Find first numeric column
-    if not numerical_col:
-        numeric_cols = df.select_dtypes(include=np.number).columns
-        if len(numeric_cols) > 0:
-            numerical_col = numeric_cols[0]
+        categorical_col = next((col for col in label_cols
+                                if 1 < (index.profiles[col]["unique_values"] or 0) < MAX_CATEGORY_VALUES), None)
+
+    # Find numerical column, falling back to the first numeric column
+    numerical_col = index.find(numerical_hints, numeric_cols)
+    if not numerical_col and numeric_cols:
+        numerical_col = numeric_cols[0]
 
     return categorical_col, numerical_col
 
-def generate_barchart_by_category(df: pd.DataFrame, category_col: Optional[str], value_col: Optional[str], chart_title: str) -> Dict[str, Any]:
+def _sum_by_category(df: pd.DataFrame, category_col: str, value_cols: List[str]) -> pd.DataFrame:
+    """
+    Sum value columns per category, returning one row per observed category.
+
+    Categorical columns are grouped on their integer codes; the labels of the
+    result are plain objects so callers can add rows such as 'Other' freely.
+    """
+    grouped = df.groupby(category_col, observed=True)[value_cols].sum().reset_index()
+    if isinstance(grouped[category_col].dtype, pd.CategoricalDtype):
+        grouped[category_col] = grouped[category_col].astype(object)
+    return grouped
+
+def _category_rows(df: pd.DataFrame, category_col: str, value_cols: List[str], presorted: bool) -> pd.DataFrame:
+    """Return one row per category: the rows of a presorted frame as they are, otherwise the sums by category."""
+    if not presorted:
+        return _sum_by_category(df, category_col, value_cols)
+    rows = df[[category_col] + value_cols].reset_index(drop=True)
+    if isinstance(rows[category_col].dtype, pd.CategoricalDtype):
+        rows[category_col] = rows[category_col].astype(object)
+    return rows
+
+def generate_barchart_by_category(df: pd.DataFrame, category_col: Optional[str], value_col: Optional[str], chart_title: str,
+                                  presorted: bool = False) -> Dict[str, Any]:
     """
     Generate a generic ECharts bar chart configuration grouping by a category.
 
@@ -249,6 +275,9 @@ def generate_barchart_by_category(df: pd.DataFrame, category_col: Optional[str],
         category_col: The name of the categorical column to group by.
         value_col: The name of the numerical column to aggregate.
         chart_title: The title for the chart.
+        presorted: The DataFrame already holds one row per category in display
+            order (e.g. a query result); its rows are charted as they are,
+            without summing, sorting or keeping the top categories.
 
     Returns:
         ECharts configuration object or an error message config.
@@ -263,11 +292,12 @@ def generate_barchart_by_category(df: pd.DataFrame, category_col: Optional[str],
         }
 
     # Group by category and calculate total value
-    grouped_data = df.groupby(category_col)[value_col].sum().reset_index()
-    grouped_data = grouped_data.sort_values(value_col, ascending=False)
+    grouped_data = _category_rows(df, category_col, [value_col], presorted)
+    if not presorted:
+        grouped_data = grouped_data.sort_values(value_col, ascending=False)
 
     # Limit to top 10-15 categories for readability
-    top_data = grouped_data.head(15)
+    top_data = grouped_data if presorted else grouped_data.head(15)
 
     # Fill NaN values before converting to list
     chart_data = top_data[value_col].fillna(0).tolist()
@@ -329,7 +359,8 @@ def generate_barchart_by_category(df: pd.DataFrame, category_col: Optional[str],
         }]
     }
 
-def generate_piechart_by_category(df: pd.DataFrame, category_col: Optional[str], value_col: Optional[str], chart_title: str) -> Dict[str, Any]:
+def generate_piechart_by_category(df: pd.DataFrame, category_col: Optional[str], value_col: Optional[str], chart_title: str,
+                                  presorted: bool = False) -> Dict[str, Any]:
     """
     Generate a generic ECharts pie chart configuration grouping by a category.
 
@@ -338,6 +369,8 @@ def generate_piechart_by_category(df: pd.DataFrame, category_col: Optional[str],
         category_col: The name of the categorical column for slices.
         value_col: The name of the numerical column for slice values.
         chart_title: The title for the chart.
+        presorted: The DataFrame already holds one row per category in display
+            order; every row becomes a slice, without an 'Other' slice.
 
     Returns:
         ECharts configuration object or an error message config.
@@ -350,13 +383,15 @@ def generate_piechart_by_category(df: pd.DataFrame, category_col: Optional[str],
         }
 
     # Group by category and calculate total value
-    grouped_data = df.groupby(category_col)[value_col].sum().reset_index()
-    grouped_data = grouped_data.sort_values(value_col, ascending=False)
+    grouped_data = _category_rows(df, category_col, [value_col], presorted)
+    if not presorted:
+        grouped_data = grouped_data.sort_values(value_col, ascending=False)
 
     # Limit categories for better visualization (e.g., top 8 + 'Other')
-    if len(grouped_data) > 8:
+    if len(grouped_data) > 8 and not presorted:
         other_total = grouped_data.iloc[8:][value_col].sum()
-        top_data = grouped_data.iloc[:8].copy()
+        # Renumber the rows so the 'Other' row below does not overwrite one of them
+        top_data = grouped_data.iloc[:8].reset_index(drop=True)
         # Use .loc to add the 'Other' row safely
         top_data.loc[len(top_data)] = {category_col: 'Other Categories', value_col: other_total}
         grouped_data = top_data
@@ -419,7 +454,8 @@ def generate_piechart_by_category(df: pd.DataFrame, category_col: Optional[str],
         }]
     }
 
-def generate_stacked_barchart_comparison(df: pd.DataFrame, category_col: Optional[str], value_col1: Optional[str], value_col2: Optional[str], chart_title: str) -> Dict[str, Any]:
+def generate_stacked_barchart_comparison(df: pd.DataFrame, category_col: Optional[str], value_col1: Optional[str], value_col2: Optional[str], chart_title: str,
+                                         presorted: bool = False) -> Dict[str, Any]:
     """
     Generate a generic ECharts stacked bar chart comparing two values by category.
 
@@ -429,6 +465,8 @@ def generate_stacked_barchart_comparison(df: pd.DataFrame, category_col: Optiona
         value_col1: The name of the first numerical column.
         value_col2: The name of the second numerical column.
         chart_title: The title for the chart.
+        presorted: The DataFrame already holds one row per category in display
+            order; its rows are charted as they are.
 
     Returns:
         ECharts configuration object or an error message config.
@@ -444,16 +482,14 @@ def generate_stacked_barchart_comparison(df: pd.DataFrame, category_col: Optiona
         }
 
     # Group by category and calculate totals
-    compare_df = df.groupby(category_col).agg({
-        value_col1: 'sum',
-        value_col2: 'sum'
-    }).reset_index()
+    compare_df = _category_rows(df, category_col, [value_col1, value_col2], presorted)
 
     # Sort by the first value column
-    compare_df = compare_df.sort_values(value_col1, ascending=False)
+    if not presorted:
+        compare_df = compare_df.sort_values(value_col1, ascending=False)
 
     # Limit to top 10-15 categories for readability
-    if len(compare_df) > 15:
+    if len(compare_df) > 15 and not presorted:
         compare_df = compare_df.iloc[:15]
 
     # Prepare data for ECharts, handling potential NaN values
@@ -533,101 +569,423 @@ def generate_stacked_barchart_comparison(df: pd.DataFrame, category_col: Optiona
         ]
     }
 
-def get_dataset_visualizations(file_path: str) -> Dict[str, Any]:
+def generate_correlation_heatmap(df: Optional[pd.DataFrame], columns: Optional[List[str]], chart_title: str,
+                                 method: str = 'pearson', correlations: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """
-    Generate a set of ECharts visualizations for a dataset, attempting to
-    dynamically identify relevant columns. Ensures result is JSON serializable.
+    Generate an ECharts heatmap of the correlations between numeric columns.
 
     Args:
-        file_path: Path to the dataset file
+        df: The DataFrame containing the data (not needed when correlations are given).
+        columns: The numeric columns to correlate, or None for all of them.
+        chart_title: The title for the chart.
+        method: "pearson" or "spearman".
+        correlations: A precomputed matrix (see src.correlation.get_correlations) to read instead of df.
 
     Returns:
-        Dictionary containing ECharts configurations and summary info.
+        ECharts configuration object or an error message config.
     """
-    # Load the dataset
-    df, load_message = load_dataset(file_path)
+    if correlations is None and df is not None:
+        numeric = [col for col in (columns or []) if col in df.columns]
+        correlations = compute_correlations(df, method, numeric if columns else None)
+    positions = []
+    if correlations is not None:
+        available = {col: position for position, col in enumerate(correlations["columns"])}
+        positions = [available[col] for col in (columns or correlations["columns"]) if col in available]
+    if len(positions) < 2:
+        return {
+            "title": {"text": f"{chart_title} (Data not available)"},
+            "tooltip": {},
+            "xAxis": {"type": "category", "data": []},
+            "yAxis": {"type": "category", "data": []},
+            "series": [{"data": [], "type": "heatmap"}]
+        }
 
-    # Generate summary (already handles NaN conversion)
-    summary = get_dataset_summary(df)
-    numeric_cols = summary.get("numeric_columns", [])
-    categorical_cols = summary.get("categorical_columns", [])
+    labels = [str(correlations["columns"][position]) for position in positions]
+    matrix = correlations["matrix"]
+    # ECharts draws "-" as an empty cell (undefined correlations, e.g. of constant columns)
+    chart_data = [
+        [x, y, "-" if matrix[row][col] is None else round(matrix[row][col], 3)]
+        for y, row in enumerate(positions) for x, col in enumerate(positions)
+    ]
 
-    # --- Dynamically identify columns for charts ---
-    # (Column identification logic remains the same)
-    cat1_col, val1_col = _find_columns(df, ['province', 'region', 'area', 'competente'], ['total', 'impegno', 'value', 'amount'])
+    return {
+        "title": {
+            "text": chart_title,
+            "left": "center",
+            "textStyle": {
+                "fontSize": 16,
+                "fontWeight": "bold"
+            }
+        },
+        "tooltip": {
+            "position": "top"
+        },
+        "grid": {
+            "left": "5%",
+            "right": "5%",
+            "bottom": "20%", # Room for the rotated labels and the color scale
+            "containLabel": True
+        },
+        "xAxis": {
+            "type": "category",
+            "data": labels,
+            "splitArea": {"show": True},
+            "axisLabel": {
+                "rotate": 45,
+                "fontSize": 10,
+                "interval": 0 # Show all labels
+            }
+        },
+        "yAxis": {
+            "type": "category",
+            "data": labels,
+            "splitArea": {"show": True},
+            "axisLabel": {
+                "fontSize": 10,
+                "interval": 0
+            }
+        },
+        "visualMap": {
+            "min": -1,
+            "max": 1,
+            "calculable": True,
+            "orient": "horizontal",
+            "left": "center",
+            "bottom": 0,
+            "inRange": {
+                "color": ["#3a56b4", "#f7f7f7", "#ee6666"]
+            }
+        },
+        "series": [{
+            "name": f"{method.capitalize()} correlation",
+            "type": "heatmap",
+            "data": chart_data,
+            "label": {
+                "show": len(labels) <= 12, # Values stay readable on small matrices only
+                "fontSize": 10
+            },
+            "emphasis": {
+                "itemStyle": {
+                    "shadowBlur": 10,
+                    "shadowColor": "rgba(0, 0, 0, 0.5)"
+                }
+            }
+        }]
+    }
+
+def _plan_charts(index: ColumnIndex) -> Dict[str, Dict[str, Any]]:
+    """
+    Pick the category and value columns of the three overview charts.
+
+    Args:
+        index: Column index of the DataFrame (or of a representative first chunk of it)
+
+    Returns:
+        Dictionary mapping chart keys to their category column, value columns and title
+    """
+    numeric_cols = index.columns_with(kind="numeric")
+    categorical_cols = index.columns_with(kind="categorical")
+
+    cat1_col, val1_col = _find_columns(None, ['province', 'region', 'area', 'competente'], ['total', 'impegno', 'value', 'amount'],
+                                       index)
     chart1_title = f"{val1_col} by {cat1_col}" if cat1_col and val1_col else "Category Breakdown"
-    vis1 = generate_barchart_by_category(df, cat1_col, val1_col, chart1_title)
 
-    cat2_col = None
     potential_cat2_cols = [c for c in categorical_cols if c != cat1_col]
-    if potential_cat2_cols:
-        for hint in ['type', 'desc', 'kind', 'intervento', 'tipologia']:
-             for col in potential_cat2_cols:
-                 if hint in col.lower():
-                     cat2_col = col
-                     break
-             if cat2_col:
-                 break
-        if not cat2_col:
-            cat2_col = potential_cat2_cols[0]
+    cat2_col = index.find(['type', 'desc', 'kind', 'intervento', 'tipologia'], potential_cat2_cols)
+    if not cat2_col and potential_cat2_cols:
+        cat2_col = potential_cat2_cols[0]
     val2_col = val1_col
     chart2_title = f"{val2_col} Distribution by {cat2_col}" if cat2_col and val2_col else "Value Distribution"
-    vis2 = generate_piechart_by_category(df, cat2_col, val2_col, chart2_title)
 
     cat3_col = cat1_col
-    val3_col1 = None
-    val3_col2 = None
-    payment_hints = ['payment', 'pagato', 'paid']
-    commitment_hints = ['commitment', 'impegno', 'total']
-    for hint in commitment_hints:
-        for col in numeric_cols:
-            if hint in col.lower():
-                val3_col1 = col
-                break
-        if val3_col1:
-            break
+    val3_col1 = index.find(['commitment', 'impegno', 'total'], numeric_cols)
     if not val3_col1 and len(numeric_cols) > 0:
         val3_col1 = numeric_cols[0]
-    for hint in payment_hints:
-        for col in numeric_cols:
-            if hint in col.lower() and col != val3_col1:
-                val3_col2 = col
-                break
-        if val3_col2:
-            break
-    if not val3_col2 and len(numeric_cols) > 1:
-        potential_val3_col2 = [c for c in numeric_cols if c != val3_col1]
-        if potential_val3_col2:
-            val3_col2 = potential_val3_col2[0]
+    potential_val3_col2 = [c for c in numeric_cols if c != val3_col1]
+    val3_col2 = index.find(['payment', 'pagato', 'paid'], potential_val3_col2)
+    if not val3_col2 and potential_val3_col2:
+        val3_col2 = potential_val3_col2[0]
     chart3_title = f"{val3_col1} vs {val3_col2} by {cat3_col}" if cat3_col and val3_col1 and val3_col2 else "Value Comparison"
-    vis3 = generate_stacked_barchart_comparison(df, cat3_col, val3_col1, val3_col2, chart3_title)
 
-    # Assemble visualizations
-    visualizations = {
-        "chart1_bar": vis1,
-        "chart2_pie": vis2,
-        "chart3_stacked_bar": vis3
+    return {
+        "chart1_bar": {"category": cat1_col, "values": [val1_col], "title": chart1_title},
+        "chart2_pie": {"category": cat2_col, "values": [val2_col], "title": chart2_title},
+        "chart3_stacked_bar": {"category": cat3_col, "values": [val3_col1, val3_col2], "title": chart3_title},
+    }
+
+def _value_columns_by_category(plan: Dict[str, Dict[str, Any]]) -> Dict[str, List[str]]:
+    """Collect, for each category column of a chart plan, every value column charted by it."""
+    value_cols_by_category = {}
+    for chart in plan.values():
+        if chart["category"] and all(chart["values"]):
+            value_cols_by_category.setdefault(chart["category"], [])
+            for value_col in chart["values"]:
+                if value_col not in value_cols_by_category[chart["category"]]:
+                    value_cols_by_category[chart["category"]].append(value_col)
+    return value_cols_by_category
+
+def _build_bar_chart(chart: Dict[str, Any], frame: pd.DataFrame) -> Dict[str, Any]:
+    return generate_barchart_by_category(frame, chart["category"], chart["values"][0], chart["title"])
+
+def _build_pie_chart(chart: Dict[str, Any], frame: pd.DataFrame) -> Dict[str, Any]:
+    return generate_piechart_by_category(frame, chart["category"], chart["values"][0], chart["title"])
+
+def _build_stacked_bar_chart(chart: Dict[str, Any], frame: pd.DataFrame) -> Dict[str, Any]:
+    return generate_stacked_barchart_comparison(
+        frame, chart["category"], chart["values"][0], chart["values"][1], chart["title"])
+
+# Builders of the overview charts by chart key, in display order. A builder takes the
+# chart's plan entry and the data to chart and returns an ECharts configuration.
+CHART_BUILDERS: Dict[str, Callable[[Dict[str, Any], pd.DataFrame], Dict[str, Any]]] = {
+    "chart1_bar": _build_bar_chart,
+    "chart2_pie": _build_pie_chart,
+    "chart3_stacked_bar": _build_stacked_bar_chart,
+}
+
+_chart_executor = ThreadPoolExecutor(max_workers=CHART_WORKERS, thread_name_prefix='charts')
+
+def _build_chart(builder: Callable[[Dict[str, Any], pd.DataFrame], Dict[str, Any]], chart: Dict[str, Any],
+                 frame_for: Callable[[Optional[str]], pd.DataFrame]) -> Tuple[Dict[str, Any], float]:
+    start_time = time.perf_counter()
+    config = builder(chart, frame_for(chart["category"]))
+    return config, (time.perf_counter() - start_time) * 1000
+
+def _render_charts(plan: Dict[str, Dict[str, Any]],
+                   frame_for: Callable[[Optional[str]], pd.DataFrame]) -> Tuple[Dict[str, Any], Dict[str, float], Dict[str, Any]]:
+    """
+    Build the ECharts configurations of a chart plan, concurrently.
+
+    Each chart of the plan with a builder in CHART_BUILDERS runs on a pool of
+    CHART_WORKERS threads; pandas releases the GIL for much of the grouping
+    and sorting, so charts over large frames overlap. Series with more than
+    DOWNSAMPLE_MAX_POINTS points are downsampled.
+
+    Args:
+        plan: Chart plan returned by _plan_charts
+        frame_for: Returns the data to chart for a category column; either the
+            full DataFrame or one row per group with the summed value columns.
+            It is called from the pool threads.
+
+    Returns:
+        Tuple of the ECharts configurations, the time each chart took to
+        build, in milliseconds, and the point counts of downsampled charts,
+        all by chart key
+    """
+    futures = {
+        key: _chart_executor.submit(_build_chart, builder, plan[key], frame_for)
+        for key, builder in CHART_BUILDERS.items() if key in plan
+    }
+    visualizations, timings, downsampling = {}, {}, {}
+    for key, future in futures.items():
+        visualizations[key], elapsed = future.result()
+        timings[key] = round(elapsed, 2)
+        reduced = downsample_echarts(visualizations[key])
+        if reduced:
+            downsampling[key] = reduced
+    return visualizations, timings, downsampling
+
+def start_summary_state(first_chunk: pd.DataFrame, schema: Dict[str, Dict[str, Any]]) -> SummaryState:
+    """
+    Create an empty summary state with the columns and chart plan of a dataset's first chunk.
+
+    Args:
+        first_chunk: Type-converted first chunk of the dataset
+        schema: Schema the chunks are converted with
+
+    Returns:
+        A SummaryState to which every chunk, including the first, must be added
+    """
+    column_types = classify_columns(first_chunk)
+    plan = _plan_charts(index_frame(first_chunk))
+
+    # One grouped-sum accumulator per category column, covering every value column charted by it
+    grouped_sums = {cat: GroupedSums(cat, values) for cat, values in _value_columns_by_category(plan).items()}
+
+    return SummaryState(schema, SummaryAccumulator(list(first_chunk.columns), column_types), plan, grouped_sums)
+
+def build_summary_state(file_path: str) -> Tuple[SummaryState, int]:
+    """
+    Summarize a CSV dataset in a single chunked pass.
+
+    Columns and chart axes are chosen from the first chunk; the summary and
+    the grouped sums behind every chart are merged chunk by chunk, so memory
+    use does not grow with the file size.
+
+    Args:
+        file_path: Path to a CSV dataset file
+
+    Returns:
+        Tuple containing the SummaryState of the whole file and the number of chunks read
+    """
+    raw_chunks = iter_csv_chunks(file_path, streaming_summary.STREAMING_CHUNK_ROWS)
+    first_chunk = next(raw_chunks, None)
+    if first_chunk is None:
+        first_chunk = pd.DataFrame()
+    schema = infer_schema(first_chunk)
+
+    state = None
+    chunk_count = 0
+    for chunk in itertools.chain([first_chunk], raw_chunks):
+        chunk, _ = apply_schema(chunk, schema)
+        if state is None:
+            state = start_summary_state(chunk, schema)
+        state.update(chunk)
+        chunk_count += 1
+    return state, chunk_count
+
+def summarize_loaded_dataset(file_path: str) -> SummaryState:
+    """
+    Build the summary state of a dataset from its cached typed frame.
+
+    Datasets that are explored in memory are already loaded; summarizing the
+    cached frame in slices gives the state of a chunked pass without parsing
+    the file again.
+
+    Args:
+        file_path: Path to a CSV dataset file
+
+    Returns:
+        The SummaryState of the whole file
+    """
+    df, _ = load_dataframe(file_path)
+    chunk_rows = streaming_summary.STREAMING_CHUNK_ROWS
+    # Slices get plain dtypes, as the chunks of build_summary_state have
+    state = start_summary_state(widen_dtypes(df.iloc[:chunk_rows]), get_dataset_schema(file_path))
+    for start in range(0, max(len(df), 1), chunk_rows):
+        state.update(widen_dtypes(df.iloc[start:start + chunk_rows]))
+    return state
+
+def render_summary_state(state: SummaryState, load_message: str) -> Dict[str, Any]:
+    """
+    Build the exploration result (summary and charts) of a summary state.
+
+    Args:
+        state: Summary state of a dataset
+        load_message: Message describing how the data was read
+
+    Returns:
+        Dictionary containing ECharts configurations and summary info.
+    """
+    grouped_frames = {cat: accumulator.to_frame() for cat, accumulator in state.grouped_sums.items()}
+    visualizations, chart_timings, downsampling = _render_charts(
+        state.plan, lambda cat: grouped_frames.get(cat, pd.DataFrame()))
+
+    final_result = {
+        "load_message": load_message,
+        "summary": state.summary.to_summary(),
+        "visualizations": visualizations,
+        "chart_timings_ms": chart_timings,
+        "downsampling": downsampling
+    }
+    return final_result
+
+def get_streaming_visualizations(file_path: str) -> Dict[str, Any]:
+    """
+    Generate the dataset summary and visualizations in a single chunked pass.
+
+    Distinct counts, medians, quartiles and top values are estimated with
+    sketches; chart data comes from group sums merged chunk by chunk.
+
+    Args:
+        file_path: Path to a CSV dataset file
+
+    Returns:
+        Dictionary containing ECharts configurations and summary info.
+    """
+    state, chunk_count = build_summary_state(file_path)
+    return render_summary_state(
+        state, f"Summarized {state.summary.num_rows} rows in {chunk_count} chunks (streaming mode)")
+
+def get_dataset_visualizations(file_path: str) -> Dict[str, Any]:
+    """
+    Generate a set of ECharts visualizations for a dataset, attempting to
+    dynamically identify relevant columns. The result may hold NaN or NumPy
+    values; encode it with src.json_encoding.dumps (as the API responses do).
+
+    Files larger than STREAMING_THRESHOLD_BYTES are summarized in streaming
+    mode instead of being loaded into memory.
+
+    Args:
+        file_path: Path to the dataset file
+
+    Returns:
+        Dictionary containing ECharts configurations and summary info.
+    """
+    if should_stream(file_path):
+        try:
+            return get_streaming_visualizations(file_path)
+        except Exception as e:
+            print(f"Streaming summary failed for {file_path}, loading it in memory: {str(e)}")
+
+    # Load the dataset
+    df, load_message = load_dataset(file_path)
+
+    # Generate summary (already handles NaN conversion)
+    summary = get_dataset_summary(df)
+
+    # Dynamically identify columns for charts, from the column profiles of the summary,
+    # and build them from the full DataFrame
+    plan = _plan_charts(build_column_index(summary, df.dtypes.to_dict()))
+    # Charts sharing a category column are built from one cached multi-column groupby, run by
+    # whichever chart needs it first while the others wait for the cached result
+    value_cols_by_category = {
+        cat: values for cat, values in _value_columns_by_category(plan).items()
+        if cat in df.columns and all(value_col in df.columns for value_col in values)
     }
+    # The placeholder frame of a failed load must not be cached under the file's key
+    dataset_key = None if load_message.startswith("Failed to load") else get_dataset_key(file_path)
+    # Profiled datasets have a rollup cube answering the sums in O(groups)
+    rollup = load_rollup_cube(file_path) if dataset_key is not None else None
 
-    # --- Ensure final result is JSON serializable ---
+    def frame_for(cat: Optional[str]) -> pd.DataFrame:
+        if cat not in value_cols_by_category:
+            return df
+        return aggregate(df, dataset_key, cat, value_cols_by_category[cat], rollup=rollup)
+
+    visualizations, chart_timings, downsampling = _render_charts(plan, frame_for)
+
+    # Any NaN or NumPy value left in the charts is converted when the result is encoded (src.json_encoding)
     final_result = {
         "load_message": load_message,
         "summary": summary, # Summary already handles NaN
-        "visualizations": visualizations # Chart functions should handle NaN
+        "visualizations": visualizations,
+        "chart_timings_ms": chart_timings,
+        "downsampling": downsampling
     }
+    return final_result
+
+def get_correlation_visualization(file_path: str, prompt: str) -> Optional[Dict[str, Any]]:
+    """
+    Answer a prompt asking for correlations with a heatmap of the dataset's
+    cached correlation matrix, without the agents.
+
+    Numeric columns named in the prompt restrict the heatmap to them when
+    there are at least two of them.
+
+    Args:
+        file_path: Path to the dataset file
+        prompt: The user's prompt
 
-    # Recursively replace NaN with None in the final structure
-    def replace_nan_with_none(obj):
-        if isinstance(obj, dict):
-            return {k: replace_nan_with_none(v) for k, v in obj.items()}
-        elif isinstance(obj, list):
-            return [replace_nan_with_none(elem) for elem in obj]
-        # Check for both numpy NaN and standard float NaN
-        elif isinstance(obj, float) and np.isnan(obj):
-            return None
-        # Handle potential pandas NaT (Not a Time) values if date columns exist
-        elif pd.isna(obj) and not isinstance(obj, (str, bool, int)): # Avoid converting valid types
-             return None
-        return obj
-
-    return replace_nan_with_none(final_result)
+    Returns:
+        A response shaped like the agents' (visualizations, code blocks,
+        outputs and errors), or None if the prompt does not ask for
+        correlations or the dataset has fewer than two numeric columns
+    """
+    method = match_correlation_prompt(prompt)
+    if method is None:
+        return None
+    correlations = get_correlations(file_path, method)
+    if len(correlations["columns"]) < 2:
+        return None
+    mentioned = [col for col in correlations["columns"] if str(col).lower() in prompt.lower()]
+    columns = mentioned if len(mentioned) >= 2 else None
+    chart = generate_correlation_heatmap(None, columns, f"{method.capitalize()} correlation of numeric columns",
+                                         method, correlations)
+    return {
+        "visualizations": [chart],
+        "downsampling": [None],
+        "code_blocks": [],
+        "outputs": [],
+        "errors": [],
+        "source": "correlation_cache"
+    }
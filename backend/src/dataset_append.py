@@ -0,0 +1,184 @@
+"""
+Dataset Append for Agentic Dashboard App.
+
+This module appends rows to a stored CSV dataset. The new rows are parsed
+and converted with the dataset's schema, then added to its persisted summary
+state: running counts, means and variances, extrema, missing counts, the
+distinct-value, quantile and top-value sketches and the group sums behind the
+overview charts, and the dataset's rollup cube. The summary and charts of the extended dataset are rendered
+from that state, so the statistics of a refresh cost time proportional to the
+appended rows rather than to the whole history.
+
+Because uploads are content-addressed, the extended file is stored as a new
+dataset; the existing rows are copied byte for byte and never parsed again.
+"""
+
+import io
+import os
+import codecs
+import shutil
+import tempfile
+from typing import Dict, Any, BinaryIO, List
+
+import pandas as pd
+
+from src.data_exploration_service import build_summary_state, render_summary_state
+from src.dataset_loader import CHUNKABLE_EXTENSIONS, sniff_csv_dialect
+from src.profiling_service import store_profile
+from src.rollup_cube import load_rollup_cube, save_rollup_cube
+from src.schema_inference import apply_schema
+from src.streaming_summary import SummaryState, load_summary_state, save_summary_state
+from src.upload_store import store_upload, UPLOAD_CHUNK_BYTES
+
+
+class DatasetAppendError(ValueError):
+    """Exception raised when rows cannot be appended to a dataset."""
+    pass
+
+
+class _AppendReader:
+    """File-like reader returning the bytes of a file followed by extra bytes."""
+
+    def __init__(self, path: str, extra: bytes, encoding: str = 'utf-8'):
+        self._file = open(path, 'rb')
+        self._extra = extra
+        # A missing final line break is added in the file's encoding
+        self._newline = '\n'.encode(encoding)
+        self._needs_newline = False
+        self._file.seek(0, os.SEEK_END)
+        if self._file.tell() >= len(self._newline):
+            self._file.seek(-len(self._newline), os.SEEK_END)
+            self._needs_newline = self._file.read() not in (self._newline, '\r'.encode(encoding))
+        self._file.seek(0)
+
+    def read(self, size: int = -1) -> bytes:
+        block = self._file.read(size)
+        if block:
+            return block
+        if self._needs_newline:
+            self._needs_newline = False
+            return self._newline
+        block, self._extra = self._extra, b''
+        return block
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def get_summary_state(file_path: str) -> SummaryState:
+    """
+    Return the persisted summary state of a CSV dataset, building it if needed.
+
+    Datasets profiled after upload already have one; otherwise the file is
+    summarized once in a chunked pass and the state is stored for later appends.
+
+    Args:
+        file_path: Path to the dataset file
+
+    Returns:
+        The summary state of the whole file
+    """
+    state = load_summary_state(file_path)
+    if state is None:
+        state, _ = build_summary_state(file_path)
+        save_summary_state(file_path, state)
+    return state
+
+
+def _bomless_encoding(file_path: str, encoding: str) -> str:
+    """
+    Return the codec that writes text in a file's encoding without a byte order mark.
+
+    Encodings detected from a BOM would prefix every encoded block with a new
+    one, which must not end up in the middle of the file.
+    """
+    if encoding == 'utf-8-sig':
+        return 'utf-8'
+    if encoding == 'utf-16':
+        with open(file_path, 'rb') as f:
+            return 'utf-16-be' if f.read(2) == codecs.BOM_UTF16_BE else 'utf-16-le'
+    return encoding
+
+
+def _read_delta(delta_path: str, columns: List[str]) -> pd.DataFrame:
+    """Read new rows as text, so their values are copied exactly as they were written."""
+    dialect = sniff_csv_dialect(delta_path)
+    try:
+        delta = pd.read_csv(delta_path, dtype=str, keep_default_na=False,
+                            encoding=dialect["encoding"], delimiter=dialect["delimiter"])
+    except Exception as e:
+        raise DatasetAppendError(f"Could not parse the appended rows: {str(e)}")
+    if [str(col) for col in delta.columns] != [str(col) for col in columns]:
+        raise DatasetAppendError(
+            f"Appended columns {list(delta.columns)} do not match the dataset columns {list(columns)}")
+    return delta
+
+
+def append_rows(file_path: str, stream: BinaryIO, upload_folder: str) -> Dict[str, Any]:
+    """
+    Append the rows of a CSV file to a stored CSV dataset.
+
+    The new rows must have the same columns, in the same order, as the
+    dataset; they may use a different delimiter or encoding and are rewritten
+    in the dataset's own dialect.
+
+    Args:
+        file_path: Path of the dataset to extend
+        stream: Readable binary stream of a CSV file with a header row
+        upload_folder: Root directory of the upload store
+
+    Returns:
+        The result of store_upload for the extended dataset, plus the number
+        of 'appended_rows', the new 'num_rows', the dataset 'schema' and its
+        exploration 'result'
+
+    Raises:
+        DatasetAppendError: If the dataset is not a CSV file or the rows do not fit it
+    """
+    if os.path.splitext(file_path)[1].lower() not in CHUNKABLE_EXTENSIONS:
+        raise DatasetAppendError("Rows can only be appended to CSV datasets")
+
+    state = get_summary_state(file_path)
+    columns = state.summary.columns
+    dialect = sniff_csv_dialect(file_path)
+
+    fd, delta_path = tempfile.mkstemp(prefix='.append-', suffix='.csv', dir=upload_folder)
+    try:
+        with os.fdopen(fd, 'wb') as delta_file:
+            shutil.copyfileobj(stream, delta_file, UPLOAD_CHUNK_BYTES)
+        delta = _read_delta(delta_path, columns)
+    finally:
+        os.remove(delta_path)
+
+    # Rewrite the rows in the dataset's dialect, then parse them as the dataset's chunks are parsed
+    delta_text = delta.to_csv(sep=dialect["delimiter"], header=False, index=False, lineterminator='\n')
+    encoding = _bomless_encoding(file_path, dialect["encoding"])
+    delta_bytes = delta_text.encode(encoding, errors='replace')
+    chunk = pd.read_csv(io.BytesIO(delta_bytes), header=None, names=columns,
+                        encoding=encoding, delimiter=dialect["delimiter"])
+    chunk, _ = apply_schema(chunk, state.schema)
+    state.update(chunk)
+    rollup = load_rollup_cube(file_path)
+    if rollup is not None:
+        rollup = rollup.copy()
+        rollup.update(chunk)
+
+    reader = _AppendReader(file_path, delta_bytes, encoding)
+    try:
+        stored = store_upload(reader, os.path.basename(file_path), upload_folder)
+    finally:
+        reader.close()
+
+    result = render_summary_state(
+        state, f"Appended {len(chunk)} rows; summary updated incrementally ({state.summary.num_rows} rows)")
+    save_summary_state(stored["path"], state)
+    if rollup is not None:
+        # Stored before the profile, so profiling does not roll up the whole file again
+        save_rollup_cube(stored["path"], rollup)
+    store_profile(stored["path"], result)
+
+    stored["appended_rows"] = len(chunk)
+    stored["num_rows"] = state.summary.num_rows
+    stored["schema"] = state.schema
+    stored["result"] = result
+    return stored
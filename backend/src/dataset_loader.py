@@ -0,0 +1,607 @@
+"""
+Dataset Loader for Agentic Dashboard App.
+
+This module provides the single dataset loader shared by the agent, data
+exploration and code execution services, together with an in-process LRU
+cache of parsed, type-coerced DataFrames.
+"""
+
+import os
+import csv
+import io
+import threading
+from collections import Counter, OrderedDict
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.dataset_store import (
+    PYARROW_AVAILABLE, is_sidecar_fresh, read_sidecar, read_sidecar_schema, read_sidecar_columns, read_arrow_file
+)
+from src.schema_inference import infer_schema, apply_schema
+
+# Memory budget (in bytes) for the in-process DataFrame cache
+DATASET_CACHE_MAX_BYTES = int(os.getenv("DATASET_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+EXCEL_EXTENSIONS = ['.xlsx', '.xls', '.xlsm', '.xlsb', '.odf', '.ods', '.odt']
+CSV_ENCODINGS = ['latin-1', 'utf-8', 'cp1252', 'iso-8859-1']
+CSV_DELIMITERS = [';', ',', '\t', '|']
+
+# Convert low-cardinality strings to categoricals and downcast numbers after loading
+COMPACT_DTYPES = os.getenv("COMPACT_DTYPES", "true").lower() == "true"
+
+# Object columns with at most this ratio of distinct to non-null values become categoricals
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+
+# Text formats that can be parsed in chunks by iter_csv_chunks
+CHUNKABLE_EXTENSIONS = ['.csv', '.tsv', '.txt']
+
+# Number of leading bytes inspected to detect the CSV encoding and delimiter
+SNIFF_SAMPLE_BYTES = 64 * 1024
+
+# Maximum number of files whose detected dialect is remembered
+MAX_CACHED_DIALECTS = 256
+
+
+class DatasetLoadError(ValueError):
+    """Exception raised when a dataset cannot be loaded with any supported method."""
+    pass
+
+
+class DataFrameCache:
+    """
+    Thread-safe LRU cache of loaded DataFrames bounded by a memory budget.
+
+    Entries are keyed by (absolute path, size, mtime) so that a file which is
+    overwritten on disk is never served from a stale entry.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Tuple[str, int, int], Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[str, int, int]) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def peek(self, key: Tuple[str, int, int]) -> Optional[Dict[str, Any]]:
+        """Return an entry without counting a lookup or refreshing its recency."""
+        with self._lock:
+            return self._entries.get(key)
+
+    def put(self, key: Tuple[str, int, int], df: pd.DataFrame, message: str,
+            schema: Optional[Dict[str, Dict[str, Any]]] = None) -> None:
+        size = int(df.memory_usage(deep=True).sum())
+        if size > self.max_bytes:
+            # Never let a single dataset flush the whole cache
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old["size"]
+            self._entries[key] = {"df": df, "message": message, "schema": schema, "size": size}
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= evicted["size"]
+                self.evictions += 1
+
+    def invalidate(self, file_path: str) -> None:
+        """Drop every cached entry for the given file, whatever its size/mtime."""
+        path = os.path.abspath(file_path)
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == path]:
+                self.current_bytes -= self._entries.pop(key)["size"]
+
+    def clear(self) -> None:
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "current_bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            }
+
+
+_dataset_cache = DataFrameCache(DATASET_CACHE_MAX_BYTES)
+
+# Detected CSV dialects, keyed like the DataFrame cache
+_dialect_cache: "OrderedDict[Tuple[str, int, int], Dict[str, str]]" = OrderedDict()
+_dialect_lock = threading.Lock()
+
+
+def get_cache_key(file_path: str) -> Optional[Tuple[str, int, int]]:
+    """
+    Build the cache key for a dataset file.
+
+    Args:
+        file_path: Path to the dataset file
+
+    Returns:
+        Tuple of (absolute path, size, mtime in ns), or None if the file cannot be stat'ed
+    """
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+
+
+def detect_encoding(sample: bytes) -> str:
+    """
+    Detect the character encoding of a byte sample.
+
+    Args:
+        sample: Leading bytes of the file
+
+    Returns:
+        Name of the encoding to pass to pandas
+    """
+    if sample.startswith(b'\xef\xbb\xbf'):
+        return 'utf-8-sig'
+    if sample.startswith(b'\xff\xfe') or sample.startswith(b'\xfe\xff'):
+        return 'utf-16'
+
+    try:
+        sample.decode('utf-8')
+        return 'utf-8'
+    except UnicodeDecodeError as e:
+        # The sample may end in the middle of a multi-byte character
+        if e.reason == 'unexpected end of data' and e.start >= len(sample) - 3:
+            return 'utf-8'
+
+    # Bytes 0x80-0x9f are control characters in latin-1 but printable in cp1252 (e.g. the euro sign)
+    if any(0x80 <= byte <= 0x9f for byte in sample):
+        try:
+            sample.decode('cp1252')
+            return 'cp1252'
+        except UnicodeDecodeError:
+            pass
+    return 'latin-1'
+
+
+def detect_delimiter(text: str, truncated: bool = False) -> str:
+    """
+    Pick the candidate delimiter that splits the sample into the most
+    consistent number of fields per record.
+
+    Args:
+        text: Decoded sample of the file
+        truncated: Whether the sample was cut off, in which case the last record is ignored
+
+    Returns:
+        The detected delimiter (',' if no candidate splits the records)
+    """
+    best_delimiter = ','
+    best_score = None
+    for delimiter in CSV_DELIMITERS:
+        try:
+            rows = [row for row in csv.reader(io.StringIO(text), delimiter=delimiter) if row]
+        except csv.Error:
+            continue
+        if truncated and len(rows) > 1:
+            rows = rows[:-1]
+        if not rows:
+            continue
+
+        field_counts = [len(row) for row in rows]
+        mode_count, mode_frequency = Counter(field_counts).most_common(1)[0]
+        if mode_count < 2:
+            continue
+
+        consistency = mode_frequency / len(field_counts)
+        header_matches = field_counts[0] == mode_count
+        score = (consistency, header_matches, mode_count)
+        if best_score is None or score > best_score:
+            best_delimiter, best_score = delimiter, score
+
+    return best_delimiter
+
+
+def sniff_csv_dialect(file_path: str) -> Dict[str, str]:
+    """
+    Detect the encoding and delimiter of a CSV file from its first bytes.
+
+    The result is remembered per (path, size, mtime), so re-loading an
+    unchanged file skips detection entirely.
+
+    Args:
+        file_path: Path to the CSV file
+
+    Returns:
+        Dictionary with 'encoding' and 'delimiter' keys
+
+    Raises:
+        OSError: If the file cannot be read
+    """
+    key = get_cache_key(file_path)
+    if key is not None:
+        with _dialect_lock:
+            dialect = _dialect_cache.get(key)
+            if dialect is not None:
+                _dialect_cache.move_to_end(key)
+                return dialect
+
+    with open(file_path, 'rb') as f:
+        sample = f.read(SNIFF_SAMPLE_BYTES)
+
+    encoding = detect_encoding(sample)
+    text = sample.decode(encoding, errors='ignore')
+    dialect = {
+        "encoding": encoding,
+        "delimiter": detect_delimiter(text, truncated=len(sample) == SNIFF_SAMPLE_BYTES),
+    }
+
+    if key is not None:
+        with _dialect_lock:
+            _dialect_cache[key] = dialect
+            while len(_dialect_cache) > MAX_CACHED_DIALECTS:
+                _dialect_cache.popitem(last=False)
+    return dialect
+
+
+def read_dataset_file(file_path: str) -> Tuple[pd.DataFrame, str]:
+    """
+    Parse a dataset file, trying the format suggested by its extension first
+    and then CSV. CSV files are parsed once with the sniffed dialect; the
+    exhaustive encoding/delimiter search is only a fallback.
+
+    Args:
+        file_path: Path to the dataset file
+
+    Returns:
+        Tuple containing the raw DataFrame and a message about the loading process
+
+    Raises:
+        DatasetLoadError: If no supported method could parse the file
+    """
+    message = ""
+    df = None
+    error_messages = []
+
+    # First try to determine file type from extension
+    file_extension = os.path.splitext(file_path)[1].lower()
+
+    if file_extension in EXCEL_EXTENSIONS:
+        try:
+            df = pd.read_excel(file_path)
+            message = f"Successfully loaded Excel file based on extension {file_extension}"
+        except Exception as e:
+            error_messages.append(f"Failed to load Excel file: {str(e)}")
+    elif file_extension in ['.json']:
+        try:
+            df = pd.read_json(file_path)
+            message = "Successfully loaded JSON file"
+        except Exception as e:
+            error_messages.append(f"Failed to load JSON file: {str(e)}")
+    elif file_extension in ['.parquet']:
+        try:
+            df = pd.read_parquet(file_path)
+            message = "Successfully loaded Parquet file"
+        except Exception as e:
+            error_messages.append(f"Failed to load Parquet file: {str(e)}")
+    elif file_extension in ['.feather', '.arrow']:
+        try:
+            if PYARROW_AVAILABLE:
+                # Memory-map the Arrow IPC file so worker processes share its pages
+                df = read_arrow_file(file_path)
+            else:
+                df = pd.read_feather(file_path)
+            message = "Successfully loaded Feather file"
+        except Exception as e:
+            error_messages.append(f"Failed to load Feather file: {str(e)}")
+    elif file_extension in ['.h5', '.hdf5']:
+        try:
+            df = pd.read_hdf(file_path)
+            message = "Successfully loaded HDF5 file"
+        except Exception as e:
+            error_messages.append(f"Failed to load HDF5 file: {str(e)}")
+
+    # Parse CSV once with the dialect detected from a sample of the file
+    if df is None:
+        try:
+            dialect = sniff_csv_dialect(file_path)
+            # Bytes past the sample may not fit a UTF-8 guess; only then retry with 8-bit encodings
+            encodings = [dialect["encoding"]] + [enc for enc in ['cp1252', 'latin-1'] if enc != dialect["encoding"]]
+            for encoding in encodings:
+                try:
+                    df = pd.read_csv(file_path, encoding=encoding, delimiter=dialect["delimiter"])
+                    message = (f"Successfully loaded CSV with encoding={encoding}, "
+                               f"delimiter={dialect['delimiter']} (detected from sample)")
+                    break
+                except UnicodeDecodeError as e:
+                    error_messages.append(f"Failed with detected delimiter and encoding={encoding}: {str(e)}")
+        except Exception as e:
+            error_messages.append(f"Failed with detected dialect: {str(e)}")
+
+    # Try CSV with different encodings and delimiters if still not loaded
+    if df is None:
+        for encoding in CSV_ENCODINGS:
+            for delimiter in CSV_DELIMITERS:
+                try:
+                    df = pd.read_csv(file_path, encoding=encoding, delimiter=delimiter)
+                    message = f"Successfully loaded CSV with encoding={encoding}, delimiter={delimiter}"
+                    break
+                except Exception as e:
+                    error_messages.append(f"Failed with encoding={encoding}, delimiter={delimiter}: {str(e)}")
+                    continue
+            if df is not None:
+                break
+
+    # If all attempts failed, try with pandas defaults and finally Excel
+    if df is None:
+        try:
+            df = pd.read_csv(file_path)
+            message = "Successfully loaded CSV with pandas defaults"
+        except Exception:
+            try:
+                df = pd.read_excel(file_path)
+                message = "Successfully loaded Excel file as last resort"
+            except Exception as excel_e:
+                error_detail = "\n".join(error_messages)
+                raise DatasetLoadError(
+                    f"Failed to load dataset with all attempted methods:\n{error_detail}\nExcel attempt: {str(excel_e)}"
+                )
+
+    return df, message
+
+
+def iter_csv_chunks(file_path: str, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    """
+    Parse a CSV file in chunks with the dialect sniffed from its first bytes.
+
+    Only one chunk is held in memory at a time. Bytes that do not fit the
+    detected encoding are replaced instead of aborting halfway through the file.
+
+    Args:
+        file_path: Path to the CSV file
+        chunk_rows: Maximum number of rows per chunk
+
+    Yields:
+        Raw DataFrames of at most chunk_rows rows
+    """
+    dialect = sniff_csv_dialect(file_path)
+    with pd.read_csv(file_path, encoding=dialect["encoding"], delimiter=dialect["delimiter"],
+                     chunksize=chunk_rows, encoding_errors='replace') as reader:
+        for chunk in reader:
+            yield chunk
+
+
+def _format_bytes(num_bytes: int) -> str:
+    """Format a byte count as a human readable string."""
+    return f"{num_bytes / (1024 * 1024):.1f} MB" if num_bytes >= 1024 * 1024 else f"{num_bytes / 1024:.1f} KB"
+
+
+def compact_dtypes(df: pd.DataFrame) -> Tuple[pd.DataFrame, int]:
+    """
+    Shrink the memory footprint of a DataFrame without losing information.
+
+    Object columns with few distinct values become categoricals (integer codes
+    plus one copy of each string) and integers are downcast to the smallest
+    type that holds their range. Floats stay float64: sums and means over
+    float32 columns lose precision on large amounts.
+
+    Args:
+        df: The type-converted DataFrame, modified in place
+
+    Returns:
+        Tuple containing the DataFrame and the number of bytes saved
+    """
+    before = int(df.memory_usage(deep=True).sum())
+    for col in df.columns:
+        series = df[col]
+        try:
+            if pd.api.types.is_object_dtype(series):
+                non_null = int(series.count())
+                if non_null > 0 and series.nunique() / non_null <= CATEGORY_MAX_UNIQUE_RATIO:
+                    df[col] = series.astype('category')
+            elif pd.api.types.is_integer_dtype(series) and not pd.api.types.is_bool_dtype(series):
+                df[col] = pd.to_numeric(series, downcast='integer')
+        except (TypeError, ValueError):
+            # Unhashable or mixed values: keep the column as it is
+            continue
+    return df, before - int(df.memory_usage(deep=True).sum())
+
+
+def widen_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Return a copy of a compacted DataFrame with general-purpose dtypes.
+
+    Categoricals become object columns and narrow numbers become int64/float64,
+    so arbitrary code can assign new values or compute without overflowing.
+
+    Args:
+        df: The (possibly compacted) DataFrame
+
+    Returns:
+        A new DataFrame safe to mutate
+    """
+    dtypes = {}
+    for col in df.columns:
+        dtype = df[col].dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            dtypes[col] = object
+        elif pd.api.types.is_integer_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype) and dtype != np.int64:
+            dtypes[col] = np.int64
+        elif pd.api.types.is_float_dtype(dtype) and dtype != np.float64:
+            dtypes[col] = np.float64
+    return df.astype(dtypes) if dtypes else df.copy()
+
+
+def _load_entry(file_path: str, use_cache: bool = True) -> Dict[str, Any]:
+    """Load a dataset and its schema, going through the DataFrame cache."""
+    key = get_cache_key(file_path) if use_cache else None
+    if key is not None:
+        entry = _dataset_cache.get(key)
+        if entry is not None:
+            return entry
+
+    df = None
+    schema = None
+    if is_sidecar_fresh(file_path):
+        # Typed columns written at upload time: no text parsing or type inference needed
+        try:
+            df = read_sidecar(file_path)
+            schema = read_sidecar_schema(file_path) or infer_schema(df)
+            message = f"Successfully loaded typed columnar sidecar for {os.path.basename(file_path)}"
+        except Exception as e:
+            print(f"Warning: failed to read columnar sidecar for {file_path}: {str(e)}")
+            df = None
+
+    if df is None:
+        df, message = read_dataset_file(file_path)
+        # Decide every column's type from a sample, then convert in one pass per column
+        schema = infer_schema(df)
+        df, conversion_messages = apply_schema(df, schema)
+        for conversion_message in conversion_messages:
+            message += f"\n{conversion_message}"
+        if COMPACT_DTYPES:
+            df, saved_bytes = compact_dtypes(df)
+            if saved_bytes > 0:
+                message += f"\nCompacted column types, saving {_format_bytes(saved_bytes)}"
+
+    if key is not None:
+        _dataset_cache.put(key, df, message, schema)
+
+    return {"df": df, "message": message, "schema": schema}
+
+
+def load_dataframe(file_path: str, use_cache: bool = True) -> Tuple[pd.DataFrame, str]:
+    """
+    Load a dataset, returning a cached copy when the file has not changed.
+
+    A typed columnar sidecar newer than the source file is preferred over
+    parsing the source itself.
+
+    The returned DataFrame is shared between callers and must be treated as
+    read-only; take a copy before mutating it.
+
+    Args:
+        file_path: Path to the dataset file
+        use_cache: Whether to consult and populate the in-process cache
+
+    Returns:
+        Tuple containing the loaded DataFrame and a message about the loading process
+
+    Raises:
+        DatasetLoadError: If the file could not be parsed
+    """
+    entry = _load_entry(file_path, use_cache)
+    return entry["df"], entry["message"]
+
+
+def get_dataset_schema(file_path: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Return the inferred schema of a dataset, loading it if necessary.
+
+    Args:
+        file_path: Path to the dataset file
+
+    Returns:
+        Dictionary mapping column names to their type specification
+    """
+    return _load_entry(file_path)["schema"]
+
+
+def get_dataset_columns(file_path: str) -> List[Any]:
+    """
+    Return the column names of a dataset as cheaply as possible.
+
+    The cached frame or the footer of a fresh sidecar is used when available;
+    otherwise the dataset is loaded (and cached).
+
+    Args:
+        file_path: Path to the dataset file
+
+    Returns:
+        The column names, in order
+    """
+    key = get_cache_key(file_path)
+    entry = _dataset_cache.peek(key) if key is not None else None
+    if entry is not None:
+        return list(entry["df"].columns)
+    if is_sidecar_fresh(file_path):
+        try:
+            return read_sidecar_columns(file_path)
+        except Exception as e:
+            print(f"Warning: failed to read columnar sidecar schema for {file_path}: {str(e)}")
+    df, _ = load_dataframe(file_path)
+    return list(df.columns)
+
+
+def load_dataframe_columns(file_path: str, columns: List[Any]) -> Tuple[pd.DataFrame, str]:
+    """
+    Load a subset of the columns of a dataset.
+
+    The columns are selected from the cached frame when present, or read on
+    their own from a fresh columnar sidecar; otherwise the whole dataset is
+    loaded (and cached) and then projected.
+
+    Args:
+        file_path: Path to the dataset file
+        columns: Names of the columns to load; all must exist
+
+    Returns:
+        Tuple containing the projected DataFrame and a message about the loading process
+    """
+    key = get_cache_key(file_path)
+    entry = _dataset_cache.peek(key) if key is not None else None
+    if entry is not None:
+        total = len(entry["df"].columns)
+        return entry["df"][columns], f"Selected {len(columns)} of {total} columns from the cached dataset"
+
+    if is_sidecar_fresh(file_path):
+        try:
+            df = read_sidecar(file_path, columns=columns)
+            return df, f"Loaded {len(columns)} referenced columns from the columnar sidecar"
+        except Exception as e:
+            print(f"Warning: failed to read columns from the columnar sidecar for {file_path}: {str(e)}")
+
+    df, message = load_dataframe(file_path)
+    return df[columns], f"{message}\nSelected {len(columns)} of {len(df.columns)} columns"
+
+
+def invalidate_dataset(file_path: str) -> None:
+    """Remove all cached data for a dataset file."""
+    _dataset_cache.invalidate(file_path)
+    path = os.path.abspath(file_path)
+    with _dialect_lock:
+        for key in [k for k in _dialect_cache if k[0] == path]:
+            del _dialect_cache[key]
+
+
+def clear_dataset_cache() -> None:
+    """Remove every entry from the DataFrame and dialect caches."""
+    _dataset_cache.clear()
+    with _dialect_lock:
+        _dialect_cache.clear()
+
+
+def get_dataset_cache_stats() -> Dict[str, Any]:
+    """Return hit/miss counters and memory usage of the DataFrame cache."""
+    return _dataset_cache.stats()
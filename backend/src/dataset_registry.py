@@ -0,0 +1,181 @@
+"""
+Dataset Registry for Agentic Dashboard App.
+
+This module keeps a small embedded catalog (SQLite) of the datasets known to
+the backend. Every upload gets a dataset ID that clients pass to the other
+endpoints, so concurrent users each work on their own dataset instead of
+sharing a single "last uploaded" file. The catalog records where each
+dataset and its derived files live, its schema, row count and when it was
+last used.
+"""
+
+import os
+import json
+import uuid
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+# Location of the catalog; by default a file inside the upload folder
+DATASET_REGISTRY_PATH = os.getenv("DATASET_REGISTRY_PATH")
+
+# File name of the catalog when DATASET_REGISTRY_PATH is not set
+DATASET_REGISTRY_FILE = 'registry.sqlite3'
+
+# Columns that can be updated with set_metadata
+METADATA_FIELDS = ['schema', 'num_rows', 'sidecar_path', 'profile_path']
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS datasets (
+    dataset_id TEXT PRIMARY KEY,
+    filename TEXT NOT NULL,
+    path TEXT NOT NULL,
+    sha256 TEXT,
+    parent_id TEXT,
+    schema TEXT,
+    num_rows INTEGER,
+    sidecar_path TEXT,
+    profile_path TEXT,
+    created_at TEXT NOT NULL,
+    last_accessed TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS datasets_path ON datasets (path);
+"""
+
+
+def _row_to_record(row: sqlite3.Row) -> Dict[str, Any]:
+    record = dict(row)
+    record["schema"] = json.loads(record["schema"]) if record["schema"] else None
+    return record
+
+
+class DatasetRegistry:
+    """Thread-safe catalog of datasets, keyed by dataset ID."""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        with self._lock, self._connection:
+            self._connection.executescript(_SCHEMA)
+
+    def register(self, path: str, filename: str, sha256: Optional[str] = None,
+                 parent_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Add a dataset to the catalog under a new ID.
+
+        Args:
+            path: Path of the data file
+            filename: Original file name of the upload
+            sha256: Content hash of the data file, for stored uploads
+            parent_id: ID of the dataset this one was derived from (e.g. by appending rows)
+
+        Returns:
+            The new catalog record, including its 'dataset_id'
+        """
+        now = datetime.now().isoformat()
+        dataset_id = uuid.uuid4().hex
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT INTO datasets (dataset_id, filename, path, sha256, parent_id, created_at, last_accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (dataset_id, filename, os.path.abspath(path), sha256, parent_id, now, now)
+            )
+        return self.get(dataset_id)
+
+    def get(self, dataset_id: str) -> Optional[Dict[str, Any]]:
+        """Return the catalog record of a dataset, or None if the ID is unknown."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT * FROM datasets WHERE dataset_id = ?", (dataset_id,)).fetchone()
+        return _row_to_record(row) if row is not None else None
+
+    def find_upload(self, path: str, sha256: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the most recently used upload of the same content at the same path.
+
+        Args:
+            path: Path of the data file
+            sha256: Content hash of the data file
+
+        Returns:
+            The catalog record, or None if the content was not uploaded before
+            (datasets derived from others, e.g. by appending rows, are not matched)
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT * FROM datasets WHERE path = ? AND sha256 = ? AND parent_id IS NULL "
+                "ORDER BY last_accessed DESC LIMIT 1", (os.path.abspath(path), sha256)).fetchone()
+        return _row_to_record(row) if row is not None else None
+
+    def touch(self, dataset_id: str, filename: Optional[str] = None) -> None:
+        """Record that a dataset was just used, optionally under a new file name."""
+        with self._lock, self._connection:
+            if filename is not None:
+                self._connection.execute(
+                    "UPDATE datasets SET filename = ? WHERE dataset_id = ?", (filename, dataset_id))
+            self._connection.execute(
+                "UPDATE datasets SET last_accessed = ? WHERE dataset_id = ?",
+                (datetime.now().isoformat(), dataset_id)
+            )
+
+    def set_metadata(self, dataset_id: str, **fields: Any) -> None:
+        """
+        Update the metadata of a dataset.
+
+        Args:
+            dataset_id: ID of the dataset
+            **fields: Values for any of METADATA_FIELDS; the schema is stored as JSON
+
+        Raises:
+            ValueError: If a field is not one of METADATA_FIELDS
+        """
+        unknown = [name for name in fields if name not in METADATA_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown dataset metadata fields: {unknown}")
+        if not fields:
+            return
+        if "schema" in fields and fields["schema"] is not None:
+            fields["schema"] = json.dumps(fields["schema"])
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock, self._connection:
+            self._connection.execute(
+                f"UPDATE datasets SET {assignments} WHERE dataset_id = ?",
+                list(fields.values()) + [dataset_id]
+            )
+
+    def list(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """Return the catalog records, most recently used first."""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT * FROM datasets ORDER BY last_accessed DESC LIMIT ?", (limit,)).fetchall()
+        return [_row_to_record(row) for row in rows]
+
+    def remove_path(self, path: str) -> int:
+        """
+        Remove every dataset stored at a path, e.g. after the upload store evicted it.
+
+        Args:
+            path: Path of the removed data file
+
+        Returns:
+            Number of catalog records removed
+        """
+        with self._lock, self._connection:
+            cursor = self._connection.execute(
+                "DELETE FROM datasets WHERE path = ?", (os.path.abspath(path),))
+        return cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+def get_registry_path(upload_folder: str) -> str:
+    """Return the catalog location: DATASET_REGISTRY_PATH, or a file in the upload folder."""
+    return DATASET_REGISTRY_PATH or os.path.join(upload_folder, DATASET_REGISTRY_FILE)
@@ -0,0 +1,190 @@
+"""
+Dataset Store for Agentic Dashboard App.
+
+This module writes typed columnar sidecars next to uploaded datasets, so that
+later requests read already-coerced columns instead of re-parsing the CSV.
+
+By default the sidecar is an uncompressed Arrow IPC (Feather v2) file that is
+memory-mapped read-only. Every worker process maps the same file, so numeric
+columns are shared through the OS page cache instead of being copied into
+each process.
+"""
+
+import os
+import json
+from typing import Dict, Any, List, Optional
+
+import pandas as pd
+
+# pyarrow is needed for the columnar sidecars; without it uploads still work
+# and every request simply parses the original file.
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Sidecar format: "arrow" (memory-mapped Arrow IPC) or "parquet" (smaller on disk, always copied)
+SIDECAR_FORMAT = os.getenv("SIDECAR_FORMAT", "arrow").lower()
+
+# Suffixes appended to the source file name to build the sidecar path
+SIDECAR_SUFFIXES = {
+    "arrow": '.sidecar.arrow',
+    "parquet": '.sidecar.parquet',
+}
+
+# Key of the inferred dataset schema in the sidecar's Arrow schema metadata
+SCHEMA_METADATA_KEY = b'dataset_schema'
+
+# Formats that are already columnar and never need a sidecar
+COLUMNAR_EXTENSIONS = ['.parquet', '.feather', '.arrow']
+
+
+def get_sidecar_path(file_path: str) -> str:
+    """Return the path of the columnar sidecar for a dataset file."""
+    return file_path + SIDECAR_SUFFIXES.get(SIDECAR_FORMAT, SIDECAR_SUFFIXES["arrow"])
+
+
+def read_arrow_file(path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Memory-map an Arrow IPC / Feather file and convert it without copying.
+
+    Numeric columns without nulls keep pointing at the mapped pages (their
+    arrays are read-only); string columns are materialised as Python objects.
+
+    Args:
+        path: Path to the Arrow IPC or Feather file
+        columns: Optional subset of columns to read
+
+    Returns:
+        DataFrame backed by the memory-mapped file where possible
+    """
+    table = feather.read_table(path, columns=columns, memory_map=True)
+    return table.to_pandas(split_blocks=True)
+
+
+def is_sidecar_fresh(file_path: str) -> bool:
+    """
+    Check whether a dataset has a sidecar at least as new as the source file.
+
+    Args:
+        file_path: Path to the source dataset file
+
+    Returns:
+        True if the sidecar can be used instead of parsing the source
+    """
+    if not PYARROW_AVAILABLE:
+        return False
+    sidecar_path = get_sidecar_path(file_path)
+    try:
+        return os.stat(sidecar_path).st_mtime_ns >= os.stat(file_path).st_mtime_ns
+    except OSError:
+        return False
+
+
+def write_sidecar(file_path: str, df: pd.DataFrame, schema: Optional[Dict[str, Any]] = None) -> Optional[str]:
+    """
+    Write the typed DataFrame of a dataset as a columnar sidecar.
+
+    The file is written under a temporary name and renamed into place, so
+    concurrent readers never see a partial sidecar.
+
+    Args:
+        file_path: Path to the source dataset file
+        df: The loaded, type-coerced DataFrame
+        schema: Optional inferred schema stored alongside the columns
+
+    Returns:
+        Path of the written sidecar, or None if it could not be written
+    """
+    if not PYARROW_AVAILABLE:
+        return None
+    if os.path.splitext(file_path)[1].lower() in COLUMNAR_EXTENSIONS:
+        return None
+
+    sidecar_path = get_sidecar_path(file_path)
+    temp_path = f"{sidecar_path}.tmp-{os.getpid()}"
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if schema is not None:
+            metadata = dict(table.schema.metadata or {})
+            metadata[SCHEMA_METADATA_KEY] = json.dumps(schema).encode('utf-8')
+            table = table.replace_schema_metadata(metadata)
+        if sidecar_path.endswith('.parquet'):
+            pq.write_table(table, temp_path)
+        else:
+            # Uncompressed so that readers can map the column buffers directly
+            feather.write_feather(table, temp_path, compression='uncompressed')
+        os.replace(temp_path, sidecar_path)
+        return sidecar_path
+    except Exception as e:
+        # Mixed-type object columns cannot always be stored; fall back to the source file
+        print(f"Warning: could not write columnar sidecar for {file_path}: {str(e)}")
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        return None
+
+
+def read_sidecar(file_path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Read the columnar sidecar of a dataset.
+
+    Args:
+        file_path: Path to the source dataset file
+        columns: Optional subset of columns to read
+
+    Returns:
+        The typed DataFrame stored in the sidecar
+    """
+    sidecar_path = get_sidecar_path(file_path)
+    if sidecar_path.endswith('.parquet'):
+        return pd.read_parquet(sidecar_path, columns=columns)
+    return read_arrow_file(sidecar_path, columns=columns)
+
+
+def _read_sidecar_arrow_schema(file_path: str) -> "pa.Schema":
+    """Read the Arrow schema of a sidecar from its footer, without reading any column."""
+    sidecar_path = get_sidecar_path(file_path)
+    if sidecar_path.endswith('.parquet'):
+        return pq.read_schema(sidecar_path)
+    with pa.memory_map(sidecar_path, 'r') as source:
+        return pa.ipc.open_file(source).schema
+
+
+def read_sidecar_columns(file_path: str) -> List[str]:
+    """
+    Read the column names stored in a sidecar without loading its columns.
+
+    Args:
+        file_path: Path to the source dataset file
+
+    Returns:
+        The column names, in order
+    """
+    return list(_read_sidecar_arrow_schema(file_path).names)
+
+
+def read_sidecar_schema(file_path: str) -> Optional[Dict[str, Any]]:
+    """
+    Read the dataset schema stored in a sidecar without loading its columns.
+
+    Args:
+        file_path: Path to the source dataset file
+
+    Returns:
+        The stored schema, or None if the sidecar has none
+    """
+    metadata = _read_sidecar_arrow_schema(file_path).metadata
+    if not metadata or SCHEMA_METADATA_KEY not in metadata:
+        return None
+    return json.loads(metadata[SCHEMA_METADATA_KEY].decode('utf-8'))
+
+
+def remove_sidecar(file_path: str) -> None:
+    """Delete the sidecars of a dataset, in any format."""
+    for suffix in SIDECAR_SUFFIXES.values():
+        sidecar_path = file_path + suffix
+        if os.path.exists(sidecar_path):
+            os.remove(sidecar_path)
@@ -0,0 +1,293 @@
+"""
+Downsampling for Agentic Dashboard App.
+
+This module limits the number of points each chart series sends to the
+browser. Line and scatter series above the point budget are reduced with
+Largest-Triangle-Three-Buckets (Steinarsson, 2013), which keeps the visual
+shape of a line (peaks, troughs and trends) with a fixed number of points;
+bar series over an ordered axis keep the minimum and maximum of each bucket,
+so no spike disappears. Both ECharts configurations and Plotly figures
+(including their base64 typed arrays) are supported.
+"""
+
+import os
+import base64
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Maximum number of points kept per chart series
+DOWNSAMPLE_MAX_POINTS = int(os.getenv("DOWNSAMPLE_MAX_POINTS", "5000"))
+
+# Plotly trace attributes holding one value per point, subset together with x and y
+PLOTLY_POINT_ATTRIBUTES = ['x', 'y', 'text', 'hovertext', 'customdata', 'ids']
+PLOTLY_MARKER_POINT_ATTRIBUTES = ['color', 'size', 'symbol', 'opacity']
+
+
+def _finite_mean(values: np.ndarray, fallback: float) -> float:
+    """Mean of the non-NaN values, or the fallback if there are none."""
+    finite = values[~np.isnan(values)]
+    return float(finite.mean()) if len(finite) else fallback
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Select points of a line with Largest-Triangle-Three-Buckets.
+
+    The first and last points are kept; the others are split into threshold - 2
+    buckets, and from each bucket the point forming the largest triangle with
+    the previously kept point and the average of the next bucket is kept.
+
+    Args:
+        x: Numeric x values, in drawing order
+        y: Numeric y values (NaN points are only kept if a bucket has nothing else)
+        threshold: Number of points to keep
+
+    Returns:
+        Sorted indices of the kept points
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_end = edges[bucket + 2] if bucket + 2 < len(edges) else n
+        next_x, next_y = _finite_mean(x[end:next_end], x[-1]), _finite_mean(y[end:next_end], y[-1])
+        areas = np.abs((x[previous] - next_x) * (y[start:end] - y[previous])
+                       - (x[previous] - x[start:end]) * (next_y - y[previous]))
+        areas = np.where(np.isnan(areas), -1.0, areas)
+        previous = start + int(np.argmax(areas)) if end > start else start
+        selected[bucket + 1] = previous
+    return np.unique(selected)
+
+
+def minmax_indices(y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Select the minimum and maximum of each bucket of an ordered series.
+
+    Args:
+        y: Numeric values in axis order
+        threshold: Maximum number of points to keep (two per bucket)
+
+    Returns:
+        Sorted indices of the kept points
+    """
+    n = len(y)
+    if threshold >= n or threshold < 2:
+        return np.arange(n)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(0, n, threshold // 2 + 1).astype(np.int64)
+    selected = []
+    for start, end in zip(edges[:-1], edges[1:]):
+        bucket = y[start:end]
+        if len(bucket) == 0:
+            continue
+        if np.isnan(bucket).all():
+            selected.append(start)
+            continue
+        selected.append(start + int(np.nanargmin(bucket)))
+        selected.append(start + int(np.nanargmax(bucket)))
+    return np.unique(np.asarray(selected, dtype=np.int64))
+
+
+def _numeric_axis(values: Any, n: int) -> Tuple[np.ndarray, bool]:
+    """Return x values as numbers (dates as nanoseconds) and whether they are ordered; positions otherwise."""
+    array = np.asarray(values)
+    if np.issubdtype(array.dtype, np.datetime64):
+        array = array.astype('datetime64[ns]').astype(np.int64).astype(float)
+    elif not np.issubdtype(array.dtype, np.number):
+        try:
+            # Date labels are written as ISO 8601 strings by the chart builders and the JSON encoder
+            array = pd.to_datetime(pd.Series(array), format='ISO8601').to_numpy().astype(np.int64).astype(float)
+        except (ValueError, TypeError, OverflowError):
+            # Labels have no order of their own: use their positions
+            return np.arange(n, dtype=float), False
+    array = array.astype(float)
+    with np.errstate(invalid='ignore'):
+        ordered = bool(np.all(np.diff(array) >= 0))
+    return array, ordered
+
+
+def _select(series_type: str, x: np.ndarray, y: np.ndarray, ordered: bool, max_points: int) -> Optional[Tuple[np.ndarray, str]]:
+    """Pick the downsampling of a series: LTTB for lines and scatters, min/max buckets for ordered bars."""
+    if series_type == 'bar':
+        return (minmax_indices(y, max_points), 'minmax') if ordered else None
+    return lttb_indices(x if ordered else np.arange(len(y), dtype=float), y, max_points), 'lttb'
+
+
+def _values(data: List[Any]) -> np.ndarray:
+    """Numeric values of ECharts series data given as plain values or {'value': ...} items."""
+    values = [item.get('value') if isinstance(item, dict) else item for item in data]
+    return pd.to_numeric(pd.Series(values, dtype=object), errors='coerce').to_numpy(dtype=float)
+
+
+def downsample_echarts(config: Dict[str, Any], max_points: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """
+    Downsample the line, scatter and ordered bar series of an ECharts configuration in place.
+
+    Series given as [x, y] pairs are reduced one by one. Series given as plain
+    values share the category axis, so the union of the points kept for each of
+    them is kept in all of them and in the axis labels.
+
+    Args:
+        config: ECharts configuration
+        max_points: Point budget per series (default DOWNSAMPLE_MAX_POINTS)
+
+    Returns:
+        None if nothing was reduced, otherwise a dictionary with the
+        'original_points' and kept 'points' of the reduced series and the
+        'methods' used
+    """
+    max_points = DOWNSAMPLE_MAX_POINTS if max_points is None else max_points
+    series_list = config.get("series")
+    series_list = [series_list] if isinstance(series_list, dict) else (series_list or [])
+    x_axis = config.get("xAxis")
+    x_axis = x_axis[0] if isinstance(x_axis, list) and x_axis else x_axis
+    axis_labels = x_axis.get("data") if isinstance(x_axis, dict) else None
+    axis_ordered = isinstance(x_axis, dict) and x_axis.get("type") in ("time", "value")
+
+    original_points, points, methods = 0, 0, set()
+    # Series of plain values, by length -> (series, indices kept for each)
+    shared: Dict[int, Tuple[List[Dict[str, Any]], List[np.ndarray]]] = {}
+    for series in series_list:
+        if not isinstance(series, dict) or series.get("type") not in ("line", "scatter", "bar"):
+            continue
+        data = series.get("data")
+        if not isinstance(data, list) or len(data) <= max_points:
+            continue
+        n = len(data)
+        if all(isinstance(item, (list, tuple)) and len(item) >= 2 for item in data[:100]):
+            x, ordered = _numeric_axis([item[0] for item in data], n)
+            choice = _select(series["type"], x, _values([item[1] for item in data]), ordered, max_points)
+            if choice is None:
+                continue
+            indices, method = choice
+            series["data"] = [data[i] for i in indices]
+            original_points += n
+            points += len(indices)
+            methods.add(method)
+        else:
+            if axis_labels is not None and len(axis_labels) == n:
+                x, ordered = _numeric_axis(axis_labels, n)
+                ordered = ordered or axis_ordered
+            else:
+                x, ordered = np.arange(n, dtype=float), True
+            choice = _select(series["type"], x, _values(data), ordered, max_points)
+            if choice is None:
+                continue
+            group = shared.setdefault(n, ([], []))
+            group[0].append(series)
+            group[1].append(choice[0])
+            methods.add(choice[1])
+
+    for n, (group_series, group_indices) in shared.items():
+        indices = np.unique(np.concatenate(group_indices))
+        for series in group_series:
+            series["data"] = [series["data"][i] for i in indices]
+            original_points += n
+            points += len(indices)
+        if axis_labels is not None and len(axis_labels) == n:
+            x_axis["data"] = [axis_labels[i] for i in indices]
+
+    if not methods:
+        return None
+    return {"original_points": original_points, "points": points, "methods": sorted(methods)}
+
+
+def _decode_plotly_array(value: Any) -> Optional[np.ndarray]:
+    """Return a Plotly data array (list, NumPy array or base64 typed array) as a NumPy array."""
+    if value is None or isinstance(value, (str, bytes)):
+        return None
+    if isinstance(value, dict):
+        if "bdata" not in value or "dtype" not in value:
+            return None
+        array = np.frombuffer(base64.b64decode(value["bdata"]), dtype=np.dtype(value["dtype"]))
+        if "shape" in value:
+            shape = value["shape"]
+            shape = [int(part) for part in shape.split(',')] if isinstance(shape, str) else list(shape)
+            array = array.reshape(shape)
+        return array
+    if isinstance(value, (list, tuple, np.ndarray, pd.Series, pd.Index)):
+        return np.asarray(value, dtype=object) if isinstance(value, (list, tuple)) else np.asarray(value)
+    return None
+
+
+def _subset_plotly_attribute(container: Dict[str, Any], key: str, n: int, indices: np.ndarray) -> None:
+    """Keep the selected points of a per-point attribute, re-encoding typed arrays as typed arrays."""
+    value = container.get(key)
+    array = _decode_plotly_array(value)
+    if array is None or array.ndim < 1 or len(array) != n:
+        return
+    subset = np.ascontiguousarray(array[indices])
+    if isinstance(value, dict):
+        encoded = {"dtype": value["dtype"], "bdata": base64.b64encode(subset.tobytes()).decode('ascii')}
+        if subset.ndim > 1:
+            encoded["shape"] = ','.join(str(size) for size in subset.shape)
+        container[key] = encoded
+    elif isinstance(value, (list, tuple)):
+        container[key] = [value[i] for i in indices]
+    else:
+        container[key] = subset
+
+
+def downsample_plotly(figure: Dict[str, Any], max_points: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """
+    Downsample the scatter/line and ordered bar traces of a Plotly figure in place.
+
+    Every per-point attribute of a reduced trace (text, hover text, custom
+    data, marker colors and sizes) is reduced along with x and y.
+
+    Args:
+        figure: Plotly figure as a dict (e.g. from fig.to_plotly_json())
+        max_points: Point budget per trace (default DOWNSAMPLE_MAX_POINTS)
+
+    Returns:
+        None if nothing was reduced, otherwise a dictionary with the
+        'original_points' and kept 'points' of the reduced traces and the
+        'methods' used
+    """
+    max_points = DOWNSAMPLE_MAX_POINTS if max_points is None else max_points
+    original_points, points, methods = 0, 0, set()
+    for trace in figure.get("data", []) or []:
+        if not isinstance(trace, dict):
+            continue
+        trace_type = trace.get("type", "scatter")
+        if trace_type not in ("scatter", "scattergl", "bar"):
+            continue
+        # Horizontal bars carry their values in x and their positions in y
+        position_key, value_key = ("y", "x") if trace.get("orientation") == "h" else ("x", "y")
+        values = _decode_plotly_array(trace.get(value_key))
+        if values is None or values.ndim != 1 or len(values) <= max_points:
+            continue
+        n = len(values)
+        positions = _decode_plotly_array(trace.get(position_key))
+        if positions is not None and len(positions) == n:
+            x, ordered = _numeric_axis(positions, n)
+        else:
+            x, ordered = np.arange(n, dtype=float), True
+        try:
+            numeric_values = values.astype(float)
+        except (ValueError, TypeError):
+            continue
+        choice = _select("bar" if trace_type == "bar" else "line", x, numeric_values, ordered, max_points)
+        if choice is None:
+            continue
+        indices, method = choice
+        for key in PLOTLY_POINT_ATTRIBUTES:
+            _subset_plotly_attribute(trace, key, n, indices)
+        if isinstance(trace.get("marker"), dict):
+            for key in PLOTLY_MARKER_POINT_ATTRIBUTES:
+                _subset_plotly_attribute(trace["marker"], key, n, indices)
+        original_points += n
+        points += len(indices)
+        methods.add(method)
+    if not methods:
+        return None
+    return {"original_points": original_points, "points": points, "methods": sorted(methods)}
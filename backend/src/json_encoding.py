@@ -0,0 +1,96 @@
+"""
+JSON Encoding for Agentic Dashboard App.
+
+This module serializes API responses and stored artifacts to JSON bytes in a
+single pass. NumPy scalars and arrays, pandas timestamps and datetimes are
+encoded natively, and NaN, infinity and NaT become null, so results no longer
+need to be cleaned recursively (or round-tripped through json.loads) before
+they are returned.
+
+orjson is used when it is installed; otherwise the standard library encoder
+is used after the values it cannot represent have been replaced.
+"""
+
+import json
+import math
+import datetime
+import decimal
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+if ORJSON_AVAILABLE:
+    _ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj: Any) -> Any:
+    """Convert values the encoder does not handle itself; NaN-like values become None."""
+    if obj is pd.NaT:
+        return None
+    if isinstance(obj, (pd.Timestamp, datetime.datetime, datetime.date, datetime.time)):
+        return obj.isoformat()
+    if isinstance(obj, np.ndarray):
+        # Arrays orjson cannot encode directly (object, string or non-contiguous data)
+        return obj.tolist()
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if hasattr(obj, 'to_plotly_json'):
+        return obj.to_plotly_json()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _sanitize(obj: Any) -> Any:
+    """Prepare a value for the standard library encoder, which writes NaN and infinity as invalid JSON."""
+    if isinstance(obj, dict):
+        return {key if isinstance(key, (str, int, float, bool)) or key is None else str(key): _sanitize(value)
+                for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_sanitize(item) for item in obj]
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, (str, int, bool)) or obj is None:
+        return obj
+    return _sanitize(_default(obj))
+
+
+def dumps(obj: Any) -> bytes:
+    """
+    Serialize a value to UTF-8 JSON bytes.
+
+    Args:
+        obj: Value to serialize (dicts, lists, scalars, NumPy and pandas values)
+
+    Returns:
+        The compact JSON encoding, with null for NaN, infinity and NaT
+
+    Raises:
+        TypeError: If the value contains an object that cannot be serialized
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS)
+    return json.dumps(_sanitize(obj), separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+class ResponseJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that builds response bodies with dumps, encoding them only once."""
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return dumps(obj).decode('utf-8')
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps(obj), mimetype=self.mimetype)
@@ -42,9 +42,35 @@ from src.api_key_middleware import validate_api_key
 # Import code execution service
 from src.code_execution_service import execute_plotly_code
 # Import data exploration service
-from src.data_exploration_service import get_dataset_visualizations
+from src.data_exploration_service import get_dataset_visualizations, get_correlation_visualization
+# Import the shared dataset loader cache
+from src.dataset_loader import load_dataframe, get_dataset_schema, invalidate_dataset, get_dataset_cache_stats
+from src.aggregation_cache import get_aggregation_cache_stats
+# Import the columnar sidecar writer
+from src.dataset_store import write_sidecar, is_sidecar_fresh, get_sidecar_path, COLUMNAR_EXTENSIONS
+# Import the content-addressed upload store
+from src.upload_store import store_upload, enforce_quota, touch_dataset
+# Import the background dataset profiler
+from src.profiling_service import start_profiling, load_profile, get_profiling_status, get_profile_path
+# Import the resumable chunked upload sessions
+from src.upload_sessions import create_session, write_part, get_session_status, complete_session, UploadSessionError
+# Import the streaming mode switch for large datasets
+from src.streaming_summary import should_stream
+# Import incremental appends to stored CSV datasets
+from src.dataset_append import append_rows, DatasetAppendError
+# Import the catalog of datasets and their IDs
+from src.dataset_registry import DatasetRegistry, get_registry_path
+# Import the single-pass JSON response encoder
+from src.json_encoding import ResponseJSONProvider
+# Import the declarative aggregation queries
+from src.query_service import run_query, QueryError
+from src.row_access import get_rows, RowAccessError
+from src.column_overview import get_column_overview
+from src.correlation import get_correlations, CORRELATION_METHODS
 
 app = Flask(__name__)
+# Encode responses once, with NumPy values, dates and NaN handled by the encoder
+app.json = ResponseJSONProvider(app)
 
 # Configure CORS to allow requests from the React frontend (adjust origin in production)
 CORS(app, resources={r"/api/*": {"origins": "*"}}) # Allow all origins for development
@@ -52,13 +78,24 @@ CORS(app, resources={r"/api/*": {"origins": "*"}}) # Allow all origins for devel
 # Configuration
 UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'uploads')
 app.config["UPLOAD_FOLDER"] = UPLOAD_FOLDER
-app.config["MAX_CONTENT_LENGTH"] = 16 * 1024 * 1024 # 16 MB limit
+app.config["MAX_CONTENT_LENGTH"] = int(os.getenv("MAX_UPLOAD_BYTES", str(16 * 1024 * 1024))) # 16 MB limit by default
+
+# Accepted upload formats: CSV is parsed, columnar files are read as they are
+ALLOWED_UPLOAD_EXTENSIONS = ['.csv'] + COLUMNAR_EXTENSIONS
 
 # Ensure the upload folder exists
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
-# Store the path of the last uploaded file (simple approach for single user)
-# In a real multi-user app, this would need a more robust session/user-based mechanism
+# Catalog of uploaded datasets; clients select a dataset by passing its dataset_id
+dataset_registry = DatasetRegistry(get_registry_path(UPLOAD_FOLDER))
+
+# Bundled dataset used when a request names no dataset and nothing was uploaded yet
+DEFAULT_DATASET_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), 'uploads',
+    '2015---Friuli-Venezia-Giulia---Gestione-finanziaria-Spese-Enti-Locali.csv')
+
+# Path of the last uploaded file, used by requests that do not pass a dataset_id
+# (kept for older clients; concurrent users should always pass their dataset_id)
 last_uploaded_file_path = None
 
 def log_agent_activity(timestamp, activity_type, content, step, agent_name=None, input_content=None):
@@ -81,6 +118,113 @@ def log_agent_activity(timestamp, activity_type, content, step, agent_name=None,
     if len(agent_logs) > 1000:
         agent_logs = agent_logs[-1000:]
 
+def _enforce_upload_quota(keep):
+    """Keep the store within its disk quota, never evicting the dataset just stored."""
+    for evicted_path in enforce_quota(app.config["UPLOAD_FOLDER"], keep=keep):
+        invalidate_dataset(evicted_path)
+        dataset_registry.remove_path(evicted_path)
+        print(f"Evicted least recently used dataset {evicted_path}")
+
+def _requested_dataset_id():
+    """Return the dataset_id of the request (query string, JSON body or form field), if any."""
+    data = request.get_json(silent=True) if request.is_json else None
+    return (request.args.get("dataset_id")
+            or (data or {}).get("dataset_id")
+            or request.form.get("dataset_id"))
+
+def _resolve_dataset_path(use_default=True):
+    """
+    Find the dataset a request refers to.
+
+    Requests name a dataset by its dataset_id; without one, the last uploaded
+    dataset is used, and then (if use_default) the bundled sample dataset.
+
+    Returns:
+        Tuple of the dataset path and its dataset_id (either may be None), or
+        of None and an error response
+    """
+    global last_uploaded_file_path
+    dataset_id = _requested_dataset_id()
+    if dataset_id:
+        record = dataset_registry.get(dataset_id)
+        if record is None:
+            return None, (jsonify({"error": f"Unknown dataset_id: {dataset_id}"}), 404)
+        path = record["path"]
+        dataset_registry.touch(dataset_id)
+    else:
+        if not last_uploaded_file_path and use_default and os.path.exists(DEFAULT_DATASET_PATH):
+            last_uploaded_file_path = DEFAULT_DATASET_PATH
+            print(f"No file uploaded, using default: {DEFAULT_DATASET_PATH}")
+        path = last_uploaded_file_path
+        if not path:
+            return None, (jsonify({"error": "No dataset has been uploaded or found."}), 400)
+
+    if not os.path.exists(path):
+        return None, (jsonify({"error": f"Dataset file not found at {path}"}), 404)
+    touch_dataset(path)
+    return path, dataset_id
+
+def _register_dataset(path, filename, sha256, parent_id=None, schema=None, deduplicated=False):
+    """Add a stored dataset to the catalog with its schema and the locations of its derived files."""
+    record = dataset_registry.find_upload(path, sha256) if deduplicated else None
+    if record is not None:
+        # The same content was uploaded before: refresh its entry instead of listing it twice
+        dataset_registry.touch(record["dataset_id"], filename=filename)
+    else:
+        record = dataset_registry.register(path, filename, sha256=sha256, parent_id=parent_id)
+    metadata = {"profile_path": get_profile_path(path)}
+    if is_sidecar_fresh(path):
+        metadata["sidecar_path"] = get_sidecar_path(path)
+    if schema is None and not should_stream(path):
+        # Already known from the parse done at upload, so this does not reload the file
+        try:
+            schema = get_dataset_schema(path)
+        except Exception as e:
+            print(f"Could not record the schema of {path}: {str(e)}")
+    metadata["schema"] = schema
+    dataset_registry.set_metadata(record["dataset_id"], **metadata)
+    return record["dataset_id"]
+
+def _finalize_upload(stored, filename):
+    """Make a freshly stored upload the current dataset and prepare it for later requests."""
+    global last_uploaded_file_path
+    filepath = stored["path"]
+    print(f"File stored at {filepath} (sha256={stored['sha256']}, deduplicated={stored['deduplicated']})")
+    last_uploaded_file_path = filepath # Store the path
+
+    # Parse once now and keep the typed columns next to the CSV for later requests.
+    # Columnar uploads are read as they are, and files summarized in streaming
+    # mode are never loaded whole.
+    is_columnar = os.path.splitext(filepath)[1].lower() in COLUMNAR_EXTENSIONS
+    if is_columnar:
+        print("Columnar upload: no text parsing needed")
+    elif should_stream(filepath):
+        print("Large dataset: skipping columnar sidecar, summaries will use streaming mode")
+    elif not is_sidecar_fresh(filepath):
+        try:
+            df, load_message = load_dataframe(filepath)
+            sidecar_path = write_sidecar(filepath, df, get_dataset_schema(filepath))
+            print(f"Columnar sidecar: {sidecar_path or 'not written'}")
+        except Exception as e:
+            print(f"Error preparing columnar sidecar: {str(e)}")
+
+    _enforce_upload_quota(stored["sha256"])
+    dataset_id = _register_dataset(filepath, filename, stored["sha256"], deduplicated=stored["deduplicated"])
+
+    return {
+        "message": "File uploaded successfully",
+        "dataset_id": dataset_id,
+        "filename": filename,
+        "filepath": filepath,
+        "dataset_hash": stored["sha256"],
+        "deduplicated": stored["deduplicated"],
+        "columnar": is_columnar,
+        "columnar_sidecar": is_sidecar_fresh(filepath),
+        "streaming_mode": should_stream(filepath),
+        # Summary, charts and agent context are computed in the background
+        "profiling": start_profiling(filepath)
+    }
+
 @app.route("/api/upload", methods=["POST"])
 @validate_api_key
 def upload_file():
@@ -106,19 +250,16 @@ def upload_file():
             filename = werkzeug.utils.secure_filename(file.filename)
             print(f"Secure filename: {filename}")
 
-            # Ensure it's a CSV
-            if not filename.lower().endswith(".csv"):
+            # Ensure it's a supported format
+            if os.path.splitext(filename)[1].lower() not in ALLOWED_UPLOAD_EXTENSIONS:
                 print("Invalid file type")
-                return jsonify({"error": "Invalid file type. Please upload a CSV file."}), 400
-
-            filepath = os.path.join(app.config["UPLOAD_FOLDER"], filename)
-            print(f"Saving file to: {filepath}")
+                return jsonify({"error": f"Invalid file type. Please upload one of: {', '.join(ALLOWED_UPLOAD_EXTENSIONS)}"}), 400
 
             try:
-                file.save(filepath)
-                print(f"File saved successfully")
-                last_uploaded_file_path = filepath # Store the path
-                return jsonify({"message": "File uploaded successfully", "filename": filename, "filepath": filepath}), 200
+                # Store by content hash while streaming the body to disk; identical
+                # content is kept once and reuses its sidecar and other artifacts
+                stored = store_upload(file.stream, filename, app.config["UPLOAD_FOLDER"])
+                return jsonify(_finalize_upload(stored, filename)), 200
             except Exception as e:
                 print(f"Error saving file: {str(e)}")
                 return jsonify({"error": f"Failed to save file: {str(e)}"}), 500
@@ -126,6 +267,123 @@ def upload_file():
         print(f"Unexpected error in upload: {str(e)}")
         return jsonify({"error": f"Internal server error: {str(e)}"}), 500
 
+@app.route("/api/uploads", methods=["POST"])
+@validate_api_key
+def create_upload_session():
+    """Open a resumable chunked upload; parts are then sent with PUT."""
+    data = request.get_json(silent=True) or {}
+    filename = werkzeug.utils.secure_filename(data.get("filename", ""))
+    if not filename:
+        return jsonify({"error": "Missing 'filename' in request body"}), 400
+    if os.path.splitext(filename)[1].lower() not in ALLOWED_UPLOAD_EXTENSIONS:
+        return jsonify({"error": f"Invalid file type. Please upload one of: {', '.join(ALLOWED_UPLOAD_EXTENSIONS)}"}), 400
+
+    try:
+        session = create_session(app.config["UPLOAD_FOLDER"], filename, data.get("size"))
+        return jsonify(session), 201
+    except UploadSessionError as e:
+        return jsonify({"error": str(e)}), 400
+
+@app.route("/api/uploads/<upload_id>/parts/<int:index>", methods=["PUT"])
+@validate_api_key
+def upload_part(upload_id, index):
+    """Store one part of a chunked upload from the raw request body; re-sending a part replaces it."""
+    try:
+        part = write_part(app.config["UPLOAD_FOLDER"], upload_id, index, request.stream)
+        return jsonify(part), 200
+    except UploadSessionError as e:
+        return jsonify({"error": str(e)}), 400
+
+@app.route("/api/uploads/<upload_id>", methods=["GET"])
+@validate_api_key
+def upload_session_status(upload_id):
+    """Report the received parts so an interrupted upload can resume with the missing ones."""
+    try:
+        return jsonify(get_session_status(app.config["UPLOAD_FOLDER"], upload_id)), 200
+    except UploadSessionError as e:
+        return jsonify({"error": str(e)}), 404
+
+@app.route("/api/uploads/<upload_id>/complete", methods=["POST"])
+@validate_api_key
+def complete_upload_session(upload_id):
+    """Assemble the parts of a chunked upload and make it the current dataset."""
+    data = request.get_json(silent=True) or {}
+    try:
+        stored = complete_session(app.config["UPLOAD_FOLDER"], upload_id, data.get("parts"))
+        return jsonify(_finalize_upload(stored, stored["filename"])), 200
+    except UploadSessionError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        print(f"Error completing chunked upload: {str(e)}")
+        return jsonify({"error": f"Failed to save file: {str(e)}"}), 500
+
+@app.route("/api/append", methods=["POST"])
+@validate_api_key
+def append_dataset_rows():
+    """
+    Append the rows of an uploaded CSV file to a stored dataset.
+
+    The target is the dataset named by the 'dataset_id' form field, or the
+    current dataset. The extended dataset is registered under a new
+    dataset_id, and its summary and charts are updated from the new rows alone.
+    """
+    global last_uploaded_file_path
+    if 'file' not in request.files or request.files['file'].filename == '':
+        return jsonify({"error": "No file part"}), 400
+
+    target_path, dataset_id = _resolve_dataset_path(use_default=False)
+    if target_path is None:
+        return dataset_id
+
+    try:
+        start_time = time.time()
+        stored = append_rows(target_path, request.files['file'].stream, app.config["UPLOAD_FOLDER"])
+        parent = dataset_registry.get(dataset_id) if dataset_id else None
+        filename = parent["filename"] if parent else os.path.basename(target_path)
+        new_dataset_id = _register_dataset(stored["path"], filename, stored["sha256"],
+                                           parent_id=dataset_id, schema=stored["schema"])
+        dataset_registry.set_metadata(new_dataset_id, num_rows=stored["num_rows"])
+        last_uploaded_file_path = stored["path"]
+        _enforce_upload_quota(stored["sha256"])
+        print(f"Appended {stored['appended_rows']} rows to {target_path} in {time.time() - start_time:.2f}s")
+        return jsonify({
+            "message": "Rows appended successfully",
+            "dataset_id": new_dataset_id,
+            "parent_dataset_id": dataset_id,
+            "filepath": stored["path"],
+            "dataset_hash": stored["sha256"],
+            "appended_rows": stored["appended_rows"],
+            "num_rows": stored["num_rows"],
+            "result": stored["result"]
+        }), 200
+    except DatasetAppendError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        print(f"Error appending rows: {str(e)}")
+        return jsonify({"error": f"Failed to append rows: {str(e)}"}), 500
+
+@app.route("/api/datasets", methods=["GET"])
+@validate_api_key
+def list_registered_datasets():
+    """List the registered datasets, most recently used first."""
+    limit = request.args.get("limit", default=100, type=int)
+    return jsonify({"datasets": dataset_registry.list(limit)}), 200
+
+@app.route("/api/datasets/<dataset_id>", methods=["GET"])
+@validate_api_key
+def get_registered_dataset(dataset_id):
+    """Return the catalog record of a dataset with its profiling status."""
+    record = dataset_registry.get(dataset_id)
+    if record is None:
+        return jsonify({"error": f"Unknown dataset_id: {dataset_id}"}), 404
+    if os.path.exists(record["path"]):
+        record["profiling"] = get_profiling_status(record["path"])["status"]
+        profile = load_profile(record["path"])
+        if profile is not None and record["num_rows"] is None:
+            record["num_rows"] = profile["exploration"]["summary"]["num_rows"]
+            dataset_registry.set_metadata(dataset_id, num_rows=record["num_rows"])
+    return jsonify(record), 200
+
 @app.route("/")
 def root():
     return jsonify({
@@ -133,13 +391,21 @@ def root():
         "message": "Agentic Visualization API is running",
         "endpoints": {
             "upload": "/api/upload",
+            "chunked_upload": "/api/uploads",
+            "append": "/api/append",
+            "datasets": "/api/datasets",
             "visualizations": "/api/visualizations",
             "prompted_visualizations": "/api/visualizations/prompt",
             "check_api_key": "/api/check_api_key",
             "cancel_job": "/api/cancel",
             "reset": "/api/reset",
             "execute_code": "/api/execute_code",
-            "data_exploration": "/api/data_exploration"
+            "data_exploration": "/api/data_exploration",
+            "data_query": "/api/data/query",
+            "data_rows": "/api/data/rows",
+            "column_overview": "/api/data/column_overview",
+            "correlations": "/api/data/correlations",
+            "dataset_cache_stats": "/api/admin/cache"
         }
     })
 
@@ -286,6 +552,15 @@ def get_admin_logs():
         "available_models": AVAILABLE_MODELS
     })
 
+@app.route("/api/admin/cache", methods=["GET"])
+@validate_api_key
+def get_admin_cache_stats():
+    """Get hit/miss counters and memory usage of the shared dataset and aggregation caches."""
+    return jsonify({
+        "dataset_cache": get_dataset_cache_stats(),
+        "aggregation_cache": get_aggregation_cache_stats()
+    })
+
 @app.route("/api/admin/logs/stream", methods=["GET"])
 @validate_api_key
 def stream_admin_logs():
@@ -325,8 +600,9 @@ def stream_admin_logs():
 @validate_api_key
 def get_initial_visualizations():
     """Get initial visualization suggestions based on the uploaded dataset."""
-    if not last_uploaded_file_path:
-        return jsonify({"error": "No dataset uploaded yet."}), 400
+    dataset_path, dataset_id = _resolve_dataset_path(use_default=False)
+    if dataset_path is None:
+        return dataset_id
 
     # Check if we're using Ollama
     use_ollama = os.getenv("USE_OLLAMA") == "true"
@@ -441,7 +717,7 @@ def get_initial_visualizations():
     try:
         print(f"Requesting initial visualizations with Analyst: {analyst_model_id}, Coder: {coder_model_id}, Manager: {manager_model_id}")
         results = get_visualization_suggestions(
-            last_uploaded_file_path,
+            dataset_path,
             analyst_model_id=analyst_model_id,
             coder_model_id=coder_model_id,
             manager_model_id=manager_model_id
@@ -455,21 +731,9 @@ def get_initial_visualizations():
 @app.route("/api/visualizations/prompt", methods=["POST"])
 @validate_api_key
 def get_prompted_visualization():
-    global last_uploaded_file_path
-    if not last_uploaded_file_path:
-        # Try using the default dataset if no file uploaded yet
-        # Construct path relative to the backend directory
-        backend_dir = os.path.dirname(os.path.dirname(__file__))
-        default_filename = '2015---Friuli-Venezia-Giulia---Gestione-finanziaria-Spese-Enti-Locali.csv'
-        default_path = os.path.join(backend_dir, 'uploads', default_filename)
-        if os.path.exists(default_path):
-            last_uploaded_file_path = default_path
-            print(f"No file uploaded, using default: {default_path}")
-        else:
-            return jsonify({"error": "No dataset has been uploaded or found."}), 400
-
-    if not os.path.exists(last_uploaded_file_path):
-        return jsonify({"error": f"Dataset file not found at {last_uploaded_file_path}"}), 404
+    dataset_path, dataset_id = _resolve_dataset_path()
+    if dataset_path is None:
+        return dataset_id
 
     data = request.get_json()
     if not data or 'prompt' not in data:
@@ -477,6 +741,23 @@ def get_prompted_visualization():
 
     user_prompt = data['prompt']
 
+    # Correlation requests are answered from the dataset's cached correlation matrix, without the agents
+    try:
+        correlation_result = get_correlation_visualization(dataset_path, user_prompt)
+    except Exception as e:
+        print(f"Could not answer the prompt from the correlation matrix: {str(e)}")
+        correlation_result = None
+    if correlation_result is not None:
+        log_agent_activity(
+            timestamp=datetime.now().isoformat(),
+            activity_type="action",
+            content=f"Answered prompt from the cached correlation matrix: {user_prompt}",
+            step=len(agent_logs) + 1,
+            agent_name="System",
+            input_content=user_prompt
+        )
+        return jsonify(correlation_result), 200
+
     # Check if we're using Ollama
     use_ollama = os.getenv("USE_OLLAMA") == "true"
     print(f"USE_OLLAMA environment variable is: {use_ollama}")
@@ -602,7 +883,7 @@ def get_prompted_visualization():
     try:
         # Pass the selected model_ids to the agent service
         results = get_visualization_suggestions(
-            last_uploaded_file_path,
+            dataset_path,
             user_prompt=user_prompt,
             analyst_model_id=analyst_model_id,
             coder_model_id=coder_model_id,
@@ -621,8 +902,6 @@ def get_prompted_visualization():
 @validate_api_key
 def execute_code_endpoint():
     """Execute Python code to generate a Plotly visualization."""
-    global last_uploaded_file_path
-
     try:
         data = request.get_json()
         if not data or 'code' not in data:
@@ -630,21 +909,13 @@ def execute_code_endpoint():
 
         code = data['code']
 
-        # Use the last uploaded file path if available
-        data_path = last_uploaded_file_path
-
-        # If no file has been uploaded, check if we should use a default dataset
-        if not data_path:
-            # Try using the default dataset if no file uploaded yet
-            # Construct path relative to the backend directory
-            backend_dir = os.path.dirname(os.path.dirname(__file__))
-            default_filename = '2015---Friuli-Venezia-Giulia---Gestione-finanziaria-Spese-Enti-Locali.csv'
-            default_path = os.path.join(backend_dir, 'uploads', default_filename)
-            if os.path.exists(default_path):
-                data_path = default_path
-                print(f"No file uploaded, using default: {data_path}")
-            else:
-                print("No dataset available for code execution")
+        # Use the requested dataset, the last uploaded one or the default dataset;
+        # code that does not need data can still run without any
+        data_path, dataset_id = _resolve_dataset_path()
+        if data_path is None:
+            if _requested_dataset_id():
+                return dataset_id
+            print("No dataset available for code execution")
 
         # Log the code execution request
         log_agent_activity(
@@ -706,35 +977,36 @@ def execute_code_endpoint():
 @validate_api_key
 def explore_data():
     """Generate ECharts visualizations for the uploaded dataset."""
-    global last_uploaded_file_path
-
-    if not last_uploaded_file_path:
-        # Try using the default dataset if no file uploaded yet
-        # Construct path relative to the backend directory
-        backend_dir = os.path.dirname(os.path.dirname(__file__))
-        default_filename = '2015---Friuli-Venezia-Giulia---Gestione-finanziaria-Spese-Enti-Locali.csv'
-        default_path = os.path.join(backend_dir, 'uploads', default_filename)
-        if os.path.exists(default_path):
-            last_uploaded_file_path = default_path
-            print(f"No file uploaded, using default: {default_path}")
-        else:
-            return jsonify({"error": "No dataset has been uploaded or found."}), 400
-
-    if not os.path.exists(last_uploaded_file_path):
-        return jsonify({"error": f"Dataset file not found at {last_uploaded_file_path}"}), 404
+    dataset_path, dataset_id = _resolve_dataset_path()
+    if dataset_path is None:
+        return dataset_id
 
     try:
         # Log the exploration request
         log_agent_activity(
             timestamp=datetime.now().isoformat(),
             activity_type="data_exploration",
-            content=f"Generating ECharts visualizations for {os.path.basename(last_uploaded_file_path)}",
+            content=f"Generating ECharts visualizations for {os.path.basename(dataset_path)}",
             step=0,
             agent_name="System"
         )
 
-        # Generate visualizations
-        result = get_dataset_visualizations(last_uploaded_file_path)
+        # Serve the profile computed in the background after upload; if it is not
+        # ready yet, report progress so the client can poll again
+        profile = load_profile(dataset_path)
+        if profile is None:
+            profiling = get_profiling_status(dataset_path)
+            if profiling["status"] != "failed":
+                start_profiling(dataset_path)
+                return jsonify({
+                    "status": "profiling",
+                    "message": "Dataset profiling in progress, please retry shortly"
+                }), 202
+            # The background job failed: compute synchronously so the error is reported
+            print(f"Background profiling failed ({profiling['error']}), generating visualizations inline")
+            result = get_dataset_visualizations(dataset_path)
+        else:
+            result = profile["exploration"]
 
         # Log success
         log_agent_activity(
@@ -761,6 +1033,100 @@ def explore_data():
 
         return jsonify({"error": f"Failed to generate ECharts visualizations: {error_message}"}), 500
 
+@app.route("/api/data/query", methods=["POST"])
+@validate_api_key
+def query_data():
+    """
+    Answer a declarative aggregation query (filters, group-by, aggregations,
+    sort and limit, see query_service.parse_query) without the agents.
+    """
+    dataset_path, dataset_id = _resolve_dataset_path()
+    if dataset_path is None:
+        return dataset_id
+
+    try:
+        result = run_query(dataset_path, request.get_json(silent=True) or {})
+        result["dataset_id"] = dataset_id
+        return jsonify(result), 200
+    except QueryError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        print(f"Error running data query: {str(e)}")
+        return jsonify({"error": f"Failed to run query: {str(e)}"}), 500
+
+@app.route("/api/data/rows", methods=["GET"])
+@validate_api_key
+def get_data_rows():
+    """
+    Return a page of the dataset's rows: offset and limit, the columns to
+    return (repeated or comma-separated), and an optional sort column with
+    order "asc" or "desc".
+    """
+    dataset_path, dataset_id = _resolve_dataset_path()
+    if dataset_path is None:
+        return dataset_id
+
+    columns = [col for value in request.args.getlist("columns") for col in value.split(",") if col]
+    order = request.args.get("order", "asc").lower()
+    if order not in ("asc", "desc"):
+        return jsonify({"error": f"Invalid order: {order} (expected asc or desc)"}), 400
+    try:
+        result = get_rows(dataset_path,
+                          offset=request.args.get("offset", default=0, type=int),
+                          limit=request.args.get("limit", default=None, type=int),
+                          columns=columns or None,
+                          sort=request.args.get("sort") or None,
+                          ascending=order == "asc")
+        result["dataset_id"] = dataset_id
+        return jsonify(result), 200
+    except RowAccessError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        print(f"Error reading dataset rows: {str(e)}")
+        return jsonify({"error": f"Failed to read rows: {str(e)}"}), 500
+
+@app.route("/api/data/column_overview", methods=["GET"])
+@validate_api_key
+def get_data_column_overview():
+    """
+    Return the histogram of every numeric column and the top values of every
+    categorical column, each with an ECharts mini-chart; a "columns" argument
+    (repeated or comma-separated) restricts the response to those columns.
+    """
+    dataset_path, dataset_id = _resolve_dataset_path()
+    if dataset_path is None:
+        return dataset_id
+
+    try:
+        overview = get_column_overview(dataset_path)
+    except Exception as e:
+        print(f"Error computing column overview: {str(e)}")
+        return jsonify({"error": f"Failed to compute column overview: {str(e)}"}), 500
+    requested = [col for value in request.args.getlist("columns") for col in value.split(",") if col]
+    unknown = [col for col in requested if col not in overview["columns"]]
+    if unknown:
+        return jsonify({"error": f"No overview for columns: {', '.join(unknown)}"}), 400
+    if requested:
+        overview = dict(overview, columns={col: overview["columns"][col] for col in requested})
+    return jsonify(dict(overview, dataset_id=dataset_id)), 200
+
+@app.route("/api/data/correlations", methods=["GET"])
+@validate_api_key
+def get_data_correlations():
+    """Return the correlation matrix of the dataset's numeric columns (method "pearson" or "spearman")."""
+    dataset_path, dataset_id = _resolve_dataset_path()
+    if dataset_path is None:
+        return dataset_id
+
+    method = request.args.get("method", "pearson").lower()
+    if method not in CORRELATION_METHODS:
+        return jsonify({"error": f"Invalid method: {method} (expected one of {', '.join(CORRELATION_METHODS)})"}), 400
+    try:
+        return jsonify(dict(get_correlations(dataset_path, method), dataset_id=dataset_id)), 200
+    except Exception as e:
+        print(f"Error computing correlations: {str(e)}")
+        return jsonify({"error": f"Failed to compute correlations: {str(e)}"}), 500
+
 if __name__ == '__main__':
     # Run on 0.0.0.0 to be accessible externally if needed (e.g., via deploy_expose_port)
     # Use a port like 5001 to avoid conflicts
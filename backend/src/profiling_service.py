@@ -0,0 +1,318 @@
+"""
+Profiling Service for Agentic Dashboard App.
+
+This module profiles datasets in the background: the summary, the overview
+charts, per-column profiles and the dataset description given to the agents
+are computed once per upload and persisted next to the dataset, followed by
+the dataset's rollup cube (see src.rollup_cube). Endpoints read the stored
+profile instead of recomputing it on every request.
+"""
+
+import os
+import json
+import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+import pandas as pd
+
+from src.data_exploration_service import (
+    get_dataset_visualizations, build_summary_state, render_summary_state, summarize_loaded_dataset
+)
+from src.column_index import ColumnIndex, build_column_index
+from src.dataset_loader import CHUNKABLE_EXTENSIONS
+from src.json_encoding import dumps
+from src.rollup_cube import ensure_rollup_cube
+from src.streaming_summary import should_stream, save_summary_state
+from src.upload_store import get_artifact_path, get_dataset_hash
+
+# Number of datasets profiled concurrently
+PROFILING_WORKERS = int(os.getenv("PROFILING_WORKERS", "1"))
+
+# How long (in seconds) agent requests wait for a running profiling job
+PROFILE_WAIT_SECONDS = float(os.getenv("PROFILE_WAIT_SECONDS", "30"))
+
+# Name of the profile artifact stored with each dataset
+PROFILE_ARTIFACT_NAME = 'profile.json'
+
+# Bumped whenever the profile layout changes, so older profiles are recomputed
+PROFILE_VERSION = 4
+
+_executor = ThreadPoolExecutor(max_workers=PROFILING_WORKERS, thread_name_prefix='profiling')
+_jobs: Dict[str, Future] = {}
+_jobs_lock = threading.Lock()
+
+
+def get_profile_path(file_path: str) -> str:
+    """Return the path of the stored profile of a dataset."""
+    return get_artifact_path(file_path, PROFILE_ARTIFACT_NAME)
+
+
+def _source_signature(file_path: str) -> Dict[str, int]:
+    stat = os.stat(file_path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def build_column_profiles(summary: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """
+    Index the statistics of a dataset summary by column.
+
+    Args:
+        summary: Summary returned by get_dataset_summary
+
+    Returns:
+        Dictionary mapping each column to its kind and statistics
+    """
+    profiles = {}
+    for col in summary.get("columns", []):
+        kind = summary["column_types"][col]
+        profile = {"kind": kind}
+        if kind == "numeric":
+            profile.update(summary["numeric_stats"].get(col, {}))
+        elif kind == "categorical":
+            profile.update(summary["categorical_stats"].get(col, {}))
+        profiles[col] = profile
+    return profiles
+
+
+def build_prompt_context(summary: Dict[str, Any], compact: bool, index: Optional[ColumnIndex] = None) -> str:
+    """
+    Describe a dataset for the agents' prompts from its summary.
+
+    Args:
+        summary: Summary returned by get_dataset_summary
+        compact: Use the shorter description sent to token-limited providers (Groq)
+        index: Column index of the dataset; built from the summary when not given
+
+    Returns:
+        Text with the row count, columns, a few sample rows and, unless
+        compact, the columns by role and count/mean/std of the numeric columns
+    """
+    index = index or build_column_index(summary)
+    num_rows = summary.get("num_rows", 0)
+    columns = index.columns
+    numeric_columns = index.columns_with(kind="numeric")
+    sample = pd.DataFrame(summary.get("sample_data", []), columns=columns)
+
+    if compact:
+        data_head = sample.head(3).to_string(max_rows=3, max_cols=5)
+        return f"""Rows: {num_rows}
+Columns: {columns[:10]}... (truncated)
+Numeric columns: {numeric_columns[:5]}... (truncated)
+
+Sample (3 rows):
+{data_head}
+"""
+
+    data_head = sample.head(5).to_string(max_rows=5, max_cols=8)
+    numeric_stats = summary.get("numeric_stats", {})
+    brief = pd.DataFrame(
+        {
+            col: [num_rows - numeric_stats[col]["missing"], numeric_stats[col]["mean"], numeric_stats[col]["std"]]
+            for col in numeric_columns if col in numeric_stats
+        },
+        index=['count', 'mean', 'std']
+    )
+    return f"""Rows: {num_rows}
+Columns: {columns[:15]}... (truncated)
+Numeric columns: {numeric_columns[:8]}... (truncated)
+{index.describe()}
+
+Sample (5 rows):
+{data_head}
+
+Brief summary:
+{brief.to_string(max_cols=5)}
+"""
+
+
+def _explore(file_path: str) -> Dict[str, Any]:
+    """
+    Compute the exploration result of a dataset.
+
+    CSV files also get a persisted summary state, so rows appended later only
+    need to be summarized themselves. Each file is parsed once: large ones are
+    summarized in a chunked pass and explored from that state, smaller ones are
+    loaded and explored in memory and their state is built from the cached frame.
+    """
+    if os.path.splitext(file_path)[1].lower() not in CHUNKABLE_EXTENSIONS:
+        return get_dataset_visualizations(file_path)
+    if should_stream(file_path):
+        try:
+            state, chunk_count = build_summary_state(file_path)
+            save_summary_state(file_path, state)
+            return render_summary_state(
+                state, f"Summarized {state.summary.num_rows} rows in {chunk_count} chunks (streaming mode)")
+        except Exception as e:
+            print(f"Could not build the summary state of {file_path}: {str(e)}")
+            return get_dataset_visualizations(file_path)
+
+    result = get_dataset_visualizations(file_path)
+    try:
+        save_summary_state(file_path, summarize_loaded_dataset(file_path))
+    except Exception as e:
+        print(f"Could not build the summary state of {file_path}: {str(e)}")
+    return result
+
+
+def build_profile(file_path: str, exploration: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Compute the full profile of a dataset.
+
+    Args:
+        file_path: Path to the dataset file
+        exploration: Exploration result (summary and charts) to build the
+            profile from; computed from the file when not given
+
+    Returns:
+        Dictionary with the exploration result (summary and charts), the
+        column profiles and column index and the agents' prompt context
+    """
+    signature = _source_signature(file_path)
+    if exploration is None:
+        exploration = _explore(file_path)
+    summary = exploration["summary"]
+    index = build_column_index(summary)
+    return {
+        "version": PROFILE_VERSION,
+        "source": signature,
+        "dataset_hash": get_dataset_hash(file_path),
+        "created_at": datetime.now().isoformat(),
+        "exploration": exploration,
+        "column_profiles": build_column_profiles(summary),
+        "column_index": index.to_dict(),
+        "prompt_context": {
+            "compact": build_prompt_context(summary, compact=True, index=index),
+            "detailed": build_prompt_context(summary, compact=False, index=index)
+        }
+    }
+
+
+def load_profile(file_path: str) -> Optional[Dict[str, Any]]:
+    """
+    Read the stored profile of a dataset if it matches the current file.
+
+    Args:
+        file_path: Path to the dataset file
+
+    Returns:
+        The profile, or None if it is missing, outdated or unreadable
+    """
+    try:
+        with open(get_profile_path(file_path)) as f:
+            profile = json.load(f)
+        signature = _source_signature(file_path)
+    except (OSError, ValueError):
+        return None
+    if profile.get("version") != PROFILE_VERSION or profile.get("source") != signature:
+        return None
+    return profile
+
+
+def store_profile(file_path: str, exploration: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Build the profile of a dataset and persist it next to the dataset, with its rollup cube.
+
+    Args:
+        file_path: Path to the dataset file
+        exploration: Optional precomputed exploration result, see build_profile
+
+    Returns:
+        The stored profile
+    """
+    profile = build_profile(file_path, exploration)
+    profile_path = get_profile_path(file_path)
+    temp_path = f"{profile_path}.tmp-{os.getpid()}-{threading.get_ident()}"
+    with open(temp_path, 'wb') as f:
+        # Dates in the sample rows are stored as ISO strings, NaN as null
+        f.write(dumps(profile))
+    os.replace(temp_path, profile_path)
+
+    # The cube is optional: charts and queries fall back to grouping the rows without it
+    try:
+        ensure_rollup_cube(file_path, ColumnIndex.from_dict(profile["column_index"]))
+    except Exception as e:
+        print(f"Could not build the rollup cube of {file_path}: {str(e)}")
+    return profile
+
+
+def _run_profiling(file_path: str) -> Dict[str, Any]:
+    start_time = time.time()
+    profile = store_profile(file_path)
+    print(f"Profiled {os.path.basename(file_path)} in {time.time() - start_time:.2f}s")
+    return profile
+
+
+def start_profiling(file_path: str) -> str:
+    """
+    Queue a background profiling job unless a fresh profile exists or one is running.
+
+    Args:
+        file_path: Path to the dataset file
+
+    Returns:
+        "ready", "running" or "queued"
+    """
+    key = os.path.abspath(file_path)
+    with _jobs_lock:
+        job = _jobs.get(key)
+        if job is not None and not job.done():
+            return "running"
+        if load_profile(file_path) is not None:
+            return "ready"
+        _jobs[key] = _executor.submit(_run_profiling, file_path)
+        return "queued"
+
+
+def load_column_index(file_path: str) -> Optional[ColumnIndex]:
+    """Return the column index stored in a dataset's profile, or None if it has no fresh profile."""
+    profile = load_profile(file_path)
+    return ColumnIndex.from_dict(profile["column_index"]) if profile is not None else None
+
+
+def get_profiling_status(file_path: str) -> Dict[str, Any]:
+    """
+    Report the profiling state of a dataset.
+
+    Args:
+        file_path: Path to the dataset file
+
+    Returns:
+        Dictionary with a 'status' of "ready", "running", "failed" (with an
+        'error') or "missing"
+    """
+    if load_profile(file_path) is not None:
+        return {"status": "ready"}
+    with _jobs_lock:
+        job = _jobs.get(os.path.abspath(file_path))
+    if job is None:
+        return {"status": "missing"}
+    if not job.done():
+        return {"status": "running"}
+    error = job.exception()
+    if error is not None:
+        return {"status": "failed", "error": str(error)}
+    return {"status": "missing"}
+
+
+def wait_for_profile(file_path: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """
+    Return the profile of a dataset, waiting for a running job if there is one.
+
+    Args:
+        file_path: Path to the dataset file
+        timeout: Maximum seconds to wait (default PROFILE_WAIT_SECONDS)
+
+    Returns:
+        The profile, or None if it is not available in time
+    """
+    with _jobs_lock:
+        job = _jobs.get(os.path.abspath(file_path))
+    if job is not None and not job.done():
+        try:
+            job.result(timeout=PROFILE_WAIT_SECONDS if timeout is None else timeout)
+        except Exception:
+            pass
+    return load_profile(file_path)
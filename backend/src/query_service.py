@@ -0,0 +1,454 @@
+"""
+Query Service for Agentic Dashboard App.
+
+This module answers declarative aggregation queries ("sum of X by Y where
+Z = ...") without going through the agents. A query names filters, group-by
+columns, aggregations, a sort order and a row limit; it runs on the cached
+typed dataset and returns one array per output column, plus an ECharts
+configuration built by the data exploration chart generators.
+
+Queries the dataset's rollup cube covers (no filters, one group-by column)
+are answered from the cube. Otherwise label columns are filtered and grouped
+through integer codes cached per dataset: a filter is evaluated once per
+distinct value and gathered by code, and groups are numbered by combining
+the codes of the group-by columns, so sums, counts and means are single
+np.bincount passes over the selected rows.
+"""
+
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.aggregation_cache import get_dataset_key
+from src.data_exploration_service import (
+    generate_barchart_by_category,
+    generate_piechart_by_category,
+    generate_stacked_barchart_comparison
+)
+from src.dataset_loader import get_dataset_columns, load_dataframe_columns
+from src.profiling_service import load_column_index
+from src.rollup_cube import load_rollup_cube
+
+# Maximum number of rows (groups) a query returns
+QUERY_MAX_ROWS = int(os.getenv("QUERY_MAX_ROWS", "10000"))
+
+# Number of encoded (integer-coded) columns kept in memory, all datasets together
+QUERY_CODES_CACHE_MAX_ENTRIES = int(os.getenv("QUERY_CODES_CACHE_MAX_ENTRIES", "64"))
+
+# Aggregations a query can ask for
+QUERY_AGGREGATIONS = ('sum', 'mean', 'count', 'min', 'max', 'median')
+
+# Filter operators; missing values only ever match 'is_null'
+FILTER_OPERATORS = ('==', '!=', '<', '<=', '>', '>=', 'in', 'not_in', 'between', 'contains', 'is_null', 'not_null')
+
+# Chart generators by chart type, with the number of aggregations they plot
+QUERY_CHARTS = {
+    "bar": (generate_barchart_by_category, 1),
+    "pie": (generate_piechart_by_category, 1),
+    "stacked_bar": (generate_stacked_barchart_comparison, 2),
+}
+
+# Rollup cube aggregations a query can be answered with
+_ROLLUP_AGGREGATIONS = ('sum', 'mean', 'count', 'min', 'max')
+
+
+class QueryError(Exception):
+    """Raised when a query is malformed or refers to columns the dataset does not have."""
+
+
+def _as_list(value: Any) -> List[Any]:
+    if value is None:
+        return []
+    return list(value) if isinstance(value, (list, tuple)) else [value]
+
+
+def parse_query(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Validate a query and fill in its defaults.
+
+    A query looks like:
+        {"filters": [{"column": "Provincia", "op": "==", "value": "Roma"}],
+         "group_by": ["Tipologia"],
+         "aggregations": [{"column": "Impegno totale", "agg": "sum"}],
+         "sort": [{"column": "sum(Impegno totale)", "order": "desc"}],
+         "limit": 10,
+         "chart": "bar"}
+
+    Aggregations are named "agg(column)" unless they give an "as" name; a
+    count without a column counts rows and is named "count". Without a sort,
+    rows are ordered by the group-by columns. The chart defaults to "bar"
+    when there is exactly one group-by column; "none" disables it.
+
+    Args:
+        payload: The query, as decoded from the request body
+
+    Returns:
+        The normalized query
+
+    Raises:
+        QueryError: If the query is malformed
+    """
+    if not isinstance(payload, dict):
+        raise QueryError("The query must be a JSON object")
+
+    filters = []
+    for item in _as_list(payload.get("filters")):
+        if not isinstance(item, dict) or "column" not in item:
+            raise QueryError(f"Invalid filter {item!r}: expected an object with a 'column'")
+        op = item.get("op", "==")
+        if op not in FILTER_OPERATORS:
+            raise QueryError(f"Unknown filter operator {op!r}; expected one of {list(FILTER_OPERATORS)}")
+        value = item.get("value")
+        if op in ('in', 'not_in') and not isinstance(value, list):
+            raise QueryError(f"Filter operator {op!r} needs a list of values")
+        if op == 'between' and not (isinstance(value, list) and len(value) == 2):
+            raise QueryError("Filter operator 'between' needs a [low, high] pair")
+        filters.append({"column": item["column"], "op": op, "value": value})
+
+    group_by = _as_list(payload.get("group_by"))
+    if len(set(group_by)) != len(group_by):
+        raise QueryError("Group-by columns must be distinct")
+
+    aggregations = []
+    for item in _as_list(payload.get("aggregations")) or [{"agg": "count"}]:
+        if isinstance(item, str):
+            item = {"column": item, "agg": "sum"}
+        if not isinstance(item, dict):
+            raise QueryError(f"Invalid aggregation {item!r}")
+        agg = item.get("agg", "sum")
+        if agg not in QUERY_AGGREGATIONS:
+            raise QueryError(f"Unknown aggregation {agg!r}; expected one of {list(QUERY_AGGREGATIONS)}")
+        column = item.get("column")
+        if column is None and agg != 'count':
+            raise QueryError(f"Aggregation {agg!r} needs a 'column'")
+        name = item.get("as") or (f"{agg}({column})" if column is not None else "count")
+        aggregations.append({"column": column, "agg": agg, "name": name})
+
+    names = list(group_by) + [aggregation["name"] for aggregation in aggregations]
+    if len(set(names)) != len(names):
+        raise QueryError("Output column names must be distinct; name aggregations with 'as'")
+
+    sort = []
+    for item in _as_list(payload.get("sort")):
+        if isinstance(item, str):
+            item = {"column": item}
+        if not isinstance(item, dict) or item.get("column") not in names:
+            raise QueryError(f"Invalid sort {item!r}: the column must be one of {names}")
+        order = item.get("order", "asc")
+        if order not in ('asc', 'desc'):
+            raise QueryError(f"Invalid sort order {order!r}; expected 'asc' or 'desc'")
+        sort.append((item["column"], order == 'asc'))
+
+    limit = payload.get("limit", QUERY_MAX_ROWS)
+    if isinstance(limit, bool) or not isinstance(limit, int) or limit < 0:
+        raise QueryError(f"Invalid limit {limit!r}: expected a non-negative integer")
+
+    chart = payload.get("chart", "bar" if len(group_by) == 1 else "none")
+    if chart != "none":
+        if chart not in QUERY_CHARTS:
+            raise QueryError(f"Unknown chart {chart!r}; expected one of {list(QUERY_CHARTS) + ['none']}")
+        if len(group_by) != 1 or len(aggregations) < QUERY_CHARTS[chart][1]:
+            raise QueryError(f"A {chart} chart needs one group-by column and "
+                             f"{QUERY_CHARTS[chart][1]} aggregation(s)")
+
+    return {
+        "filters": filters,
+        "group_by": group_by,
+        "aggregations": aggregations,
+        "sort": sort,
+        "limit": min(limit, QUERY_MAX_ROWS),
+        "chart": chart,
+        "title": payload.get("title")
+    }
+
+
+_codes_cache: "OrderedDict[Tuple[Any, Any], Tuple[np.ndarray, pd.Index]]" = OrderedDict()
+_codes_lock = threading.Lock()
+
+
+def _is_label(series: pd.Series) -> bool:
+    return (pd.api.types.is_object_dtype(series) or isinstance(series.dtype, pd.CategoricalDtype)
+            or pd.api.types.is_string_dtype(series) or pd.api.types.is_bool_dtype(series))
+
+
+def _encode(dataset_key: Optional[Any], series: pd.Series) -> Tuple[np.ndarray, pd.Index]:
+    """Return integer codes (-1 for missing values) and the distinct values of a column, cached per dataset."""
+    key = (dataset_key, series.name) if dataset_key is not None else None
+    if key is not None:
+        with _codes_lock:
+            cached = _codes_cache.get(key)
+            if cached is not None and len(cached[0]) == len(series):
+                _codes_cache.move_to_end(key)
+                return cached
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        encoded = (series.cat.codes.to_numpy(), series.cat.categories)
+    else:
+        codes, uniques = pd.factorize(series)
+        encoded = (codes, pd.Index(uniques))
+    if key is not None:
+        with _codes_lock:
+            _codes_cache[key] = encoded
+            while len(_codes_cache) > QUERY_CODES_CACHE_MAX_ENTRIES:
+                _codes_cache.popitem(last=False)
+    return encoded
+
+
+def _convert_value(series: pd.Series, value: Any) -> Any:
+    """Convert a JSON filter value (or list of values) to the type of a column."""
+    if isinstance(value, list):
+        return [_convert_value(series, item) for item in value]
+    try:
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return pd.Timestamp(value)
+        if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series) \
+                and isinstance(value, str):
+            return float(value)
+    except (ValueError, TypeError):
+        raise QueryError(f"Invalid value {value!r} for column {series.name!r}")
+    return value
+
+
+def _compare(values: pd.Series, op: str, value: Any) -> np.ndarray:
+    """Evaluate a filter operator over values, missing values never matching."""
+    try:
+        if op == '==':
+            matches = values == value
+        elif op == '!=':
+            matches = values != value
+        elif op == '<':
+            matches = values < value
+        elif op == '<=':
+            matches = values <= value
+        elif op == '>':
+            matches = values > value
+        elif op == '>=':
+            matches = values >= value
+        elif op == 'in':
+            matches = values.isin(value)
+        elif op == 'not_in':
+            matches = ~values.isin(value)
+        elif op == 'between':
+            matches = (values >= value[0]) & (values <= value[1])
+        else:
+            matches = values.astype(str).str.contains(str(value), case=False, regex=False)
+    except TypeError as e:
+        raise QueryError(f"Cannot apply {op!r} to column {values.name!r} with value {value!r}: {str(e)}")
+    return (matches & values.notna()).to_numpy(dtype=bool)
+
+
+def _filter_mask(df: pd.DataFrame, dataset_key: Optional[Any], filters: List[Dict[str, Any]]) -> Optional[np.ndarray]:
+    """Combine the filters of a query into one row mask, or None without filters."""
+    mask = None
+    for item in filters:
+        series = df[item["column"]]
+        if item["op"] in ('is_null', 'not_null'):
+            matches = series.isna().to_numpy()
+            if item["op"] == 'not_null':
+                matches = ~matches
+        elif _is_label(series):
+            # Evaluated once per distinct value, then looked up by code (code -1, missing, never matches)
+            codes, uniques = _encode(dataset_key, series)
+            per_value = _compare(pd.Series(uniques, name=series.name), item["op"], item["value"])
+            matches = np.append(per_value, False)[codes]
+        else:
+            matches = _compare(series, item["op"], _convert_value(series, item["value"]))
+        mask = matches if mask is None else mask & matches
+    return mask
+
+
+def _numeric_values(series: pd.Series) -> np.ndarray:
+    if not pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+        raise QueryError(f"Column {series.name!r} is not numeric")
+    if series.dtype.kind == 'f':
+        # Float columns already hold NaN for missing values: no copy needed
+        return series.to_numpy()
+    return series.to_numpy(dtype=float, na_value=np.nan)
+
+
+def _aggregate_groups(df: pd.DataFrame, dataset_key: Optional[Any], query: Dict[str, Any],
+                      mask: Optional[np.ndarray]) -> pd.DataFrame:
+    """Group the selected rows and compute the aggregations, one row per non-empty group."""
+    group_by = query["group_by"]
+    encoded = [_encode(dataset_key, df[col]) for col in group_by]
+    # Rows with a missing group value belong to no group, as in pandas
+    selected = mask
+    for codes, _ in encoded:
+        if (codes < 0).any():
+            selected = (codes >= 0) if selected is None else selected & (codes >= 0)
+
+    # Selected row positions, so each column is gathered without rescanning the mask
+    positions = None if selected is None else np.flatnonzero(selected)
+
+    def take(values: np.ndarray) -> np.ndarray:
+        return values if positions is None else values.take(positions)
+
+    # Number the groups by combining the codes of the group-by columns (mixed radix),
+    # renumbering the observed combinations whenever the numbers could overflow
+    selected_codes = [take(codes) for codes, _ in encoded]
+    num_rows = len(df) if positions is None else len(positions)
+    ids = np.zeros(num_rows if group_by else 0, dtype=np.int64)
+    radix = 1
+    for codes, (_, uniques) in zip(selected_codes, encoded):
+        cardinality = max(len(uniques), 1)
+        if radix * cardinality > 2 ** 62:
+            ids, observed = pd.factorize(ids)
+            radix = max(len(observed), 1)
+        ids = ids * cardinality + codes
+        radix *= cardinality
+    if radix <= 2 * len(df) + 1:
+        num_groups = radix
+    else:
+        # Too many combinations for a dense numbering: number the observed ones
+        ids, observed = pd.factorize(ids)
+        num_groups = len(observed)
+
+    sizes = np.bincount(ids, minlength=num_groups) if group_by else np.array([num_rows])
+    columns = {}
+    for aggregation in query["aggregations"]:
+        if aggregation["column"] is None:
+            columns[aggregation["name"]] = sizes
+            continue
+        values = take(_numeric_values(df[aggregation["column"]]))
+        valid = ~np.isnan(values)
+        if not valid.all():
+            values, value_ids = values[valid], ids[valid] if group_by else ids
+        else:
+            value_ids = ids
+        agg = aggregation["agg"]
+        if not group_by:
+            # A single group: plain reductions, without numbering the rows
+            columns[aggregation["name"]] = np.array([
+                len(values) if agg == 'count' else getattr(np, agg)(values) if len(values) else
+                (0.0 if agg == 'sum' else np.nan)], dtype=float)
+            continue
+        counts = np.bincount(value_ids, minlength=num_groups)
+        if agg == 'count':
+            result = counts
+        elif agg in ('sum', 'mean'):
+            sums = np.bincount(value_ids, weights=values, minlength=num_groups)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                result = sums if agg == 'sum' else np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+        else:
+            grouped = pd.Series(values).groupby(value_ids).agg(agg)
+            result = grouped.reindex(range(num_groups)).to_numpy(dtype=float)
+        columns[aggregation["name"]] = result
+
+    present = sizes > 0 if group_by else np.ones(1, dtype=bool)
+    # Any selected row of a group gives its group values
+    representative = np.zeros(num_groups, dtype=np.int64)
+    representative[ids] = np.arange(len(ids))
+    representative = representative[present]
+    frame = pd.DataFrame({
+        col: np.asarray(uniques.take(codes[representative]), dtype=object)
+        for col, codes, (_, uniques) in zip(group_by, selected_codes, encoded)
+    })
+    for name, result in columns.items():
+        frame[name] = result[present]
+    return frame
+
+
+def _rollup_frame(file_path: str, query: Dict[str, Any]) -> Optional[pd.DataFrame]:
+    """Answer a query from the dataset's rollup cube, or return None if the cube does not cover it."""
+    if query["filters"] or len(query["group_by"]) != 1:
+        return None
+    group_col = query["group_by"][0]
+    if any(aggregation["agg"] not in _ROLLUP_AGGREGATIONS for aggregation in query["aggregations"]):
+        return None
+    rollup = load_rollup_cube(file_path)
+    if rollup is None or group_col not in rollup.tables:
+        return None
+    frame = pd.DataFrame({group_col: rollup.tables[group_col][0]})
+    for aggregation in query["aggregations"]:
+        if aggregation["column"] is None:
+            frame[aggregation["name"]] = rollup.group_sizes(group_col).to_numpy()
+        elif rollup.covers(group_col, [aggregation["column"]], aggregation["agg"]):
+            frame[aggregation["name"]] = rollup.frame(group_col, [aggregation["column"]], aggregation["agg"])[aggregation["column"]].to_numpy()
+        else:
+            return None
+    return frame
+
+
+def _check_columns(file_path: str, query: Dict[str, Any]) -> List[Any]:
+    """Return the columns a query reads, raising QueryError for unknown ones."""
+    needed = [item["column"] for item in query["filters"]] + list(query["group_by"]) + \
+        [aggregation["column"] for aggregation in query["aggregations"] if aggregation["column"] is not None]
+    needed = list(dict.fromkeys(needed))
+    available = set(get_dataset_columns(file_path))
+    for col in needed:
+        if col not in available:
+            message = f"Unknown column {col!r}."
+            index = load_column_index(file_path)
+            suggestions = index.suggest(str(col)) if index is not None else []
+            if suggestions:
+                message += f" Did you mean {', '.join(repr(name) for name in suggestions)}?"
+            raise QueryError(message)
+    return needed
+
+
+def _chart(frame: pd.DataFrame, query: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Build the ECharts configuration of a query result with the data exploration chart generators.
+
+    The result is charted row for row (see the generators' presorted argument),
+    so the chart shows the groups of 'data' in the same order.
+    """
+    if query["chart"] == "none":
+        return None
+    generator, value_count = QUERY_CHARTS[query["chart"]]
+    group_col = query["group_by"][0]
+    value_cols = [aggregation["name"] for aggregation in query["aggregations"][:value_count]]
+    title = query["title"] or f"{' vs '.join(value_cols)} by {group_col}"
+    return generator(frame, group_col, *value_cols, title, presorted=True)
+
+
+def run_query(file_path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Run a declarative aggregation query on a dataset.
+
+    Args:
+        file_path: Path to the dataset file
+        payload: The query (see parse_query)
+
+    Returns:
+        Dictionary with the output 'columns', their values in 'data' (one
+        array per column), the number of groups before the limit in
+        'total_rows', the ECharts 'chart' (or None), the 'source' the query
+        was answered from ("rollup" or "columns") and 'elapsed_ms'
+
+    Raises:
+        QueryError: If the query is malformed or refers to unknown columns
+    """
+    start_time = time.perf_counter()
+    query = parse_query(payload)
+    frame = _rollup_frame(file_path, query)
+    source = "rollup"
+    if frame is None:
+        source = "columns"
+        df, _ = load_dataframe_columns(file_path, _check_columns(file_path, query))
+        dataset_key = get_dataset_key(file_path)
+        frame = _aggregate_groups(df, dataset_key, query, _filter_mask(df, dataset_key, query["filters"]))
+
+    sort = query["sort"] or [(col, True) for col in query["group_by"]]
+    if sort and len(frame) > 1:
+        try:
+            frame = frame.sort_values([col for col, _ in sort], ascending=[ascending for _, ascending in sort],
+                                      kind='stable', na_position='last')
+        except TypeError:
+            # Group values of mixed types have no order: keep the group order
+            pass
+    total_rows = len(frame)
+    frame = frame.head(query["limit"]).reset_index(drop=True)
+
+    return {
+        "columns": list(frame.columns),
+        "data": {col: frame[col].tolist() for col in frame.columns},
+        "total_rows": total_rows,
+        "chart": _chart(frame, query),
+        "source": source,
+        "elapsed_ms": round((time.perf_counter() - start_time) * 1000, 2)
+    }
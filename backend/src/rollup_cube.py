@@ -0,0 +1,325 @@
+"""
+Rollup Cube for Agentic Dashboard App.
+
+This module materializes, once per dataset, the per-group sums, non-null
+counts, minima and maxima of every measure column by every low-cardinality
+category column. Bar, pie and stacked bar charts and grouped queries over
+those columns are then answered from the cube in time proportional to the
+number of groups, without scanning the rows.
+
+The cube is built after profiling and stored next to the dataset in a
+compressed NumPy archive, together with the size and modification time of
+the file it was built from; a cube that no longer matches its file is
+ignored and rebuilt. Cubes are mergeable, so rows appended to a dataset only
+need to be rolled up themselves.
+"""
+
+import os
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.column_index import ColumnIndex
+from src.dataset_loader import load_dataframe
+from src.streaming_summary import should_stream, iter_typed_chunks
+from src.upload_store import get_artifact_path
+
+# Category columns with more distinct values than this are not rolled up
+ROLLUP_MAX_GROUPS = int(os.getenv("ROLLUP_MAX_GROUPS", "1000"))
+
+# Maximum number of (group, measure) cells of a cube, all category columns together
+ROLLUP_MAX_CELLS = int(os.getenv("ROLLUP_MAX_CELLS", "5000000"))
+
+# Name of the cube artifact stored with each dataset
+ROLLUP_ARTIFACT_NAME = 'rollup.npz'
+
+# Bumped whenever the cube layout changes, so older cubes are rebuilt
+ROLLUP_VERSION = 1
+
+# Aggregations a cube can answer; 'mean' is derived from the sums and counts
+ROLLUP_AGGREGATIONS = ('sum', 'count', 'min', 'max', 'mean')
+
+# Statistics stored per measure, in the order of their blocks in a table
+_STATS = ('sum', 'count', 'min', 'max')
+
+# Number of loaded cubes kept in memory
+_LOADED_MAX_ENTRIES = 16
+
+
+class RollupCube:
+    """
+    Grouped statistics of the measure columns of a dataset by each of its category columns.
+
+    Each category column has one table: the sorted group labels (as strings)
+    and a matrix with one row per group whose columns are the number of rows
+    of the group, then the sums, non-null counts, minima and maxima of every
+    measure, one block of len(measures) columns per statistic.
+    """
+
+    def __init__(self, dimensions: List[Any], measures: List[Any]):
+        self.dimensions = list(dimensions)
+        self.measures = list(measures)
+        self.num_rows = 0
+        self.tables: Dict[Any, Tuple[np.ndarray, np.ndarray]] = {}
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        """Add the rows of one chunk (or of a whole DataFrame)."""
+        self.num_rows += len(chunk)
+        values = chunk[self.measures].apply(pd.to_numeric, errors='coerce') if self.measures else None
+        for dim in list(self.dimensions):
+            grouped = (values if values is not None else chunk[[]]).groupby(chunk[dim], observed=True)
+            sizes = grouped.size()
+            blocks = [sizes.to_numpy(dtype=float)[:, None]]
+            if values is not None:
+                blocks += [grouped.sum().to_numpy(dtype=float), grouped.count().to_numpy(dtype=float),
+                           grouped.min().to_numpy(dtype=float), grouped.max().to_numpy(dtype=float)]
+            self._add(dim, sizes.index.astype(str).to_numpy(dtype=object), np.hstack(blocks))
+
+    def merge(self, other: 'RollupCube') -> 'RollupCube':
+        """Combine the cube of a later part of the same dataset into this one."""
+        self.num_rows += other.num_rows
+        for dim in list(self.dimensions):
+            if dim in other.tables:
+                self._add(dim, *other.tables[dim])
+            elif dim in other.dimensions:
+                continue
+            else:
+                self._drop(dim)
+        return self
+
+    def copy(self) -> 'RollupCube':
+        """Return an independent copy, e.g. to extend a cube shared through load_rollup_cube."""
+        return RollupCube(self.dimensions, self.measures).merge(self)
+
+    def _add(self, dim: Any, labels: np.ndarray, stats: np.ndarray) -> None:
+        if dim in self.tables:
+            labels = np.concatenate([self.tables[dim][0], labels])
+            stats = np.vstack([self.tables[dim][1], stats])
+        m = len(self.measures)
+        grouped = pd.DataFrame(stats, index=pd.Index(labels, dtype=object)).groupby(level=0, sort=True)
+        # Group sizes, sums and counts add up; minima and maxima combine
+        combined = pd.concat([grouped[list(range(0, 1 + 2 * m))].sum(),
+                              grouped[list(range(1 + 2 * m, 1 + 3 * m))].min(),
+                              grouped[list(range(1 + 3 * m, 1 + 4 * m))].max()], axis=1)
+        if len(combined) > ROLLUP_MAX_GROUPS:
+            print(f"Rollup of {dim!r} dropped: more than {ROLLUP_MAX_GROUPS} groups")
+            self._drop(dim)
+            return
+        self.tables[dim] = (combined.index.to_numpy(dtype=object), combined.to_numpy(dtype=float))
+
+    def _drop(self, dim: Any) -> None:
+        self.dimensions.remove(dim)
+        self.tables.pop(dim, None)
+
+    def covers(self, dim: Any, value_cols: Sequence[Any], agg: str = 'sum') -> bool:
+        """Check whether the cube can answer an aggregation of value columns by a category column."""
+        return (agg in ROLLUP_AGGREGATIONS and dim in self.tables
+                and all(col in self.measures for col in value_cols))
+
+    def frame(self, dim: Any, value_cols: Sequence[Any], agg: str = 'sum') -> pd.DataFrame:
+        """
+        Return aggregated value columns per group of a category column.
+
+        Args:
+            dim: Category column
+            value_cols: Measure columns to aggregate
+            agg: One of ROLLUP_AGGREGATIONS
+
+        Returns:
+            Frame with the category column and one aggregated column per value
+            column, one row per group sorted by label, as aggregation_cache.aggregate returns
+
+        Raises:
+            KeyError: If the cube does not cover the request (see covers)
+        """
+        if not self.covers(dim, value_cols, agg):
+            raise KeyError(f"The rollup cube has no {agg} of {list(value_cols)} by {dim!r}")
+        labels, stats = self.tables[dim]
+        m = len(self.measures)
+        columns = {dim: labels.copy()}
+        for col in value_cols:
+            j = self.measures.index(col)
+            block = {stat: stats[:, 1 + position * m + j] for position, stat in enumerate(_STATS)}
+            if agg == 'mean':
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    columns[col] = np.where(block['count'] > 0, block['sum'] / block['count'], np.nan)
+            elif agg == 'count':
+                columns[col] = block['count'].astype(np.int64)
+            elif agg == 'sum':
+                # Groups without values sum to 0, as in pandas
+                columns[col] = np.nan_to_num(block['sum'], nan=0.0)
+            else:
+                columns[col] = block[agg]
+        return pd.DataFrame(columns)
+
+    def group_sizes(self, dim: Any) -> pd.Series:
+        """Return the number of rows of each group of a category column."""
+        labels, stats = self.tables[dim]
+        return pd.Series(stats[:, 0].astype(np.int64), index=pd.Index(labels, name=dim))
+
+
+def select_rollup_columns(index: ColumnIndex) -> Tuple[List[Any], List[Any]]:
+    """
+    Choose the category and measure columns of a dataset's cube.
+
+    Category columns with at most ROLLUP_MAX_GROUPS distinct values are taken
+    fewest groups first, while the cube stays within ROLLUP_MAX_CELLS cells.
+
+    Args:
+        index: Column index of the dataset
+
+    Returns:
+        Tuple of the category columns and the measure columns
+    """
+    measures = index.columns_with(role="measure")
+    candidates = [
+        profile for profile in index.profiles.values()
+        if profile["role"] == "dimension" and profile["unique_values"] is not None
+        and profile["unique_values"] <= ROLLUP_MAX_GROUPS
+    ]
+    dimensions, cells = [], 0
+    for profile in sorted(candidates, key=lambda profile: profile["unique_values"]):
+        cost = profile["unique_values"] * max(len(measures), 1)
+        if cells + cost > ROLLUP_MAX_CELLS:
+            break
+        dimensions.append(profile["name"])
+        cells += cost
+    order = {name: position for position, name in enumerate(index.columns)}
+    return sorted(dimensions, key=order.get), measures
+
+
+def _source_signature(file_path: str) -> Dict[str, int]:
+    stat = os.stat(file_path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def get_rollup_path(file_path: str) -> str:
+    """Return the path of the stored cube of a dataset."""
+    return get_artifact_path(file_path, ROLLUP_ARTIFACT_NAME)
+
+
+def build_rollup_cube(file_path: str, index: ColumnIndex) -> RollupCube:
+    """
+    Roll up a dataset, in chunks for files summarized in streaming mode.
+
+    Args:
+        file_path: Path to the dataset file
+        index: Column index of the dataset
+
+    Returns:
+        The RollupCube of the whole file
+    """
+    cube = RollupCube(*select_rollup_columns(index))
+    if should_stream(file_path):
+        for chunk in iter_typed_chunks(file_path):
+            cube.update(chunk)
+    else:
+        df, _ = load_dataframe(file_path)
+        cube.update(df)
+    return cube
+
+
+def save_rollup_cube(file_path: str, cube: RollupCube) -> str:
+    """
+    Persist the cube of a dataset next to it.
+
+    Args:
+        file_path: Path to the dataset file the cube describes
+        cube: The cube to store
+
+    Returns:
+        Path of the stored cube
+    """
+    meta = {
+        "version": ROLLUP_VERSION,
+        "source": _source_signature(file_path),
+        "num_rows": cube.num_rows,
+        "dimensions": list(cube.tables),
+        "measures": cube.measures
+    }
+    arrays = {"meta": np.array(json.dumps(meta, default=str))}
+    for position, (labels, stats) in enumerate(cube.tables.values()):
+        arrays[f"labels_{position}"] = labels.astype(str)
+        arrays[f"stats_{position}"] = stats
+    rollup_path = get_rollup_path(file_path)
+    temp_path = f"{rollup_path}.tmp-{os.getpid()}-{threading.get_ident()}.npz"
+    np.savez_compressed(temp_path, **arrays)
+    os.replace(temp_path, rollup_path)
+    with _loaded_lock:
+        _loaded.pop(os.path.abspath(file_path), None)
+    return rollup_path
+
+
+_loaded: "OrderedDict[str, Tuple[Dict[str, int], RollupCube]]" = OrderedDict()
+_loaded_lock = threading.Lock()
+
+
+def _read_rollup_cube(file_path: str, signature: Dict[str, int]) -> Optional[RollupCube]:
+    try:
+        with np.load(get_rollup_path(file_path), allow_pickle=False) as archive:
+            meta = json.loads(str(archive["meta"]))
+            if meta.get("version") != ROLLUP_VERSION or meta.get("source") != signature:
+                return None
+            cube = RollupCube(meta["dimensions"], meta["measures"])
+            cube.num_rows = meta["num_rows"]
+            for position, dim in enumerate(meta["dimensions"]):
+                cube.tables[dim] = (archive[f"labels_{position}"].astype(object), archive[f"stats_{position}"])
+    except (OSError, ValueError, KeyError):
+        return None
+    return cube
+
+
+def load_rollup_cube(file_path: Optional[str]) -> Optional[RollupCube]:
+    """
+    Return the stored cube of a dataset if it matches the current file.
+
+    Loaded cubes are kept in memory until their file changes and are shared
+    between callers: take a copy before updating one.
+
+    Args:
+        file_path: Path to the dataset file
+
+    Returns:
+        The cube, or None if it is missing, outdated or unreadable
+    """
+    if not file_path:
+        return None
+    try:
+        signature = _source_signature(file_path)
+    except OSError:
+        return None
+    key = os.path.abspath(file_path)
+    with _loaded_lock:
+        entry = _loaded.get(key)
+        if entry is not None and entry[0] == signature:
+            _loaded.move_to_end(key)
+            return entry[1]
+    cube = _read_rollup_cube(file_path, signature)
+    if cube is not None:
+        with _loaded_lock:
+            _loaded[key] = (signature, cube)
+            while len(_loaded) > _LOADED_MAX_ENTRIES:
+                _loaded.popitem(last=False)
+    return cube
+
+
+def ensure_rollup_cube(file_path: str, index: ColumnIndex) -> RollupCube:
+    """
+    Return the stored cube of a dataset, building and storing it if it is missing or outdated.
+
+    Args:
+        file_path: Path to the dataset file
+        index: Column index of the dataset
+
+    Returns:
+        The cube of the current file
+    """
+    cube = load_rollup_cube(file_path)
+    if cube is None:
+        cube = build_rollup_cube(file_path, index)
+        save_rollup_cube(file_path, cube)
+    return cube
@@ -0,0 +1,193 @@
+"""
+Row Access for Agentic Dashboard App.
+
+This module serves pages of a dataset's rows for the dashboard's data grid,
+with column projection and an optional sort. Pages are taken from the cached
+typed dataset (itself read from the memory-mapped columnar sidecar when one
+exists), so a page costs time proportional to its size, not to the dataset.
+
+A sorted page needs the order of all rows by the sort column. That order is
+computed once per (dataset, column) with a stable argsort and kept in an LRU
+cache; descending pages read the same permutation backwards, so paging
+through a sorted table only gathers the rows of each page.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.aggregation_cache import get_dataset_key
+from src.dataset_loader import load_dataframe
+from src.profiling_service import load_column_index
+
+# Default and maximum number of rows per page
+ROWS_DEFAULT_LIMIT = int(os.getenv("ROWS_DEFAULT_LIMIT", "100"))
+ROWS_MAX_LIMIT = int(os.getenv("ROWS_MAX_LIMIT", "1000"))
+
+# Number of sort permutations kept in memory, all datasets together
+ROWS_SORT_CACHE_MAX_ENTRIES = int(os.getenv("ROWS_SORT_CACHE_MAX_ENTRIES", "32"))
+
+
+class RowAccessError(Exception):
+    """Raised when a page request is malformed or refers to unknown columns."""
+
+
+class SortPermutation:
+    """
+    The row positions of a dataset in ascending order of one column.
+
+    Missing values come last in both directions: positions[:non_null] are the
+    rows with a value, in ascending order (ties in row order), followed by the
+    rows without one, in row order.
+    """
+
+    def __init__(self, positions: np.ndarray, non_null: int):
+        self.positions = positions
+        self.non_null = non_null
+
+    def page(self, offset: int, limit: int, ascending: bool = True) -> np.ndarray:
+        """Return the row positions of a page of the sorted rows."""
+        stop = min(offset + limit, len(self.positions))
+        if ascending or offset >= stop:
+            return self.positions[offset:stop]
+        # Rows with a value backwards, then the rows without one
+        head_stop = min(stop, self.non_null)
+        head = self.positions[self.non_null - head_stop:self.non_null - offset][::-1] \
+            if offset < self.non_null else self.positions[:0]
+        tail = self.positions[max(offset, self.non_null):stop]
+        return np.concatenate([head, tail])
+
+
+def _sort_keys(series: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """Return sortable keys of a column and the mask of its missing values."""
+    missing = series.isna().to_numpy()
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return series.to_numpy(dtype=float, na_value=np.nan), missing
+    if pd.api.types.is_datetime64_any_dtype(series) or pd.api.types.is_bool_dtype(series):
+        return series.to_numpy(), missing
+    try:
+        codes, _ = pd.factorize(series, sort=True)
+    except TypeError:
+        # Values of mixed types have no order of their own: sort them as text
+        codes, _ = pd.factorize(series.astype(str), sort=True)
+    return codes, missing
+
+
+def compute_sort_permutation(series: pd.Series) -> SortPermutation:
+    """
+    Order the rows of a column, missing values last.
+
+    Args:
+        series: The sort column
+
+    Returns:
+        The SortPermutation of the column
+    """
+    keys, missing = _sort_keys(series)
+    dtype = np.int32 if len(series) < np.iinfo(np.int32).max else np.int64
+    present = np.flatnonzero(~missing).astype(dtype)
+    order = present[np.argsort(keys[present], kind='stable')]
+    return SortPermutation(np.concatenate([order, np.flatnonzero(missing).astype(dtype)]), len(present))
+
+
+_permutations: "OrderedDict[Tuple[Any, Any], SortPermutation]" = OrderedDict()
+_permutations_lock = threading.Lock()
+
+
+def get_sort_permutation(dataset_key: Optional[Any], series: pd.Series) -> SortPermutation:
+    """
+    Return the sort permutation of a column, cached per dataset.
+
+    Args:
+        dataset_key: Key of the dataset's content (see aggregation_cache.get_dataset_key),
+            or None to skip the cache
+        series: The sort column
+
+    Returns:
+        The SortPermutation of the column
+    """
+    key = (dataset_key, series.name) if dataset_key is not None else None
+    if key is not None:
+        with _permutations_lock:
+            cached = _permutations.get(key)
+            if cached is not None and len(cached.positions) == len(series):
+                _permutations.move_to_end(key)
+                return cached
+    permutation = compute_sort_permutation(series)
+    if key is not None:
+        with _permutations_lock:
+            _permutations[key] = permutation
+            while len(_permutations) > ROWS_SORT_CACHE_MAX_ENTRIES:
+                _permutations.popitem(last=False)
+    return permutation
+
+
+def clear_sort_permutations() -> None:
+    """Remove every cached sort permutation."""
+    with _permutations_lock:
+        _permutations.clear()
+
+
+def _check_columns(file_path: str, df: pd.DataFrame, columns: List[Any]) -> None:
+    for col in columns:
+        if col not in df.columns:
+            message = f"Unknown column {col!r}."
+            index = load_column_index(file_path)
+            suggestions = index.suggest(str(col)) if index is not None else []
+            if suggestions:
+                message += f" Did you mean {', '.join(repr(name) for name in suggestions)}?"
+            raise RowAccessError(message)
+
+
+def get_rows(file_path: str, offset: int = 0, limit: Optional[int] = None,
+             columns: Optional[List[Any]] = None, sort: Optional[Any] = None,
+             ascending: bool = True) -> Dict[str, Any]:
+    """
+    Return a page of the rows of a dataset.
+
+    Args:
+        file_path: Path to the dataset file
+        offset: Position of the first row of the page in the (sorted) rows
+        limit: Number of rows of the page (default ROWS_DEFAULT_LIMIT, at most ROWS_MAX_LIMIT)
+        columns: Columns to return (default: all of them)
+        sort: Column to sort the rows by (default: file order)
+        ascending: Sort direction; missing values come last either way
+
+    Returns:
+        Dictionary with the returned 'columns', the page 'rows' (one record
+        per row), their 'row_ids' (positions in the file), 'offset', 'limit'
+        and the dataset's 'total_rows'
+
+    Raises:
+        RowAccessError: If the paging arguments are invalid or a column is unknown
+    """
+    limit = ROWS_DEFAULT_LIMIT if limit is None else limit
+    if offset < 0 or limit < 0:
+        raise RowAccessError("offset and limit must not be negative")
+    limit = min(limit, ROWS_MAX_LIMIT)
+
+    df, _ = load_dataframe(file_path)
+    columns = list(df.columns) if not columns else list(dict.fromkeys(columns))
+    _check_columns(file_path, df, columns + ([sort] if sort is not None else []))
+
+    total_rows = len(df)
+    if sort is None:
+        positions = np.arange(min(offset, total_rows), min(offset + limit, total_rows))
+    else:
+        positions = get_sort_permutation(get_dataset_key(file_path), df[sort]).page(offset, limit, ascending)
+
+    # Gather the page column by column: selecting columns of the shared frame first would copy them whole
+    page = pd.DataFrame({col: df[col].take(positions).to_numpy() for col in columns}, columns=columns)
+    return {
+        "columns": columns,
+        "rows": page.to_dict(orient='records'),
+        "row_ids": positions.tolist(),
+        "offset": offset,
+        "limit": limit,
+        "total_rows": total_rows,
+        "sort": None if sort is None else {"column": sort, "order": "asc" if ascending else "desc"}
+    }
@@ -0,0 +1,201 @@
+"""
+Schema Inference for Agentic Dashboard App.
+
+This module decides the type of every column of a freshly parsed dataset from
+a small sample (integer, float with decimal point or decimal comma, date,
+categorical or free text) and then converts each column with a single
+vectorized pass. It understands Italian-formatted amounts such as
+"1.234,56", which the plain pd.to_numeric coercion turned into NaN.
+"""
+
+import os
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Number of non-null values inspected per column
+SCHEMA_SAMPLE_SIZE = int(os.getenv("SCHEMA_SAMPLE_SIZE", "1000"))
+
+# Minimum fraction of sampled values that must match a type for the column to be converted
+TYPE_MATCH_THRESHOLD = 0.7
+
+# Object columns with at most this ratio of distinct values in the sample are categorical
+CATEGORICAL_MAX_UNIQUE_RATIO = 0.5
+
+# Plain numbers as understood by pd.to_numeric (no thousands separator)
+PLAIN_NUMBER_PATTERN = r'[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?'
+# "1.234,56" / "1234,56" / "1.234"
+DECIMAL_COMMA_PATTERN = r'[+-]?(\d{1,3}(\.\d{3})+|\d+)(,\d+)?'
+# "1,234.56" / "1,234"
+THOUSANDS_COMMA_PATTERN = r'[+-]?\d{1,3}(,\d{3})+(\.\d+)?'
+
+# Decimal separator (as a regex) of each number notation
+DECIMAL_SEPARATORS = {
+    "plain": r'[.eE]',
+    "decimal_comma": r',',
+    "thousands_comma": r'\.',
+}
+
+# Candidate date formats, tried in order (day-first as in Italian data)
+DATE_FORMATS = [
+    '%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y', '%d.%m.%Y',
+    '%Y-%m-%d %H:%M:%S', '%d/%m/%Y %H:%M:%S', '%d/%m/%Y %H:%M', '%Y/%m/%d',
+]
+
+
+def _sample_values(series: pd.Series, sample_size: int) -> pd.Series:
+    """Take an evenly spaced sample of the non-null values of a column as stripped strings."""
+    non_null = series.dropna()
+    if len(non_null) > sample_size:
+        positions = np.linspace(0, len(non_null) - 1, sample_size).astype(int)
+        non_null = non_null.iloc[positions]
+    values = non_null.astype(str).str.strip()
+    return values[values != '']
+
+
+def _infer_numeric_format(values: pd.Series) -> Optional[str]:
+    """
+    Decide which number notation a sample of strings uses.
+
+    Returns:
+        "plain", "decimal_comma", "thousands_comma" or None if the values are not numbers
+    """
+    plain = values.str.fullmatch(PLAIN_NUMBER_PATTERN).mean()
+    decimal_comma = values.str.fullmatch(DECIMAL_COMMA_PATTERN).mean()
+    thousands_comma = values.str.fullmatch(THOUSANDS_COMMA_PATTERN).mean()
+
+    # Values such as "1.234" or "1,234" fit more than one notation; use the
+    # unambiguous ones as evidence: a comma followed by anything but three
+    # digits, a dot before a comma or repeated dot groups can only be the
+    # Italian notation.
+    comma_evidence = (values.str.contains(r',(?:\d{1,2}|\d{4,})$', regex=True)
+                      | values.str.contains(r'\..*,', regex=True)
+                      | values.str.contains(r'\.\d{3}\.', regex=True)).any()
+    dot_evidence = (values.str.contains(r'\.(?:\d{1,2}|\d{4,})$', regex=True)
+                    | values.str.contains(r',.*\.', regex=True)).any()
+
+    if decimal_comma >= TYPE_MATCH_THRESHOLD and comma_evidence and not dot_evidence:
+        return "decimal_comma"
+    if plain >= TYPE_MATCH_THRESHOLD:
+        return "plain"
+    if plain + thousands_comma >= TYPE_MATCH_THRESHOLD and thousands_comma > 0:
+        return "thousands_comma"
+    if decimal_comma >= TYPE_MATCH_THRESHOLD:
+        return "decimal_comma"
+    return None
+
+
+def _infer_date_format(values: pd.Series) -> Optional[str]:
+    """Return the first candidate date format that parses most of the sample, if any."""
+    # Dates need at least one separator; this avoids reading years or codes as dates
+    if not values.str.contains(r'\d[-/.]\d', regex=True).mean() >= TYPE_MATCH_THRESHOLD:
+        return None
+    for date_format in DATE_FORMATS:
+        parsed = pd.to_datetime(values, format=date_format, errors='coerce')
+        if parsed.notna().mean() >= TYPE_MATCH_THRESHOLD:
+            return date_format
+    return None
+
+
+def infer_column_schema(series: pd.Series, sample_size: int = SCHEMA_SAMPLE_SIZE) -> Dict[str, Any]:
+    """
+    Infer the type of a single column from a sample of its values.
+
+    Args:
+        series: The column to inspect
+        sample_size: Maximum number of non-null values to inspect
+
+    Returns:
+        Dictionary with a 'type' key ("int", "float", "bool", "date",
+        "categorical" or "text") and, for text columns that need
+        conversion, the 'number_format' or 'date_format' to apply
+    """
+    if pd.api.types.is_bool_dtype(series):
+        return {"type": "bool"}
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return {"type": "categorical"}
+    if pd.api.types.is_integer_dtype(series):
+        return {"type": "int"}
+    if pd.api.types.is_numeric_dtype(series):
+        return {"type": "float"}
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return {"type": "date"}
+
+    values = _sample_values(series, sample_size)
+    if values.empty:
+        return {"type": "text"}
+
+    number_format = _infer_numeric_format(values)
+    if number_format is not None:
+        converted = _convert_numbers(values, number_format)
+        # Amounts written with a decimal part ("10,00") stay floats even when the part is zero
+        has_decimal_separator = values.str.contains(DECIMAL_SEPARATORS[number_format], regex=True).any()
+        is_integral = not has_decimal_separator and bool(np.all(np.mod(converted.dropna(), 1) == 0))
+        return {"type": "int" if is_integral else "float", "number_format": number_format}
+
+    date_format = _infer_date_format(values)
+    if date_format is not None:
+        return {"type": "date", "date_format": date_format}
+
+    unique_ratio = values.nunique() / len(values)
+    return {"type": "categorical" if unique_ratio <= CATEGORICAL_MAX_UNIQUE_RATIO else "text"}
+
+
+def infer_schema(df: pd.DataFrame, sample_size: int = SCHEMA_SAMPLE_SIZE) -> Dict[str, Dict[str, Any]]:
+    """
+    Infer the schema of a DataFrame column by column from samples.
+
+    Args:
+        df: The freshly parsed DataFrame
+        sample_size: Maximum number of non-null values inspected per column
+
+    Returns:
+        Dictionary mapping column names to their inferred type specification
+    """
+    return {str(col): infer_column_schema(df[col], sample_size) for col in df.columns}
+
+
+def _convert_numbers(values: pd.Series, number_format: str) -> pd.Series:
+    """Convert strings written in the given number notation to floats, NaN where they do not parse."""
+    # Missing values become the string 'nan', which pd.to_numeric maps back to NaN
+    text = values.astype(str).str.strip()
+    if number_format == "decimal_comma":
+        text = text.str.replace('.', '', regex=False).str.replace(',', '.', regex=False)
+    elif number_format == "thousands_comma":
+        text = text.str.replace(',', '', regex=False)
+    return pd.to_numeric(text, errors='coerce')
+
+
+def apply_schema(df: pd.DataFrame, schema: Dict[str, Dict[str, Any]]) -> Tuple[pd.DataFrame, List[str]]:
+    """
+    Convert the columns of a DataFrame to the types recorded in a schema.
+
+    Every column is converted with vectorized string operations; values that
+    do not fit the inferred type become NaN/NaT.
+
+    Args:
+        df: The DataFrame to convert in place
+        schema: Schema returned by infer_schema
+
+    Returns:
+        Tuple containing the DataFrame and messages describing each conversion
+    """
+    messages = []
+    for col in df.columns:
+        spec = schema.get(str(col))
+        if not spec:
+            continue
+
+        if "number_format" in spec and not pd.api.types.is_numeric_dtype(df[col]):
+            converted = _convert_numbers(df[col], spec["number_format"])
+            if spec["type"] == "int" and converted.notna().all():
+                converted = converted.astype(np.int64)
+            df[col] = converted
+            suffix = " (decimal comma)" if spec["number_format"] == "decimal_comma" else ""
+            messages.append(f"Converted column '{col}' to numeric type{suffix}")
+        elif "date_format" in spec and not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = pd.to_datetime(df[col], format=spec["date_format"], errors='coerce')
+            messages.append(f"Converted column '{col}' to datetime type")
+
+    return df, messages
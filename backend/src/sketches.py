@@ -0,0 +1,257 @@
+"""
+Sketches for Agentic Dashboard App.
+
+This module implements the mergeable probabilistic summaries used for large
+datasets. Each sketch is built in a single pass over the values, uses memory
+independent of the number of rows and can be merged with a sketch of other
+rows (another chunk, or data appended later) as if both had been built over
+the combined values:
+
+- HyperLogLog estimates the number of distinct values. With the default
+  precision of 14 (16384 one-byte registers) the relative standard error is
+  1.04 / sqrt(16384), about 0.8%; small cardinalities are counted almost exactly.
+- KLLSketch estimates quantiles. With the default k of 200 the rank error is
+  below 1.65% with 99% confidence; while it holds every value it is exact.
+- SpaceSaving tracks the most frequent values. Every value occurring more than
+  N / capacity times is kept, and no count is overestimated by more than
+  N / capacity; while fewer distinct values than the capacity have been seen
+  the counts are exact.
+
+Sketches convert to and from plain dictionaries so they can be persisted.
+"""
+
+import math
+from typing import Dict, Any, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Precision (log2 of the register count) of the distinct-count sketch
+HLL_PRECISION = 14
+
+# Accuracy parameter of the quantile sketch
+KLL_K = 200
+
+# Counters kept by the heavy-hitter sketch
+SPACE_SAVING_CAPACITY = 1000
+
+
+def hash_values(values: Iterable[Any]) -> np.ndarray:
+    """
+    Hash values to 64 bits, consistently across chunks and processes.
+
+    Values are hashed by their string form, so the same label hashes alike
+    whether it was parsed as a number, a string or a categorical.
+    """
+    labels = pd.Series(values, dtype=object).astype(str)
+    return pd.util.hash_pandas_object(labels, index=False).to_numpy(dtype=np.uint64)
+
+
+class HyperLogLog:
+    """Distinct-count sketch (Flajolet et al.) with the small-range correction."""
+
+    def __init__(self, precision: int = HLL_PRECISION):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def update(self, values: Iterable[Any]) -> None:
+        """Add values; duplicates do not change the sketch, so distinct values suffice."""
+        hashes = hash_values(values)
+        if len(hashes) == 0:
+            return
+        index = (hashes >> np.uint64(64 - self.precision)).astype(np.int64)
+        # Rank of the first set bit in the low 32 bits; exponent from frexp is exact on 32-bit integers
+        low = (hashes & np.uint64(0xFFFFFFFF)).astype(np.float64)
+        rank = (33 - np.frexp(low)[1]).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other: 'HyperLogLog') -> 'HyperLogLog':
+        """Combine another sketch of the same precision into this one."""
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches of different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def estimate(self) -> int:
+        """Return the estimated number of distinct values."""
+        m = len(self.registers)
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if zeros == m:
+            return 0
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / float(np.sum(np.ldexp(1.0, -self.registers.astype(np.int64))))
+        if raw <= 2.5 * m and zeros > 0:
+            # Linear counting is more accurate for small cardinalities
+            return int(round(m * math.log(m / zeros)))
+        return int(round(raw))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"precision": self.precision, "registers": self.registers.tobytes().hex()}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'HyperLogLog':
+        sketch = cls(data["precision"])
+        sketch.registers = np.frombuffer(bytes.fromhex(data["registers"]), dtype=np.uint8).copy()
+        return sketch
+
+
+class KLLSketch:
+    """
+    Quantile sketch of Karnin, Lang and Liberty.
+
+    Values are kept in levels of compactors; an item at level h stands for 2**h
+    values. A full compactor sorts its items and promotes every other one to
+    the next level, starting at a random offset, which keeps the rank error
+    unbiased.
+    """
+
+    def __init__(self, k: int = KLL_K, seed: int = 0):
+        self.k = k
+        self.count = 0
+        self.levels: List[np.ndarray] = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(2, int(math.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self) -> None:
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                # An odd item out stays at this level
+                kept, items = (items[:1], items[1:]) if len(items) % 2 else (items[:0], items)
+                promoted = items[self._rng.integers(2)::2]
+                self.levels[level] = kept
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    def update(self, values: Iterable[float]) -> None:
+        """Add numeric values; NaN values are ignored."""
+        array = np.asarray(values, dtype=float)
+        array = array[~np.isnan(array)]
+        if len(array) == 0:
+            return
+        self.count += len(array)
+        self.levels[0] = np.concatenate([self.levels[0], array])
+        self._compress()
+
+    def merge(self, other: 'KLLSketch') -> 'KLLSketch':
+        """Combine another sketch into this one."""
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.count += other.count
+        self._compress()
+        return self
+
+    def quantiles(self, fractions: List[float]) -> List[Optional[float]]:
+        """
+        Estimate several quantiles at once.
+
+        Args:
+            fractions: Quantile fractions between 0 and 1
+
+        Returns:
+            Estimated values, or None for each fraction if the sketch is empty
+        """
+        if self.count == 0:
+            return [None for _ in fractions]
+        if len(self.levels) == 1:
+            # Nothing has been compacted yet: the quantiles are exact
+            return [float(value) for value in np.quantile(self.levels[0], fractions)]
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level_items), 2 ** level) for level, level_items in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        items, cumulative = items[order], np.cumsum(weights[order])
+        total = cumulative[-1]
+        positions = np.searchsorted(cumulative, np.asarray(fractions) * total, side='left')
+        return [float(items[min(position, len(items) - 1)]) for position in positions]
+
+    def quantile(self, fraction: float) -> Optional[float]:
+        """Estimate a single quantile."""
+        return self.quantiles([fraction])[0]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"k": self.k, "count": self.count, "levels": [items.tolist() for items in self.levels]}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'KLLSketch':
+        sketch = cls(data["k"])
+        sketch.count = data["count"]
+        sketch.levels = [np.asarray(items, dtype=float) for items in data["levels"]]
+        return sketch
+
+
+class SpaceSaving:
+    """
+    Heavy-hitter sketch of Metwally et al., in its mergeable form.
+
+    Besides the tracked counts the sketch keeps a floor: an upper bound on the
+    count of any value it does not track. Merging adds the counts of both
+    sketches, using each sketch's floor for values it lacks, and keeps the
+    largest counters.
+    """
+
+    def __init__(self, capacity: int = SPACE_SAVING_CAPACITY):
+        self.capacity = capacity
+        self.counts = pd.Series(dtype='int64')
+        self.errors = pd.Series(dtype='int64')
+        self.floor = 0
+
+    def update_counts(self, counts: pd.Series) -> None:
+        """Add exact counts of a chunk, indexed by value (labels are compared as strings)."""
+        counts = counts[counts > 0]
+        partial = SpaceSaving(self.capacity)
+        partial.counts = counts.groupby(counts.index.astype(str)).sum().astype('int64')
+        partial.errors = pd.Series(0, index=partial.counts.index, dtype='int64')
+        partial._truncate(0)
+        self.merge(partial)
+
+    def update(self, values: pd.Series) -> None:
+        """Add raw values; missing values are ignored."""
+        self.update_counts(values.value_counts())
+
+    def merge(self, other: 'SpaceSaving') -> 'SpaceSaving':
+        """Combine another sketch into this one."""
+        labels = self.counts.index.union(other.counts.index)
+        self.counts = (self.counts.reindex(labels, fill_value=self.floor)
+                       + other.counts.reindex(labels, fill_value=other.floor))
+        self.errors = (self.errors.reindex(labels, fill_value=self.floor)
+                       + other.errors.reindex(labels, fill_value=other.floor))
+        self._truncate(self.floor + other.floor)
+        return self
+
+    def _truncate(self, floor: int) -> None:
+        if len(self.counts) > self.capacity:
+            ranked = self.counts.sort_values(ascending=False, kind='stable')
+            floor = max(floor, int(ranked.iloc[self.capacity]))
+            self.counts = ranked.iloc[:self.capacity]
+            self.errors = self.errors.reindex(self.counts.index)
+        self.floor = floor
+
+    def top(self, n: int = 10) -> Dict[str, int]:
+        """Return the n most frequent values with their (upper-bound) counts."""
+        ranked = self.counts.sort_values(ascending=False, kind='stable').head(n)
+        return {str(value): int(count) for value, count in ranked.items()}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "capacity": self.capacity,
+            "floor": self.floor,
+            "counts": {str(value): int(count) for value, count in self.counts.items()},
+            "errors": {str(value): int(error) for value, error in self.errors.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'SpaceSaving':
+        sketch = cls(data["capacity"])
+        sketch.floor = data["floor"]
+        sketch.counts = pd.Series(data["counts"], dtype='int64')
+        sketch.errors = pd.Series(data["errors"], dtype='int64')
+        return sketch
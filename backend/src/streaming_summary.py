@@ -0,0 +1,440 @@
+"""
+Streaming Summary for Agentic Dashboard App.
+
+This module summarizes datasets that are too large to load in one piece. The
+file is parsed in chunks and every chunk produces partial results (counts,
+means, variances, extrema, sketches of quantiles, distinct and frequent
+values, grouped sums) that are merged into running accumulators, so peak
+memory is bounded by the chunk size rather than the file size. Accumulators
+can also be merged with each other, which lets chunks be summarized
+independently and combined afterwards, and they can be persisted so rows
+appended to a dataset later only need to be summarized themselves.
+"""
+
+import os
+import json
+import threading
+from typing import Dict, Any, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.dataset_loader import CHUNKABLE_EXTENSIONS, iter_csv_chunks
+from src.schema_inference import infer_schema, apply_schema
+from src.json_encoding import dumps
+from src.sketches import HyperLogLog, KLLSketch, SpaceSaving
+from src.upload_store import get_artifact_path
+
+# Files larger than this (in bytes) are summarized in streaming mode
+STREAMING_THRESHOLD_BYTES = int(os.getenv("STREAMING_THRESHOLD_BYTES", str(8 * 1024 * 1024)))
+
+# Number of rows parsed per chunk in streaming mode
+STREAMING_CHUNK_ROWS = int(os.getenv("STREAMING_CHUNK_ROWS", "100000"))
+
+# In-memory DataFrames with at least this many rows are summarized with sketches
+SKETCH_SUMMARY_MIN_ROWS = int(os.getenv("SKETCH_SUMMARY_MIN_ROWS", "1000000"))
+
+# Name of the persisted summary state stored with each dataset
+SUMMARY_STATE_ARTIFACT_NAME = 'summary_state.json'
+
+# Bumped whenever the state layout changes, so older states are rebuilt
+SUMMARY_STATE_VERSION = 1
+
+
+def should_stream(file_path: str) -> bool:
+    """
+    Check whether a dataset should be summarized in streaming mode.
+
+    Args:
+        file_path: Path to the dataset file
+
+    Returns:
+        True if the file is a chunkable text format larger than STREAMING_THRESHOLD_BYTES
+    """
+    if os.path.splitext(file_path)[1].lower() not in CHUNKABLE_EXTENSIONS:
+        return False
+    try:
+        return os.path.getsize(file_path) > STREAMING_THRESHOLD_BYTES
+    except OSError:
+        return False
+
+
+def iter_typed_chunks(file_path: str, chunk_rows: Optional[int] = None,
+                      schema: Optional[Dict[str, Dict[str, Any]]] = None) -> Iterator[pd.DataFrame]:
+    """
+    Parse a CSV file in chunks, converting every chunk with the schema of the first one.
+
+    Args:
+        file_path: Path to the CSV file
+        chunk_rows: Maximum number of rows per chunk (default STREAMING_CHUNK_ROWS)
+        schema: Schema to convert the chunks with instead of inferring one
+
+    Yields:
+        Type-converted DataFrames of at most chunk_rows rows
+    """
+    for chunk in iter_csv_chunks(file_path, chunk_rows or STREAMING_CHUNK_ROWS):
+        if schema is None:
+            schema = infer_schema(chunk)
+        chunk, _ = apply_schema(chunk, schema)
+        yield chunk
+
+
+class NumericAccumulator:
+    """
+    Mergeable statistics of a numeric column.
+
+    Means and variances are combined with the pairwise update of Chan et al.;
+    the median and quartiles are estimated with a KLL quantile sketch.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+        self.missing = 0
+        self.quantiles = KLLSketch()
+
+    def update(self, values: pd.Series) -> None:
+        """Add the values of one chunk."""
+        array = pd.to_numeric(values, errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+        valid = array[~np.isnan(array)]
+
+        partial = NumericAccumulator()
+        partial.missing = len(array) - len(valid)
+        if len(valid) > 0:
+            partial.count = len(valid)
+            partial.mean = float(valid.mean())
+            partial.m2 = float(((valid - partial.mean) ** 2).sum())
+            partial.min = float(valid.min())
+            partial.max = float(valid.max())
+            partial.quantiles.update(valid)
+        self.merge(partial)
+
+    def merge(self, other: 'NumericAccumulator') -> 'NumericAccumulator':
+        """Combine the statistics of another accumulator into this one."""
+        self.missing += other.missing
+        if other.count == 0:
+            return self
+
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+        else:
+            total = self.count + other.count
+            delta = other.mean - self.mean
+            self.mean += delta * other.count / total
+            self.m2 += other.m2 + delta ** 2 * self.count * other.count / total
+            self.count = total
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+
+        self.quantiles.merge(other.quantiles)
+        return self
+
+    def to_stats(self) -> Dict[str, Any]:
+        """Return the statistics in the format of get_dataset_summary."""
+        p25, median, p75 = self.quantiles.quantiles([0.25, 0.5, 0.75])
+        stats = {
+            "min": self.min,
+            "max": self.max,
+            "mean": self.mean if self.count > 0 else None,
+            "median": median,
+            "std": float(np.sqrt(self.m2 / (self.count - 1))) if self.count > 1 else None,
+            "p25": p25,
+            "p75": p75,
+        }
+        stats = {
+            key: float(value) if value is not None and np.isfinite(value) else None
+            for key, value in stats.items()
+        }
+        stats["missing"] = int(self.missing)
+        return stats
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count, "mean": self.mean, "m2": self.m2, "min": self.min, "max": self.max,
+            "missing": self.missing, "quantiles": self.quantiles.to_dict()
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'NumericAccumulator':
+        accumulator = cls()
+        # Non-finite statistics (columns holding infinity) are stored as null
+        accumulator.count, accumulator.missing = data["count"], data["missing"]
+        accumulator.mean, accumulator.m2 = (np.nan if data[key] is None else data[key] for key in ("mean", "m2"))
+        accumulator.min, accumulator.max = (
+            np.nan if data[key] is None and accumulator.count > 0 else data[key] for key in ("min", "max"))
+        accumulator.quantiles = KLLSketch.from_dict(data["quantiles"])
+        return accumulator
+
+
+class CategoricalAccumulator:
+    """
+    Mergeable distinct count and top values of a categorical column.
+
+    The distinct count comes from a HyperLogLog sketch and the top values from
+    a Space-Saving sketch; both are exact for columns with few distinct values
+    (see src.sketches for the error bounds on larger ones).
+    """
+
+    def __init__(self):
+        self.distinct = HyperLogLog()
+        self.top = SpaceSaving()
+        self.missing = 0
+
+    def update(self, values: pd.Series) -> None:
+        """Add the values of one chunk."""
+        value_counts = values.value_counts()
+        value_counts = value_counts[value_counts > 0]
+        self.missing += int(values.isna().sum())
+        # The chunk's distinct values are enough for the distinct-count sketch
+        self.distinct.update(value_counts.index)
+        self.top.update_counts(value_counts)
+
+    def merge(self, other: 'CategoricalAccumulator') -> 'CategoricalAccumulator':
+        """Combine the sketches of another accumulator into this one."""
+        self.distinct.merge(other.distinct)
+        self.top.merge(other.top)
+        self.missing += other.missing
+        return self
+
+    def to_stats(self) -> Dict[str, Any]:
+        """Return the statistics in the format of get_dataset_summary."""
+        return {
+            "unique_values": self.distinct.estimate(),
+            "top_values": self.top.top(10),
+            "missing": self.missing
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"distinct": self.distinct.to_dict(), "top": self.top.to_dict(), "missing": self.missing}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'CategoricalAccumulator':
+        accumulator = cls()
+        accumulator.distinct = HyperLogLog.from_dict(data["distinct"])
+        accumulator.top = SpaceSaving.from_dict(data["top"])
+        accumulator.missing = data["missing"]
+        return accumulator
+
+
+class GroupedSums:
+    """Mergeable per-group sums of value columns, as used by the category charts."""
+
+    def __init__(self, category_col: str, value_cols: List[str]):
+        self.category_col = category_col
+        self.value_cols = value_cols
+        self.sums = None
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        """Add the group sums of one chunk."""
+        values = chunk[self.value_cols].apply(pd.to_numeric, errors='coerce')
+        self._add(values.groupby(chunk[self.category_col]).sum())
+
+    def merge(self, other: 'GroupedSums') -> 'GroupedSums':
+        """Combine the group sums of another accumulator into this one."""
+        if other.sums is not None:
+            self._add(other.sums)
+        return self
+
+    def _add(self, partial: pd.DataFrame) -> None:
+        self.sums = partial if self.sums is None else self.sums.add(partial, fill_value=0)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Return one row per group with the summed value columns."""
+        if self.sums is None:
+            return pd.DataFrame(columns=[self.category_col] + self.value_cols)
+        return self.sums.rename_axis(self.category_col).reset_index()
+
+    def to_dict(self) -> Dict[str, Any]:
+        frame = self.to_frame()
+        return {
+            "category": self.category_col,
+            "values": self.value_cols,
+            "groups": frame[self.category_col].tolist(),
+            "sums": {col: [float(value) for value in frame[col]] for col in self.value_cols}
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'GroupedSums':
+        accumulator = cls(data["category"], data["values"])
+        if data["groups"]:
+            accumulator.sums = pd.DataFrame(data["sums"], index=pd.Index(data["groups"], name=data["category"]))
+        return accumulator
+
+
+class SummaryAccumulator:
+    """Mergeable dataset summary with the same fields as get_dataset_summary."""
+
+    def __init__(self, columns: List[str], column_types: Dict[str, str]):
+        self.columns = columns
+        self.column_types = column_types
+        self.num_rows = 0
+        self.sample_data = []
+        self.numeric = {col: NumericAccumulator() for col, kind in column_types.items() if kind == "numeric"}
+        self.categorical = {col: CategoricalAccumulator() for col, kind in column_types.items() if kind == "categorical"}
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        """Add one chunk of the dataset."""
+        self.num_rows += len(chunk)
+        if len(self.sample_data) < 5:
+            head = chunk.head(5 - len(self.sample_data))
+            self.sample_data.extend(head.replace({np.nan: None}).to_dict(orient='records'))
+        for col, accumulator in self.numeric.items():
+            accumulator.update(chunk[col])
+        for col, accumulator in self.categorical.items():
+            accumulator.update(chunk[col])
+
+    def merge(self, other: 'SummaryAccumulator') -> 'SummaryAccumulator':
+        """Combine the summary of a later part of the same dataset into this one."""
+        self.num_rows += other.num_rows
+        self.sample_data.extend(other.sample_data[:5 - len(self.sample_data)])
+        for col, accumulator in self.numeric.items():
+            accumulator.merge(other.numeric[col])
+        for col, accumulator in self.categorical.items():
+            accumulator.merge(other.categorical[col])
+        return self
+
+    def to_summary(self) -> Dict[str, Any]:
+        """Return the merged summary in the format of get_dataset_summary."""
+        return {
+            "num_rows": self.num_rows,
+            "num_cols": len(self.columns),
+            "columns": list(self.columns),
+            "column_types": dict(self.column_types),
+            "numeric_columns": [col for col in self.columns if self.column_types[col] == "numeric"],
+            "categorical_columns": [col for col in self.columns if self.column_types[col] == "categorical"],
+            "date_columns": [col for col in self.columns if self.column_types[col] == "datetime"],
+            "numeric_stats": {col: acc.to_stats() for col, acc in self.numeric.items()},
+            "categorical_stats": {col: acc.to_stats() for col, acc in self.categorical.items()},
+            "sample_data": self.sample_data
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "columns": self.columns,
+            "column_types": self.column_types,
+            "num_rows": self.num_rows,
+            "sample_data": self.sample_data,
+            "numeric": {col: acc.to_dict() for col, acc in self.numeric.items()},
+            "categorical": {col: acc.to_dict() for col, acc in self.categorical.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'SummaryAccumulator':
+        accumulator = cls(data["columns"], data["column_types"])
+        accumulator.num_rows = data["num_rows"]
+        accumulator.sample_data = data["sample_data"]
+        accumulator.numeric = {col: NumericAccumulator.from_dict(acc) for col, acc in data["numeric"].items()}
+        accumulator.categorical = {col: CategoricalAccumulator.from_dict(acc) for col, acc in data["categorical"].items()}
+        return accumulator
+
+
+def summarize_with_sketches(df: pd.DataFrame, column_types: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Summarize an in-memory DataFrame in one pass over slices of STREAMING_CHUNK_ROWS rows.
+
+    Distinct counts, medians, quartiles and top values are estimated with the
+    sketches of src.sketches instead of being computed exactly.
+
+    Args:
+        df: The DataFrame to summarize
+        column_types: Kind of every column, as returned by column_index.classify_columns
+
+    Returns:
+        Summary in the format of get_dataset_summary
+    """
+    accumulator = SummaryAccumulator(list(df.columns), column_types)
+    for start in range(0, len(df), STREAMING_CHUNK_ROWS):
+        accumulator.update(df.iloc[start:start + STREAMING_CHUNK_ROWS])
+    return accumulator.to_summary()
+
+
+class SummaryState:
+    """
+    Everything needed to extend a dataset's summary and charts with new rows.
+
+    Holds the schema the chunks are converted with, the summary accumulator,
+    the chart plan and the grouped sums behind every chart.
+    """
+
+    def __init__(self, schema: Dict[str, Dict[str, Any]], summary: SummaryAccumulator,
+                 plan: Dict[str, Dict[str, Any]], grouped_sums: Dict[str, GroupedSums]):
+        self.schema = schema
+        self.summary = summary
+        self.plan = plan
+        self.grouped_sums = grouped_sums
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        """Add one type-converted chunk of rows."""
+        self.summary.update(chunk)
+        for accumulator in self.grouped_sums.values():
+            accumulator.update(chunk)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "version": SUMMARY_STATE_VERSION,
+            "schema": self.schema,
+            "summary": self.summary.to_dict(),
+            "plan": self.plan,
+            "grouped_sums": [accumulator.to_dict() for accumulator in self.grouped_sums.values()]
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'SummaryState':
+        grouped_sums = [GroupedSums.from_dict(accumulator) for accumulator in data["grouped_sums"]]
+        return cls(
+            data["schema"],
+            SummaryAccumulator.from_dict(data["summary"]),
+            data["plan"],
+            {accumulator.category_col: accumulator for accumulator in grouped_sums}
+        )
+
+
+def _source_size(file_path: str) -> int:
+    return os.path.getsize(file_path)
+
+
+def save_summary_state(file_path: str, state: SummaryState) -> str:
+    """
+    Persist the summary state of a dataset next to it.
+
+    Args:
+        file_path: Path to the dataset file the state describes
+        state: The state to store
+
+    Returns:
+        Path of the stored state
+    """
+    data = state.to_dict()
+    data["source_size"] = _source_size(file_path)
+    state_path = get_artifact_path(file_path, SUMMARY_STATE_ARTIFACT_NAME)
+    temp_path = f"{state_path}.tmp-{os.getpid()}-{threading.get_ident()}"
+    with open(temp_path, 'wb') as f:
+        # Dates in the sample rows are stored as ISO strings, NaN and infinity as null
+        f.write(dumps(data))
+    os.replace(temp_path, state_path)
+    return state_path
+
+
+def load_summary_state(file_path: str) -> Optional[SummaryState]:
+    """
+    Read the persisted summary state of a dataset if it matches the current file.
+
+    Args:
+        file_path: Path to the dataset file
+
+    Returns:
+        The state, or None if it is missing, outdated or unreadable
+    """
+    try:
+        with open(get_artifact_path(file_path, SUMMARY_STATE_ARTIFACT_NAME)) as f:
+            data = json.load(f)
+        source_size = _source_size(file_path)
+    except (OSError, ValueError):
+        return None
+    if data.get("version") != SUMMARY_STATE_VERSION or data.get("source_size") != source_size:
+        return None
+    return SummaryState.from_dict(data)
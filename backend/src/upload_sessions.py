@@ -0,0 +1,267 @@
+"""
+Upload Sessions for Agentic Dashboard App.
+
+This module implements resumable, chunked uploads. A client opens a session,
+sends the file as numbered parts (each one a separate request, so a dropped
+connection only loses the part in flight), asks which parts have arrived and
+finally completes the session. Completing streams the parts, in order, into
+the content-addressed upload store.
+"""
+
+import os
+import re
+import json
+import time
+import uuid
+import shutil
+import tempfile
+from typing import Dict, Any, BinaryIO, List, Optional
+
+from src.upload_store import store_upload, UPLOAD_CHUNK_BYTES
+
+# Maximum total size (in bytes) of a file uploaded in parts
+CHUNKED_UPLOAD_MAX_BYTES = int(os.getenv("CHUNKED_UPLOAD_MAX_BYTES", str(1024 * 1024 * 1024)))
+
+# Sessions untouched for longer than this (in seconds) are discarded
+UPLOAD_SESSION_TTL_SECONDS = int(os.getenv("UPLOAD_SESSION_TTL_SECONDS", str(24 * 60 * 60)))
+
+# Directory, inside the upload folder, holding the parts of open sessions
+SESSIONS_DIR_NAME = '.sessions'
+
+_SESSION_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+
+class UploadSessionError(ValueError):
+    """Exception raised for unknown sessions or invalid parts."""
+    pass
+
+
+def _sessions_root(upload_folder: str) -> str:
+    return os.path.join(upload_folder, SESSIONS_DIR_NAME)
+
+
+def _session_dir(upload_folder: str, upload_id: str) -> str:
+    if not _SESSION_ID_PATTERN.match(upload_id or ''):
+        raise UploadSessionError(f"Invalid upload id: {upload_id}")
+    session_dir = os.path.join(_sessions_root(upload_folder), upload_id)
+    if not os.path.isdir(session_dir):
+        raise UploadSessionError(f"Unknown or expired upload id: {upload_id}")
+    return session_dir
+
+
+def _read_session(session_dir: str) -> Dict[str, Any]:
+    with open(os.path.join(session_dir, 'session.json')) as f:
+        return json.load(f)
+
+
+def _part_path(session_dir: str, index: int) -> str:
+    return os.path.join(session_dir, f"part-{index:06d}")
+
+
+def _received_parts(session_dir: str) -> Dict[int, int]:
+    parts = {}
+    for name in os.listdir(session_dir):
+        if name.startswith('part-') and name[5:].isdigit():
+            parts[int(name[5:])] = os.path.getsize(os.path.join(session_dir, name))
+    return dict(sorted(parts.items()))
+
+
+def expire_sessions(upload_folder: str, ttl_seconds: Optional[int] = None) -> List[str]:
+    """
+    Delete sessions that have not received a part within the time-to-live.
+
+    Args:
+        upload_folder: Root directory of the upload store
+        ttl_seconds: Session lifetime in seconds (default UPLOAD_SESSION_TTL_SECONDS)
+
+    Returns:
+        Ids of the expired sessions
+    """
+    ttl_seconds = UPLOAD_SESSION_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+    root = _sessions_root(upload_folder)
+    expired = []
+    if not os.path.isdir(root):
+        return expired
+    cutoff = time.time() - ttl_seconds
+    for upload_id in os.listdir(root):
+        session_dir = os.path.join(root, upload_id)
+        try:
+            if os.stat(session_dir).st_mtime < cutoff:
+                shutil.rmtree(session_dir, ignore_errors=True)
+                expired.append(upload_id)
+        except OSError:
+            continue
+    return expired
+
+
+def _check_count(value: Any, name: str) -> None:
+    """Reject a count from a JSON body that is not a non-negative integer (bool is an int subclass)."""
+    if value is not None and (not isinstance(value, int) or isinstance(value, bool) or value < 0):
+        raise UploadSessionError(f"Invalid {name}: {value!r} (expected a non-negative integer)")
+
+
+def create_session(upload_folder: str, filename: str, total_size: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Open a chunked upload session.
+
+    Args:
+        upload_folder: Root directory of the upload store
+        filename: Secure file name of the upload
+        total_size: Optional announced size of the whole file in bytes
+
+    Returns:
+        Dictionary describing the new session, including its 'upload_id'
+
+    Raises:
+        UploadSessionError: If the announced size is not a non-negative integer
+            or exceeds CHUNKED_UPLOAD_MAX_BYTES
+    """
+    _check_count(total_size, "file size")
+    if total_size is not None and total_size > CHUNKED_UPLOAD_MAX_BYTES:
+        raise UploadSessionError(f"File too large: {total_size} bytes (limit {CHUNKED_UPLOAD_MAX_BYTES})")
+    expire_sessions(upload_folder)
+
+    upload_id = uuid.uuid4().hex
+    session_dir = os.path.join(_sessions_root(upload_folder), upload_id)
+    os.makedirs(session_dir)
+    session = {
+        "upload_id": upload_id,
+        "filename": filename,
+        "total_size": total_size,
+        "created_at": time.time()
+    }
+    with open(os.path.join(session_dir, 'session.json'), 'w') as f:
+        json.dump(session, f)
+    return session
+
+
+def write_part(upload_folder: str, upload_id: str, index: int, stream: BinaryIO) -> Dict[str, Any]:
+    """
+    Store one part of a chunked upload, replacing any earlier copy of it.
+
+    The part is copied in blocks to a temporary file and renamed into place,
+    so an interrupted request never leaves a truncated part behind.
+
+    Args:
+        upload_folder: Root directory of the upload store
+        upload_id: Id returned by create_session
+        index: Zero-based position of the part in the file
+        stream: Readable binary stream with the part's bytes
+
+    Returns:
+        Dictionary with the part 'index' and its 'size' in bytes
+
+    Raises:
+        UploadSessionError: If the session is unknown or the upload grows past its limit
+    """
+    if index < 0:
+        raise UploadSessionError(f"Invalid part index: {index}")
+    session_dir = _session_dir(upload_folder, upload_id)
+    already_received = sum(size for part, size in _received_parts(session_dir).items() if part != index)
+
+    size = 0
+    fd, temp_path = tempfile.mkstemp(prefix='.part-', dir=session_dir)
+    try:
+        with os.fdopen(fd, 'wb') as temp_file:
+            while True:
+                block = stream.read(UPLOAD_CHUNK_BYTES)
+                if not block:
+                    break
+                size += len(block)
+                if already_received + size > CHUNKED_UPLOAD_MAX_BYTES:
+                    raise UploadSessionError(f"Upload exceeds the limit of {CHUNKED_UPLOAD_MAX_BYTES} bytes")
+                temp_file.write(block)
+        os.replace(temp_path, _part_path(session_dir, index))
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return {"index": index, "size": size}
+
+
+def get_session_status(upload_folder: str, upload_id: str) -> Dict[str, Any]:
+    """
+    Report which parts of a chunked upload have been received.
+
+    Args:
+        upload_folder: Root directory of the upload store
+        upload_id: Id returned by create_session
+
+    Returns:
+        The session description with the received 'parts' (index -> size)
+        and the number of 'received_bytes'
+    """
+    session_dir = _session_dir(upload_folder, upload_id)
+    session = _read_session(session_dir)
+    parts = _received_parts(session_dir)
+    session["parts"] = parts
+    session["received_bytes"] = sum(parts.values())
+    return session
+
+
+class _PartsReader:
+    """File-like reader that concatenates the parts of a session in order."""
+
+    def __init__(self, paths: List[str]):
+        self._paths = list(paths)
+        self._current = None
+
+    def read(self, size: int = -1) -> bytes:
+        while True:
+            if self._current is None:
+                if not self._paths:
+                    return b''
+                self._current = open(self._paths.pop(0), 'rb')
+            block = self._current.read(size)
+            if block:
+                return block
+            self._current.close()
+            self._current = None
+
+    def close(self) -> None:
+        if self._current is not None:
+            self._current.close()
+            self._current = None
+
+
+def complete_session(upload_folder: str, upload_id: str, expected_parts: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Assemble the parts of a chunked upload into the upload store.
+
+    Args:
+        upload_folder: Root directory of the upload store
+        upload_id: Id returned by create_session
+        expected_parts: Optional number of parts the client sent
+
+    Returns:
+        The result of store_upload, plus the session 'filename'
+
+    Raises:
+        UploadSessionError: If the expected number of parts is invalid, parts are
+            missing or the size does not match the announced one
+    """
+    _check_count(expected_parts, "number of parts")
+    session_dir = _session_dir(upload_folder, upload_id)
+    session = _read_session(session_dir)
+    parts = _received_parts(session_dir)
+
+    if not parts:
+        raise UploadSessionError("Upload incomplete: no parts received")
+    count = expected_parts if expected_parts is not None else len(parts)
+    # Compared before enumerating the indexes, so a huge count costs nothing
+    if count != len(parts):
+        raise UploadSessionError(f"Upload incomplete: received {len(parts)} parts, expected {count}")
+    missing = sorted(set(range(count)) - parts.keys())
+    if missing:
+        raise UploadSessionError(f"Upload incomplete: missing parts {missing}")
+    total = sum(parts.values())
+    if session.get("total_size") is not None and total != session["total_size"]:
+        raise UploadSessionError(f"Received {total} bytes, expected {session['total_size']}")
+
+    reader = _PartsReader([_part_path(session_dir, index) for index in range(count)])
+    try:
+        stored = store_upload(reader, session["filename"], upload_folder)
+    finally:
+        reader.close()
+    shutil.rmtree(session_dir, ignore_errors=True)
+    stored["filename"] = session["filename"]
+    return stored
@@ -0,0 +1,219 @@
+"""
+Upload Store for Agentic Dashboard App.
+
+This module stores uploaded datasets by the SHA-256 of their content. Each
+dataset gets its own directory, uploads/<sha256>/, holding the data file and
+every artifact derived from it (columnar sidecar, summaries, cached figures).
+Uploading identical content again reuses the existing directory, and a disk
+quota evicts the least recently used datasets together with their artifacts.
+"""
+
+import os
+import re
+import json
+import shutil
+import hashlib
+import tempfile
+import threading
+from datetime import datetime
+from typing import Dict, Any, BinaryIO, List, Optional
+
+# Maximum total size (in bytes) of the stored datasets and their artifacts
+UPLOAD_STORE_MAX_BYTES = int(os.getenv("UPLOAD_STORE_MAX_BYTES", str(2 * 1024 * 1024 * 1024)))
+
+# Size of the blocks copied (and hashed) from the request stream
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+# Name of the metadata file kept in every dataset directory
+UPLOAD_METADATA_FILE = 'upload.json'
+
+# Dataset directories are named by the hex SHA-256 of their content
+_DATASET_DIR_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+
+_store_lock = threading.Lock()
+
+
+def _dataset_dir(upload_folder: str, sha256: str) -> str:
+    return os.path.join(upload_folder, sha256)
+
+
+def _directory_size(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                continue
+    return total
+
+
+def store_upload(stream: BinaryIO, filename: str, upload_folder: str) -> Dict[str, Any]:
+    """
+    Store an uploaded file under the SHA-256 of its content.
+
+    The stream is copied to a temporary file in blocks and hashed on the way,
+    so the content is read only once. If a dataset with the same hash already
+    exists the copy is discarded and the existing file is reused.
+
+    Args:
+        stream: Readable binary stream of the upload
+        filename: Secure file name of the upload; its extension is kept
+        upload_folder: Root directory of the upload store
+
+    Returns:
+        Dictionary with the dataset 'sha256', the stored 'path', its 'size'
+        and whether the content was 'deduplicated'
+    """
+    os.makedirs(upload_folder, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    fd, temp_path = tempfile.mkstemp(prefix='.upload-', dir=upload_folder)
+    try:
+        with os.fdopen(fd, 'wb') as temp_file:
+            while True:
+                block = stream.read(UPLOAD_CHUNK_BYTES)
+                if not block:
+                    break
+                digest.update(block)
+                temp_file.write(block)
+                size += len(block)
+
+        sha256 = digest.hexdigest()
+        dataset_dir = _dataset_dir(upload_folder, sha256)
+        extension = os.path.splitext(filename)[1].lower()
+
+        with _store_lock:
+            existing = find_dataset_file(upload_folder, sha256)
+            if existing is not None:
+                os.remove(temp_path)
+                touch_dataset(existing)
+                return {"sha256": sha256, "path": existing, "size": size, "deduplicated": True}
+
+            os.makedirs(dataset_dir, exist_ok=True)
+            path = os.path.join(dataset_dir, f"dataset{extension}")
+            os.replace(temp_path, path)
+            with open(os.path.join(dataset_dir, UPLOAD_METADATA_FILE), 'w') as f:
+                json.dump({
+                    "filename": filename,
+                    "sha256": sha256,
+                    "size": size,
+                    "uploaded_at": datetime.now().isoformat()
+                }, f)
+        return {"sha256": sha256, "path": path, "size": size, "deduplicated": False}
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def find_dataset_file(upload_folder: str, sha256: str) -> Optional[str]:
+    """
+    Return the path of the stored data file for a content hash, if present.
+
+    Args:
+        upload_folder: Root directory of the upload store
+        sha256: Hex SHA-256 of the dataset content
+
+    Returns:
+        Path of the data file, or None if no dataset has this hash
+    """
+    dataset_dir = _dataset_dir(upload_folder, sha256)
+    if not os.path.isdir(dataset_dir):
+        return None
+    for name in sorted(os.listdir(dataset_dir)):
+        if name.startswith('dataset.') and '.sidecar.' not in name:
+            return os.path.join(dataset_dir, name)
+    return None
+
+
+def get_dataset_hash(file_path: str) -> Optional[str]:
+    """Return the content hash of a stored data file, or None for files outside the store."""
+    name = os.path.basename(os.path.dirname(os.path.abspath(file_path)))
+    return name if _DATASET_DIR_PATTERN.match(name) else None
+
+
+def get_artifact_path(file_path: str, name: str) -> str:
+    """
+    Return the path of an artifact derived from a dataset.
+
+    Artifacts of stored datasets live in the dataset's directory, so they are
+    keyed by its content hash and evicted with it. Other files (such as the
+    bundled default dataset) keep their artifacts next to them.
+
+    Args:
+        file_path: Path of the data file
+        name: File name of the artifact
+
+    Returns:
+        Path where the artifact should be read or written
+    """
+    if get_dataset_hash(file_path) is not None:
+        return os.path.join(os.path.dirname(file_path), name)
+    return f"{file_path}.{name}"
+
+
+def touch_dataset(file_path: str) -> None:
+    """Mark a stored dataset as recently used for the LRU quota."""
+    if get_dataset_hash(file_path) is None:
+        return
+    try:
+        os.utime(os.path.dirname(file_path))
+    except OSError:
+        pass
+
+
+def list_datasets(upload_folder: str) -> List[Dict[str, Any]]:
+    """
+    List the stored datasets, least recently used first.
+
+    Args:
+        upload_folder: Root directory of the upload store
+
+    Returns:
+        List of dictionaries with the 'sha256', 'path' of the directory, total
+        'size' in bytes and 'last_used' timestamp of each dataset
+    """
+    datasets = []
+    if not os.path.isdir(upload_folder):
+        return datasets
+    for name in os.listdir(upload_folder):
+        path = os.path.join(upload_folder, name)
+        if not _DATASET_DIR_PATTERN.match(name) or not os.path.isdir(path):
+            continue
+        try:
+            last_used = os.stat(path).st_mtime
+        except OSError:
+            continue
+        datasets.append({"sha256": name, "path": path, "size": _directory_size(path), "last_used": last_used})
+    datasets.sort(key=lambda dataset: dataset["last_used"])
+    return datasets
+
+
+def enforce_quota(upload_folder: str, max_bytes: Optional[int] = None, keep: Optional[str] = None) -> List[str]:
+    """
+    Evict the least recently used datasets until the store fits its quota.
+
+    Args:
+        upload_folder: Root directory of the upload store
+        max_bytes: Quota in bytes (default UPLOAD_STORE_MAX_BYTES)
+        keep: Content hash of a dataset that must not be evicted (the one just uploaded)
+
+    Returns:
+        Paths of the evicted data files, so callers can drop cached frames
+    """
+    max_bytes = UPLOAD_STORE_MAX_BYTES if max_bytes is None else max_bytes
+    evicted = []
+    with _store_lock:
+        datasets = list_datasets(upload_folder)
+        total = sum(dataset["size"] for dataset in datasets)
+        for dataset in datasets:
+            if total <= max_bytes:
+                break
+            if dataset["sha256"] == keep:
+                continue
+            data_file = find_dataset_file(upload_folder, dataset["sha256"])
+            shutil.rmtree(dataset["path"], ignore_errors=True)
+            total -= dataset["size"]
+            evicted.append(data_file or dataset["path"])
+    return evicted
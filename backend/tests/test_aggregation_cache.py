@@ -0,0 +1,108 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import pandas as pd
+
+# Add the src directory to the path so we can import the modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src import aggregation_cache
+from src.aggregation_cache import (
+    aggregate,
+    aggregate_many,
+    clear_aggregation_cache,
+    get_aggregation_cache_stats,
+    get_dataset_key
+)
+from src.data_exploration_service import get_dataset_visualizations
+from src.dataset_loader import clear_dataset_cache
+
+
+class TestAggregationCache(unittest.TestCase):
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'Region': ['North', 'South', 'North', 'East', 'South', None],
+            'Total': [10.0, 20.0, 30.0, 40.0, 50.0, 60.0],
+            'Paid': [1.0, 2.0, 3.0, 4.0, 5.0, 6.0]
+        })
+        clear_aggregation_cache()
+
+    def tearDown(self):
+        clear_aggregation_cache()
+
+    def test_aggregate_matches_groupby(self):
+        result = aggregate(self.df, 'key', 'Region', ['Total', 'Paid'])
+        expected = self.df.groupby('Region')[['Total', 'Paid']].sum().reset_index()
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_compatible_requests_share_one_groupby(self):
+        with patch('src.aggregation_cache._group', wraps=aggregation_cache._group) as group:
+            results = aggregate_many(self.df, 'key', [
+                ('Region', ['Total'], 'sum'),
+                ('Region', ['Total', 'Paid'], 'sum')
+            ])
+        self.assertEqual(group.call_count, 1)
+        self.assertEqual(list(results[('Region', ('Total',), 'sum')].columns), ['Region', 'Total'])
+        self.assertEqual(list(results[('Region', ('Total', 'Paid'), 'sum')].columns), ['Region', 'Total', 'Paid'])
+
+    def test_repeat_requests_are_served_from_cache(self):
+        first = aggregate(self.df, 'key', 'Region', ['Total', 'Paid'])
+        # Callers may modify their result without altering the cached aggregates
+        first.loc[0, 'Total'] = -1
+
+        with patch.object(pd.DataFrame, 'groupby', side_effect=AssertionError('aggregated again')):
+            second = aggregate(self.df, 'key', 'Region', ['Paid', 'Total'])
+
+        self.assertEqual(second.set_index('Region').loc['East', 'Total'], 40.0)
+        self.assertEqual(list(second.columns), ['Region', 'Paid', 'Total'])
+        self.assertEqual(get_aggregation_cache_stats()['hits'], 1)
+
+    def test_new_value_columns_extend_the_entry(self):
+        aggregate(self.df, 'key', 'Region', ['Total'])
+        with patch('src.aggregation_cache._group', wraps=aggregation_cache._group) as group:
+            result = aggregate(self.df, 'key', 'Region', ['Total', 'Paid'])
+        # Only the missing column is aggregated
+        self.assertEqual(group.call_args[0][2], ['Paid'])
+        self.assertEqual(result.set_index('Region').loc['North'].tolist(), [40.0, 4.0])
+
+    def test_without_key_nothing_is_cached(self):
+        aggregate(self.df, None, 'Region', ['Total'])
+        self.assertEqual(get_aggregation_cache_stats()['entries'], 0)
+
+
+class TestExplorationUsesAggregationCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.csv_path = os.path.join(self.temp_dir, 'data.csv')
+        pd.DataFrame({
+            'Region': ['North', 'South', 'East', 'North'] * 5,
+            'Type': ['a', 'b', 'a', 'c'] * 5,
+            'Total': range(20),
+            'Paid': range(20, 40)
+        }).to_csv(self.csv_path, index=False)
+        clear_dataset_cache()
+        clear_aggregation_cache()
+
+    def tearDown(self):
+        clear_dataset_cache()
+        clear_aggregation_cache()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_repeat_exploration_skips_aggregation(self):
+        first = get_dataset_visualizations(self.csv_path)
+        self.assertIsNotNone(get_dataset_key(self.csv_path))
+
+        with patch('src.aggregation_cache._group', side_effect=AssertionError('aggregated again')):
+            second = get_dataset_visualizations(self.csv_path)
+
+        self.assertEqual(first['visualizations'], second['visualizations'])
+        bar = second['visualizations']['chart1_bar']
+        self.assertEqual(dict(zip(bar['xAxis']['data'], bar['series'][0]['data']))['North'], 0 + 3 + 4 + 7 + 8 + 11 + 12 + 15 + 16 + 19)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,6 +2,8 @@ import unittest
 import os
 import sys
 import json
+import shutil
+import tempfile
 from unittest.mock import patch, MagicMock, mock_open
 
 # Add the src directory to the path so we can import the modules
@@ -10,8 +12,10 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 from src.code_execution_service import (
     sanitize_code,
     execute_code,
-    execute_plotly_code
+    execute_plotly_code,
+    find_referenced_columns
 )
+from src.dataset_loader import clear_dataset_cache
 
 class TestCodeExecutionService(unittest.TestCase):
     def setUp(self):
@@ -229,5 +233,75 @@ fig = px.bar(df, x='Category', y='Value', title='Sample Bar Chart')
         # Check that there is no error
         self.assertNotIn('error', result)
 
+class TestColumnProjection(unittest.TestCase):
+    def setUp(self):
+        self.columns = ['Region', 'Sales', 'Cost', 'Notes']
+
+    def test_literal_and_variable_references(self):
+        code = """
+cat_col = 'Region'
+num_col = 'Sales'
+grouped = df.groupby(cat_col)[num_col].sum().reset_index()
+fig = px.bar(grouped, x=cat_col, y=num_col)
+"""
+        self.assertEqual(find_referenced_columns(code, self.columns), ['Region', 'Sales'])
+
+    def test_masks_and_plotly_express(self):
+        code = "fig = px.scatter(df[df['Cost'] > 0], x='Cost', y='Sales')"
+        self.assertEqual(find_referenced_columns(code, self.columns), ['Sales', 'Cost'])
+
+    def test_dynamic_references_need_full_frame(self):
+        self.assertIsNone(find_referenced_columns("cols = df.columns[:2]\nfig = px.bar(df[cols])", self.columns))
+        self.assertIsNone(find_referenced_columns("fig = px.bar(df[make_name()], x='Region')", self.columns))
+        self.assertIsNone(find_referenced_columns("fig = px.bar(df)", self.columns))
+        self.assertIsNone(find_referenced_columns("fig = px.bar(df, x=", self.columns))
+
+    def test_column_local_uses_only(self):
+        self.assertEqual(find_referenced_columns("fig = px.bar(df.loc[:, ['Region', 'Sales']], x='Region', y='Sales')",
+                                                 self.columns), ['Region', 'Sales'])
+        self.assertEqual(find_referenced_columns("fig = px.bar(df.loc[df.Cost > 0], x='Region', y='Sales')",
+                                                 self.columns), ['Region', 'Sales', 'Cost'])
+        # Frame-wide methods read every column: their results differ on a projected frame
+        code = "clean = df.dropna()\nfig = px.bar(clean, x='Region', y='Sales')"
+        self.assertIsNone(find_referenced_columns(code, self.columns))
+        code = "m = df.mean(numeric_only=True)\nfig = px.bar(x=m.index, y=m.values, title='Sales')"
+        self.assertIsNone(find_referenced_columns(code, self.columns))
+        self.assertIsNone(find_referenced_columns("fig = px.bar(df[df['Cost'] > 0].drop_duplicates(), x='Region')",
+                                                  self.columns))
+        self.assertIsNone(find_referenced_columns("fig = px.bar(df.groupby('Region').sum(), y='Sales')", self.columns))
+
+    def test_execute_code_loads_only_referenced_columns(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            csv_path = os.path.join(temp_dir, 'wide.csv')
+            with open(csv_path, 'w') as f:
+                f.write("Region,Sales,Cost,Notes\nNord,10,5,x\nSud,20,15,y\n")
+            clear_dataset_cache()
+            fig_json, stdout, stderr = execute_code("fig = px.bar(df, x='Region', y='Sales')", csv_path)
+            self.assertTrue(fig_json)
+            self.assertIn('Selected 2 of 4 columns', stdout)
+
+            # A column name built at run time is missed by the analysis; Plotly Express raises
+            # ValueError on the projected frame and the code is re-run on the full frame
+            code = "y_col = 'Co' + 'st'\nfig = px.bar(df, x='Region', y=y_col)"
+            fig_json, stdout, stderr = execute_code(code, csv_path)
+            self.assertTrue(fig_json)
+            self.assertNotIn('Selected', stdout)
+
+            # Errors of the code itself are raised once, without a retry on the full frame
+            code = "print('running')\nfig = px.bar(df, x='Region', y='Sales')\nvalue = int('x')"
+            fig_json, stdout, stderr = execute_code(code, csv_path)
+            self.assertEqual(fig_json, {})
+            self.assertIn('invalid literal', stderr)
+            self.assertEqual(stdout.count('running'), 1)
+            self.assertIn('Selected 2 of 4 columns', stdout)
+            code = "lookup = {}\nvalue = lookup['Region']\nfig = px.bar(df, x='Region', y='Sales')"
+            fig_json, stdout, stderr = execute_code(code, csv_path)
+            self.assertIn('KeyError', stderr)
+            self.assertIn('Selected 2 of 4 columns', stdout)
+        finally:
+            clear_dataset_cache()
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,83 @@
+import os
+import sys
+import unittest
+
+import pandas as pd
+
+# Add the src directory to the path so we can import the modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.column_index import ColumnIndex, build_column_index, index_frame, tokenize
+from src.data_exploration_service import get_dataset_summary
+from src.profiling_service import build_prompt_context
+
+
+class TestColumnIndex(unittest.TestCase):
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'Provincia competente': ['Roma', 'Rieti', 'Roma', None] * 20,
+            'Tipologia di spesa': ['a', 'b', 'c', 'a'] * 20,
+            'Impegno totale': range(80),
+            'PagatoTotale': [float(i) for i in range(80)],
+            'Codice ID': range(1000, 1080),
+            'Descrizione': [f"voce {i}" for i in range(80)],
+            'Data': pd.date_range('2024-01-01', periods=80)
+        })
+
+    def test_tokenize(self):
+        self.assertEqual(tokenize('PagatoTotale'), ['pagato', 'totale'])
+        self.assertEqual(tokenize('Attività_2024'), ['attivita', '2024'])
+        self.assertEqual(tokenize('HTTPStatus'), ['http', 'status'])
+
+    def test_profiles_and_roles(self):
+        index = index_frame(self.df)
+        profiles = index.profiles
+
+        self.assertEqual(profiles['Provincia competente']['role'], 'dimension')
+        self.assertEqual(profiles['Provincia competente']['unique_values'], 2)
+        self.assertAlmostEqual(profiles['Provincia competente']['null_ratio'], 0.25)
+        self.assertEqual(profiles['Impegno totale']['role'], 'measure')
+        self.assertEqual(profiles['Impegno totale']['max'], 79.0)
+        self.assertEqual(profiles['Codice ID']['role'], 'identifier')
+        self.assertEqual(profiles['Descrizione']['role'], 'identifier')
+        self.assertEqual(profiles['Data']['role'], 'time')
+
+    def test_find_matches_token_prefixes_in_hint_order(self):
+        index = index_frame(self.df)
+        numeric = index.columns_with(kind="numeric")
+
+        self.assertEqual(index.find(['pagato', 'impegno'], numeric), 'PagatoTotale')
+        self.assertEqual(index.find(['missing', 'total'], numeric), 'Impegno totale')
+        self.assertEqual(index.find(['total'], ['PagatoTotale']), 'PagatoTotale')
+        self.assertIsNone(index.find(['provincia'], numeric))
+
+    def test_summary_index_matches_frame_index(self):
+        summary = get_dataset_summary(self.df)
+        from_summary = build_column_index(summary, self.df.dtypes.to_dict())
+        from_frame = index_frame(self.df)
+
+        for col in self.df.columns:
+            for key in ['kind', 'labels', 'role', 'unique_values', 'null_ratio']:
+                if key == 'null_ratio' and col == 'Data':
+                    # The summary does not count missing dates
+                    self.assertIsNone(from_summary.profiles[col][key])
+                    continue
+                self.assertEqual(from_summary.profiles[col][key], from_frame.profiles[col][key], f"{col} {key}")
+
+        restored = ColumnIndex.from_dict(from_summary.to_dict())
+        self.assertEqual(restored.find(['tipologia'], restored.columns), 'Tipologia di spesa')
+
+    def test_suggest(self):
+        index = index_frame(self.df)
+        self.assertEqual(index.suggest('Pagato')[0], 'PagatoTotale')
+        self.assertEqual(index.suggest('Impegno totali')[0], 'Impegno totale')
+        self.assertEqual(index.suggest('zzz'), [])
+
+    def test_prompt_context_lists_roles(self):
+        context = build_prompt_context(get_dataset_summary(self.df), compact=False)
+        self.assertIn("Category columns: ['Provincia competente', 'Tipologia di spesa']", context)
+        self.assertIn("Date columns: ['Data']", context)
+
+
+if __name__ == '__main__':
+    unittest.main()
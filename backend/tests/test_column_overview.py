@@ -0,0 +1,93 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+# Add the src directory to the path so we can import the modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src import column_overview
+from src.column_overview import compute_column_overview, get_column_overview, get_overview_path
+from src.dataset_loader import clear_dataset_cache
+
+
+class TestColumnOverview(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        n = 2000
+        self.df = pd.DataFrame({
+            'Provincia': rng.choice(['Roma', 'Rieti', 'Latina', 'Frosinone'], n, p=[0.4, 0.3, 0.2, 0.1]),
+            'Anno': rng.integers(2018, 2023, n),
+            'Impegno totale': rng.normal(1000, 200, n).round(2),
+            'Pagato totale': rng.exponential(100, n).round(2),
+            'Costante': np.full(n, 7.5)
+        })
+        self.df.loc[::9, 'Impegno totale'] = np.nan
+        self.df.loc[::11, 'Provincia'] = np.nan
+        self.temp_dir = tempfile.mkdtemp()
+        clear_dataset_cache()
+
+    def tearDown(self):
+        clear_dataset_cache()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_histograms_match_numpy(self):
+        overview = compute_column_overview(self.df)
+        self.assertEqual(overview["num_rows"], len(self.df))
+        for col in ['Impegno totale', 'Pagato totale']:
+            values = self.df[col].dropna()
+            counts, edges = np.histogram(values, bins=column_overview.COLUMN_OVERVIEW_BINS)
+            self.assertEqual(overview["columns"][col]["counts"], counts.tolist())
+            np.testing.assert_allclose(overview["columns"][col]["edges"], edges)
+            self.assertEqual(overview["columns"][col]["missing"], self.df[col].isna().sum())
+        # Small integer ranges get one bin per value, constant columns a single bin
+        self.assertEqual(overview["columns"]['Anno']["counts"], self.df['Anno'].value_counts().sort_index().tolist())
+        self.assertEqual(overview["columns"]['Anno']["edges"][0], 2017.5)
+        self.assertEqual(overview["columns"]['Costante']["counts"], [len(self.df)])
+
+    def test_top_values_and_mini_charts(self):
+        overview = compute_column_overview(self.df, top_k=2)
+        provincia = overview["columns"]['Provincia']
+        expected = self.df['Provincia'].value_counts()
+        self.assertEqual(provincia["top_values"], expected.head(2).to_dict())
+        self.assertEqual(provincia["other"], expected.iloc[2:].sum())
+        self.assertEqual(provincia["missing"], self.df['Provincia'].isna().sum())
+        self.assertFalse(provincia["approximate"])
+        self.assertEqual(provincia["chart"]["xAxis"]["data"], ['Roma', 'Rieti'])
+        self.assertEqual(overview["columns"]['Anno']["chart"]["series"][0]["data"],
+                         overview["columns"]['Anno']["counts"])
+        self.assertEqual(list(overview["columns"]), list(self.df.columns))
+
+    def test_streamed_overview_matches_in_memory(self):
+        data_path = os.path.join(self.temp_dir, 'data.csv')
+        self.df.to_csv(data_path, index=False)
+        expected = compute_column_overview(pd.read_csv(data_path))
+        with patch('src.column_overview.should_stream', return_value=True), \
+                patch('src.streaming_summary.STREAMING_CHUNK_ROWS', 300):
+            streamed = get_column_overview(data_path)
+        for col in ['Anno', 'Impegno totale', 'Pagato totale']:
+            self.assertEqual(streamed["columns"][col]["counts"], expected["columns"][col]["counts"])
+        self.assertEqual(streamed["columns"]['Provincia']["top_values"],
+                         expected["columns"]['Provincia']["top_values"])
+
+    def test_overview_is_stored_until_the_file_changes(self):
+        data_path = os.path.join(self.temp_dir, 'data.csv')
+        self.df.to_csv(data_path, index=False)
+        first = get_column_overview(data_path)
+        self.assertTrue(os.path.exists(get_overview_path(data_path)))
+        with patch('src.column_overview.compute_column_overview', side_effect=AssertionError('recomputed')):
+            self.assertEqual(get_column_overview(data_path), first)
+            column_overview._loaded.clear()
+            self.assertEqual(get_column_overview(data_path), first)
+
+        self.df.iloc[:10].to_csv(data_path, index=False)
+        self.assertEqual(get_column_overview(data_path)["num_rows"], 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
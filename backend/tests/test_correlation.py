@@ -0,0 +1,100 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+# Add the src directory to the path so we can import the modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src import correlation
+from src.correlation import compute_correlations, get_correlations, get_correlations_path, match_correlation_prompt
+from src.data_exploration_service import generate_correlation_heatmap, get_correlation_visualization
+from src.dataset_loader import clear_dataset_cache
+
+
+class TestCorrelation(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        n = 3000
+        base = rng.normal(size=n)
+        self.df = pd.DataFrame({
+            'Provincia': rng.choice(['Roma', 'Rieti', 'Latina'], n),
+            'Impegno totale': base * 100 + 1000 + rng.normal(0, 50, n),
+            'Pagato totale': np.exp(base) * 10 + rng.normal(0, 1, n),
+            'Anno': rng.integers(2018, 2023, n),
+            'Residui': -base + rng.normal(0, 2, n),
+            'Costante': np.full(n, 5.0)
+        })
+        self.df.loc[rng.random(n) < 0.1, 'Impegno totale'] = np.nan
+        self.df.loc[rng.random(n) < 0.2, 'Pagato totale'] = np.nan
+        self.numeric = ['Impegno totale', 'Pagato totale', 'Anno', 'Residui', 'Costante']
+        self.temp_dir = tempfile.mkdtemp()
+        clear_dataset_cache()
+
+    def tearDown(self):
+        clear_dataset_cache()
+        correlation._loaded.clear()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _assert_matches_pandas(self, method):
+        result = compute_correlations(self.df, method)
+        self.assertEqual(result["columns"], self.numeric)
+        expected = self.df[self.numeric].corr(method)
+        got = np.array([[np.nan if value is None else value for value in row] for row in result["matrix"]])
+        np.testing.assert_allclose(got, expected.to_numpy(), atol=1e-10)
+        self.assertEqual(result["counts"][0][1], int((self.df['Impegno totale'].notna()
+                                                      & self.df['Pagato totale'].notna()).sum()))
+
+    def test_pearson_matches_pandas_pairwise(self):
+        self._assert_matches_pandas('pearson')
+
+    def test_spearman_matches_pandas_pairwise(self):
+        # 'Anno' has many ties; the pairs with missing values are re-ranked over their complete rows
+        self._assert_matches_pandas('spearman')
+
+    def test_correlations_are_computed_once_per_method(self):
+        data_path = os.path.join(self.temp_dir, 'data.csv')
+        self.df.to_csv(data_path, index=False)
+        pearson = get_correlations(data_path)
+        self.assertTrue(os.path.exists(get_correlations_path(data_path)))
+        with patch('src.correlation.compute_correlations', wraps=compute_correlations) as compute:
+            self.assertEqual(get_correlations(data_path), pearson)
+            correlation._loaded.clear()
+            self.assertEqual(get_correlations(data_path), pearson)
+            get_correlations(data_path, 'spearman')
+            get_correlations(data_path, 'spearman')
+        self.assertEqual(compute.call_count, 1)
+        with self.assertRaises(ValueError):
+            get_correlations(data_path, 'kendall')
+
+    def test_prompt_matching(self):
+        self.assertEqual(match_correlation_prompt("Show the correlation matrix"), 'pearson')
+        self.assertEqual(match_correlation_prompt("Correlazione tra impegni e pagamenti"), 'pearson')
+        self.assertEqual(match_correlation_prompt("Spearman rank correlation of the amounts"), 'spearman')
+        self.assertIsNone(match_correlation_prompt("Scatter plot to show the correlation of X and Y"))
+        self.assertIsNone(match_correlation_prompt("Total commitments by province"))
+
+    def test_heatmap_and_prompt_answer(self):
+        chart = generate_correlation_heatmap(self.df, None, "Correlations")
+        self.assertEqual(chart["series"][0]["type"], "heatmap")
+        self.assertEqual(chart["xAxis"]["data"], self.numeric)
+        self.assertEqual(len(chart["series"][0]["data"]), len(self.numeric) ** 2)
+        # Constant columns have no correlation
+        self.assertIn([4, 0, "-"], chart["series"][0]["data"])
+
+        data_path = os.path.join(self.temp_dir, 'data.csv')
+        self.df.to_csv(data_path, index=False)
+        result = get_correlation_visualization(data_path, "Correlation between Impegno totale and Residui")
+        self.assertEqual(result["visualizations"][0]["yAxis"]["data"], ['Impegno totale', 'Residui'])
+        expected = round(self.df['Impegno totale'].corr(self.df['Residui']), 3)
+        self.assertIn([1, 0, expected], result["visualizations"][0]["series"][0]["data"])
+        self.assertIsNone(get_correlation_visualization(data_path, "Bar chart of Anno"))
+
+
+if __name__ == '__main__':
+    unittest.main()
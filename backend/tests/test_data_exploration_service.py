@@ -3,6 +3,7 @@ import os
 import sys
 import pandas as pd
 import json
+import tempfile
 from unittest.mock import patch, MagicMock, mock_open
 
 # Add the src directory to the path so we can import the modules
@@ -15,8 +16,11 @@ from src.data_exploration_service import (
     generate_piechart_by_category,
     generate_stacked_barchart_comparison,
     get_dataset_visualizations,
-    _find_columns
+    _find_columns,
+    _summarize_numeric_columns,
+    CHART_BUILDERS
 )
+from src.dataset_loader import clear_dataset_cache
 
 class TestDataExplorationService(unittest.TestCase):
     def setUp(self):
@@ -137,6 +141,51 @@ class TestDataExplorationService(unittest.TestCase):
         self.assertIn('Value1', summary['column_types'])
         self.assertIn('Value2', summary['column_types'])
 
+    def test_summarize_numeric_columns_matches_pandas(self):
+        df = pd.DataFrame({
+            'floats': [1.5, None, -2.0, 4.25, 3.0, None, 8.0],
+            'ints': pd.array([3, 1, None, 7, 7, 2, 5], dtype='Int64'),
+            'flags': [True, False, True, True, False, True, False],
+            'single': [None, None, 4.0, None, None, None, None],
+            'empty': [None] * 7
+        })
+        df['empty'] = df['empty'].astype(float)
+
+        stats = _summarize_numeric_columns(df, list(df.columns))
+
+        self.assertEqual(list(stats), list(df.columns))
+        for col in ['floats', 'ints', 'flags']:
+            values = df[col].astype(float)
+            expected = {
+                'min': values.min(), 'max': values.max(), 'mean': values.mean(),
+                'median': values.median(), 'std': values.std(),
+                'p25': values.quantile(0.25), 'p75': values.quantile(0.75)
+            }
+            for key, value in expected.items():
+                self.assertAlmostEqual(stats[col][key], value, msg=f"{col} {key}")
+            self.assertEqual(stats[col]['missing'], int(values.isna().sum()))
+        self.assertEqual(stats['single']['median'], 4.0)
+        self.assertIsNone(stats['single']['std'])
+        self.assertEqual(stats['empty'], {
+            'min': None, 'max': None, 'mean': None, 'median': None,
+            'std': None, 'p25': None, 'p75': None, 'missing': 7
+        })
+        self.assertEqual(_summarize_numeric_columns(df.iloc[:0], ['floats'])['floats']['missing'], 0)
+
+    def test_charts_are_built_by_registered_builders_with_timings(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            csv_path = os.path.join(temp_dir, 'data.csv')
+            self.test_df.to_csv(csv_path, index=False)
+            extra_builder = MagicMock(return_value={"title": {"text": "Extra"}})
+            with patch.dict(CHART_BUILDERS, {"chart1_bar": extra_builder}):
+                result = get_dataset_visualizations(csv_path)
+            clear_dataset_cache()
+
+        extra_builder.assert_called_once()
+        self.assertEqual(result['visualizations']['chart1_bar'], {"title": {"text": "Extra"}})
+        self.assertEqual(set(result['chart_timings_ms']), set(result['visualizations']))
+        self.assertTrue(all(ms >= 0 for ms in result['chart_timings_ms'].values()))
+
     def test_generate_barchart_by_category(self):
         # Call the function with our test DataFrame
         chart_config = generate_barchart_by_category(self.test_df, 'Category', 'Value1', 'Test Bar Chart')
@@ -180,6 +229,23 @@ class TestDataExplorationService(unittest.TestCase):
         self.assertEqual(chart_config['title']['text'], 'Test Stacked Bar Chart')
         self.assertEqual(len(chart_config['xAxis']['data']), 5)  # 5 categories
 
+    def test_charts_with_categorical_columns(self):
+        """Test that charts group compacted categorical columns and can add an 'Other' slice."""
+        df = pd.DataFrame({
+            'Region': pd.Categorical([f'R{i}' for i in range(10)] * 2),
+            'Value1': list(range(20))
+        })
+
+        bar_config = generate_barchart_by_category(df, 'Region', 'Value1', 'Test Bar Chart')
+        self.assertEqual(len(bar_config['xAxis']['data']), 10)
+
+        pie_config = generate_piechart_by_category(df, 'Region', 'Value1', 'Test Pie Chart')
+        self.assertEqual(len(pie_config['series'][0]['data']), 9)
+        self.assertEqual(pie_config['series'][0]['data'][-1]['name'], 'Other Categories')
+
+        category_col, _ = _find_columns(df, ['region'], ['value'])
+        self.assertEqual(category_col, 'Region')
+
     def test_find_columns(self):
         """Test the _find_columns helper function."""
         # Test with matching column names
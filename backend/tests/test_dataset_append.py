@@ -0,0 +1,88 @@
+import unittest
+import io
+import os
+import sys
+import shutil
+import tempfile
+from unittest.mock import patch
+
+# Add the src directory to the path so we can import the modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.dataset_loader import clear_dataset_cache
+from src.data_exploration_service import get_streaming_visualizations
+from src.dataset_append import append_rows, get_summary_state, DatasetAppendError
+from src.profiling_service import load_profile
+from src.streaming_summary import load_summary_state
+from src.upload_store import store_upload
+
+HEADER = "Regione;Tipologia;Impegno totale;Pagato\n"
+HISTORY = ("Lazio;Strade;1.000,50;200\n"
+           "Umbria;Scuole;250,00;\n"
+           "Lazio;Scuole;300,25;100\n")
+
+class TestDatasetAppend(unittest.TestCase):
+    def setUp(self):
+        self.upload_folder = tempfile.mkdtemp()
+        stored = store_upload(io.BytesIO((HEADER + HISTORY).encode('utf-8')), 'finance.csv', self.upload_folder)
+        self.dataset_path = stored["path"]
+        clear_dataset_cache()
+
+    def tearDown(self):
+        clear_dataset_cache()
+        shutil.rmtree(self.upload_folder, ignore_errors=True)
+
+    def test_append_matches_full_recomputation(self):
+        get_summary_state(self.dataset_path)
+        delta = "Regione,Tipologia,Impegno totale,Pagato\nMarche,Strade,\"2.000,00\",50\nLazio,Strade,\"10,00\",\n"
+
+        # The existing rows are not summarized again
+        with patch('src.dataset_append.build_summary_state', side_effect=AssertionError('history re-read')):
+            stored = append_rows(self.dataset_path, io.BytesIO(delta.encode('utf-8')), self.upload_folder)
+
+        self.assertEqual(stored["appended_rows"], 2)
+        self.assertEqual(stored["num_rows"], 5)
+        self.assertNotEqual(stored["path"], self.dataset_path)
+        with open(stored["path"], encoding='utf-8') as f:
+            self.assertEqual(f.read(), HEADER + HISTORY + "Marche;Strade;2.000,00;50\nLazio;Strade;10,00;\n")
+
+        expected = get_streaming_visualizations(stored["path"])
+        summary = stored["result"]["summary"]
+        self.assertEqual(summary["num_rows"], expected["summary"]["num_rows"])
+        self.assertEqual(summary["categorical_stats"], expected["summary"]["categorical_stats"])
+        for col in ['Impegno totale', 'Pagato']:
+            for key in ['min', 'max', 'mean', 'std', 'median', 'missing']:
+                self.assertAlmostEqual(summary["numeric_stats"][col][key], expected["summary"]["numeric_stats"][col][key])
+        self.assertEqual(stored["result"]["visualizations"], expected["visualizations"])
+
+        # The extended dataset can be appended to again, and is ready to be explored
+        self.assertIsNotNone(load_summary_state(stored["path"]))
+        self.assertEqual(load_profile(stored["path"])["exploration"]["summary"]["num_rows"], 5)
+
+    def test_append_to_files_with_byte_order_mark(self):
+        for encoding in ['utf-8-sig', 'utf-16']:
+            with self.subTest(encoding=encoding):
+                content = "Region,Sales\nR1,10\nR2,20\nR1,30".encode(encoding)
+                stored = store_upload(io.BytesIO(content), f'{encoding}.csv', self.upload_folder)
+                get_summary_state(stored["path"])
+                extended = append_rows(stored["path"], io.BytesIO(b"Region,Sales\nR9,5\n"), self.upload_folder)
+
+                with open(extended["path"], encoding=encoding) as f:
+                    self.assertEqual(f.read(), "Region,Sales\nR1,10\nR2,20\nR1,30\nR9,5\n")
+                # Reloading the file gives the labels of the incrementally updated summary
+                expected = get_streaming_visualizations(extended["path"])
+                self.assertEqual(extended["result"]["summary"]["categorical_stats"],
+                                 expected["summary"]["categorical_stats"])
+                self.assertIn('R9', str(expected["summary"]["categorical_stats"]))
+
+    def test_mismatched_columns_are_rejected(self):
+        delta = io.BytesIO(b"Regione;Importo\nLazio;10\n")
+        with self.assertRaises(DatasetAppendError):
+            append_rows(self.dataset_path, delta, self.upload_folder)
+
+    def test_only_csv_datasets_accept_rows(self):
+        with self.assertRaises(DatasetAppendError):
+            append_rows(os.path.join(self.upload_folder, 'dataset.parquet'), io.BytesIO(b''), self.upload_folder)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,196 @@
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from unittest.mock import patch
+
+# Add the src directory to the path so we can import the modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.dataset_loader import (
+    DataFrameCache,
+    DatasetLoadError,
+    load_dataframe,
+    clear_dataset_cache,
+    get_dataset_cache_stats,
+    invalidate_dataset,
+    compact_dtypes,
+    widen_dtypes,
+    detect_encoding,
+    detect_delimiter,
+    sniff_csv_dialect
+)
+
+class TestDatasetLoader(unittest.TestCase):
+    def setUp(self):
+        # Create a temporary CSV file for testing
+        self.temp_dir = tempfile.mkdtemp()
+        self.csv_path = os.path.join(self.temp_dir, 'test.csv')
+        with open(self.csv_path, 'w') as f:
+            f.write("Category;Value1;Value2\nA;10;5\nB;20;15\nC;30;25\nD;40;35\nE;50;45\n")
+        clear_dataset_cache()
+
+    def tearDown(self):
+        clear_dataset_cache()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_load_dataframe_parses_csv(self):
+        df, message = load_dataframe(self.csv_path)
+
+        # Check that the semicolon-separated file was split into columns
+        self.assertEqual(list(df.columns), ['Category', 'Value1', 'Value2'])
+        self.assertEqual(len(df), 5)
+        self.assertIn('Successfully loaded', message)
+
+    def test_load_dataframe_uses_cache(self):
+        df1, _ = load_dataframe(self.csv_path)
+
+        # The second load must not parse the file again
+        with patch('src.dataset_loader.pd.read_csv', side_effect=AssertionError('file was re-parsed')):
+            df2, _ = load_dataframe(self.csv_path)
+
+        self.assertIs(df1, df2)
+        stats = get_dataset_cache_stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['entries'], 1)
+
+    def test_load_dataframe_reloads_modified_file(self):
+        df1, _ = load_dataframe(self.csv_path)
+
+        # Rewrite the file with an extra row; the (size, mtime) key must change
+        with open(self.csv_path, 'a') as f:
+            f.write("F;60;55\n")
+
+        df2, _ = load_dataframe(self.csv_path)
+        self.assertEqual(len(df1), 5)
+        self.assertEqual(len(df2), 6)
+
+    def test_invalidate_dataset(self):
+        load_dataframe(self.csv_path)
+        invalidate_dataset(self.csv_path)
+        self.assertEqual(get_dataset_cache_stats()['entries'], 0)
+
+    def test_load_dataframe_failure_raises(self):
+        with patch('src.dataset_loader.pd.read_csv', side_effect=Exception('CSV read failed')), \
+             patch('src.dataset_loader.pd.read_excel', side_effect=Exception('Excel read failed')):
+            with self.assertRaises(DatasetLoadError):
+                load_dataframe(os.path.join(self.temp_dir, 'missing.unknown'))
+
+    def test_cache_respects_memory_budget(self):
+        df = pd.DataFrame({'Value': range(1000)})
+        size = int(df.memory_usage(deep=True).sum())
+
+        # Room for exactly two frames: inserting a third evicts the least recently used
+        cache = DataFrameCache(max_bytes=size * 2)
+        cache.put(('a', 0, 0), df, '')
+        cache.put(('b', 0, 0), df, '')
+        cache.get(('a', 0, 0))
+        cache.put(('c', 0, 0), df, '')
+
+        self.assertIsNotNone(cache.get(('a', 0, 0)))
+        self.assertIsNone(cache.get(('b', 0, 0)))
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+class TestDtypeCompaction(unittest.TestCase):
+    def test_compact_dtypes(self):
+        df = pd.DataFrame({
+            'Province': ['Roma', 'Milano', 'Roma', 'Napoli'] * 50,
+            'Code': [f'ID{i}' for i in range(200)],
+            'Count': range(200),
+            'Share': [0.5, 0.25, 1.5, 2.0] * 50,
+            'Amount': [1234.56, 10.1, 0.3, 7.0] * 50,
+        })
+        compacted, saved = compact_dtypes(df.copy())
+
+        self.assertIsInstance(compacted['Province'].dtype, pd.CategoricalDtype)
+        self.assertEqual(compacted['Code'].dtype, object)
+        self.assertEqual(compacted['Count'].dtype, 'int16')
+        # Floats are not narrowed: reductions over float32 lose precision
+        self.assertEqual(compacted['Share'].dtype, 'float64')
+        self.assertEqual(compacted['Amount'].dtype, 'float64')
+        self.assertGreater(saved, 0)
+
+        # Widening restores plain dtypes with identical values
+        pd.testing.assert_frame_equal(widen_dtypes(compacted), df)
+
+    def test_grouped_sums_match_uncompacted_frame(self):
+        rng = np.random.default_rng(0)
+        n = 200000
+        df = pd.DataFrame({
+            'Province': rng.choice(['Roma', 'Rieti', 'Latina', 'Frosinone'], n),
+            'Count': rng.integers(0, 100, n),
+            # Whole-number currency amounts: each one fits float32 exactly, their sums do not
+            'Amount': rng.integers(0, 700000, n).astype(float),
+        })
+        compacted, _ = compact_dtypes(df.copy())
+        expected = df.groupby('Province')[['Count', 'Amount']].sum()
+        grouped = compacted.groupby('Province', observed=True)[['Count', 'Amount']].sum()
+        self.assertEqual(grouped['Amount'].to_dict(), expected['Amount'].to_dict())
+        self.assertEqual(grouped['Count'].to_dict(), expected['Count'].to_dict())
+        self.assertEqual(compacted['Amount'].mean(), df['Amount'].mean())
+
+    def test_loader_reports_saved_bytes(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            csv_path = os.path.join(temp_dir, 'provinces.csv')
+            pd.DataFrame({'Provincia': ['Roma', 'Latina'] * 100, 'Totale': range(200)}).to_csv(csv_path, index=False)
+            clear_dataset_cache()
+            df, message = load_dataframe(csv_path)
+            self.assertIsInstance(df['Provincia'].dtype, pd.CategoricalDtype)
+            self.assertIn('Compacted column types, saving', message)
+        finally:
+            clear_dataset_cache()
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+class TestCsvSniffer(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        clear_dataset_cache()
+
+    def tearDown(self):
+        clear_dataset_cache()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _write(self, name, content):
+        path = os.path.join(self.temp_dir, name)
+        with open(path, 'wb') as f:
+            f.write(content)
+        return path
+
+    def test_detect_encoding(self):
+        self.assertEqual(detect_encoding(b'\xef\xbb\xbfa,b\n'), 'utf-8-sig')
+        self.assertEqual(detect_encoding('Città,Importo\n'.encode('utf-8')), 'utf-8')
+        self.assertEqual(detect_encoding('Costo €\n'.encode('cp1252')), 'cp1252')
+        self.assertEqual(detect_encoding('Città\n'.encode('latin-1')), 'latin-1')
+
+    def test_detect_encoding_truncated_multibyte(self):
+        # A sample cut in the middle of a UTF-8 character is still UTF-8
+        sample = 'Città'.encode('utf-8')[:-1]
+        self.assertEqual(detect_encoding(sample), 'utf-8')
+
+    def test_detect_delimiter(self):
+        self.assertEqual(detect_delimiter("a,b,c\n1,2,3\n4,5,6\n"), ',')
+        self.assertEqual(detect_delimiter("a;b;c\n1,5;2,5;3\n4;5;6\n"), ';')
+        self.assertEqual(detect_delimiter("a\tb\n1\t2\n"), '\t')
+        # Quoted delimiters must not change the field count
+        self.assertEqual(detect_delimiter('name,desc\nx,"a;b;c"\ny,"d;e;f"\n'), ',')
+
+    def test_comma_file_is_not_loaded_as_one_column(self):
+        path = self._write('comma.csv', b"Category,Value1,Value2\nA,10,5\nB,20,15\n")
+        df, message = load_dataframe(path)
+        self.assertEqual(list(df.columns), ['Category', 'Value1', 'Value2'])
+        self.assertIn('detected from sample', message)
+
+    def test_sniffed_dialect_is_cached(self):
+        path = self._write('cached.csv', b"a;b\n1;2\n")
+        sniff_csv_dialect(path)
+        with patch('src.dataset_loader.detect_delimiter', side_effect=AssertionError('dialect re-detected')):
+            dialect = sniff_csv_dialect(path)
+        self.assertEqual(dialect, {"encoding": "utf-8", "delimiter": ";"})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+# Add the src directory to the path so we can import the modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.dataset_registry import DatasetRegistry
+
+class TestDatasetRegistry(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.registry = DatasetRegistry(os.path.join(self.temp_dir, 'catalog', 'registry.sqlite3'))
+        self.data_path = os.path.join(self.temp_dir, 'dataset.csv')
+
+    def tearDown(self):
+        self.registry.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_register_gives_distinct_ids(self):
+        first = self.registry.register(self.data_path, 'spese.csv', sha256='ab' * 32)
+        second = self.registry.register(self.data_path, 'spese.csv', sha256='ab' * 32)
+
+        self.assertNotEqual(first['dataset_id'], second['dataset_id'])
+        self.assertEqual(first['path'], os.path.abspath(self.data_path))
+        self.assertEqual(first['filename'], 'spese.csv')
+        self.assertIsNone(self.registry.get('unknown'))
+
+    def test_find_upload_matches_content_and_path(self):
+        first = self.registry.register(self.data_path, 'spese.csv', sha256='ab' * 32)['dataset_id']
+        self.registry.register(self.data_path, 'spese.csv', sha256='ab' * 32, parent_id=first)
+        self.assertEqual(self.registry.find_upload(self.data_path, 'ab' * 32)['dataset_id'], first)
+        self.assertIsNone(self.registry.find_upload(self.data_path, 'cd' * 32))
+        self.assertIsNone(self.registry.find_upload(os.path.join(self.temp_dir, 'other.csv'), 'ab' * 32))
+
+        self.registry.touch(first, filename='spese_2024.csv')
+        self.assertEqual(self.registry.get(first)['filename'], 'spese_2024.csv')
+
+    def test_metadata_round_trip(self):
+        dataset_id = self.registry.register(self.data_path, 'spese.csv')['dataset_id']
+        schema = {'Importo': {'type': 'float', 'number_format': 'decimal_comma'}}
+        self.registry.set_metadata(dataset_id, schema=schema, num_rows=42, sidecar_path='x.arrow')
+
+        record = self.registry.get(dataset_id)
+        self.assertEqual(record['schema'], schema)
+        self.assertEqual(record['num_rows'], 42)
+        self.assertEqual(record['sidecar_path'], 'x.arrow')
+        with self.assertRaises(ValueError):
+            self.registry.set_metadata(dataset_id, path='/etc/passwd')
+
+    def test_catalog_persists_and_orders_by_use(self):
+        first = self.registry.register(self.data_path, 'a.csv')['dataset_id']
+        second = self.registry.register(self.data_path, 'b.csv')['dataset_id']
+        time.sleep(0.01)
+        self.registry.touch(first)
+
+        reopened = DatasetRegistry(self.registry.db_path)
+        try:
+            self.assertEqual([record['dataset_id'] for record in reopened.list()], [first, second])
+        finally:
+            reopened.close()
+
+    def test_remove_path_forgets_evicted_datasets(self):
+        self.registry.register(self.data_path, 'a.csv')
+        child = self.registry.register(os.path.join(self.temp_dir, 'other.csv'), 'b.csv')['dataset_id']
+
+        self.assertEqual(self.registry.remove_path(self.data_path), 1)
+        self.assertEqual([record['dataset_id'] for record in self.registry.list()], [child])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+import pandas as pd
+from unittest.mock import patch
+
+# Add the src directory to the path so we can import the modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.dataset_loader import load_dataframe, clear_dataset_cache
+from src.dataset_store import (
+    get_sidecar_path,
+    is_sidecar_fresh,
+    write_sidecar,
+    read_sidecar,
+    remove_sidecar
+)
+
+class TestDatasetStore(unittest.TestCase):
+    def setUp(self):
+        # Create a temporary CSV file for testing
+        self.temp_dir = tempfile.mkdtemp()
+        self.csv_path = os.path.join(self.temp_dir, 'test.csv')
+        with open(self.csv_path, 'w') as f:
+            f.write("Category;Value1;Value2\nA;10;5\nB;20;15\nC;30;25\n")
+        clear_dataset_cache()
+
+    def tearDown(self):
+        clear_dataset_cache()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_write_and_read_sidecar(self):
+        df, _ = load_dataframe(self.csv_path)
+        sidecar_path = write_sidecar(self.csv_path, df)
+
+        self.assertEqual(sidecar_path, get_sidecar_path(self.csv_path))
+        self.assertTrue(is_sidecar_fresh(self.csv_path))
+        pd.testing.assert_frame_equal(read_sidecar(self.csv_path), df)
+
+    def test_loader_prefers_fresh_sidecar(self):
+        df, _ = load_dataframe(self.csv_path)
+        write_sidecar(self.csv_path, df)
+        clear_dataset_cache()
+
+        # With a fresh sidecar the CSV must not be parsed again
+        with patch('src.dataset_loader.pd.read_csv', side_effect=AssertionError('CSV was parsed')):
+            sidecar_df, message = load_dataframe(self.csv_path)
+
+        self.assertIn('sidecar', message)
+        self.assertTrue(pd.api.types.is_numeric_dtype(sidecar_df['Value1']))
+
+    def test_stale_sidecar_is_ignored(self):
+        df, _ = load_dataframe(self.csv_path)
+        write_sidecar(self.csv_path, df)
+
+        # Make the source newer than its sidecar
+        sidecar_mtime = os.stat(get_sidecar_path(self.csv_path)).st_mtime
+        os.utime(self.csv_path, (sidecar_mtime + 10, sidecar_mtime + 10))
+
+        self.assertFalse(is_sidecar_fresh(self.csv_path))
+
+    def test_arrow_sidecar_is_memory_mapped(self):
+        df, _ = load_dataframe(self.csv_path)
+        sidecar_path = write_sidecar(self.csv_path, df)
+        self.assertTrue(sidecar_path.endswith('.arrow'))
+
+        # Numeric columns point at the read-only mapped file instead of a private copy
+        mapped_df = read_sidecar(self.csv_path)
+        self.assertFalse(mapped_df['Value1'].to_numpy().flags.writeable)
+        pd.testing.assert_frame_equal(mapped_df, df)
+
+    @patch('src.dataset_store.SIDECAR_FORMAT', 'parquet')
+    def test_parquet_sidecar_format(self):
+        df, _ = load_dataframe(self.csv_path)
+        sidecar_path = write_sidecar(self.csv_path, df)
+
+        self.assertTrue(sidecar_path.endswith('.parquet'))
+        pd.testing.assert_frame_equal(read_sidecar(self.csv_path), df)
+
+    def test_remove_sidecar(self):
+        df, _ = load_dataframe(self.csv_path)
+        write_sidecar(self.csv_path, df)
+        remove_sidecar(self.csv_path)
+        self.assertFalse(os.path.exists(get_sidecar_path(self.csv_path)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+# Add the src directory to the path so we can import the modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.downsampling import lttb_indices, minmax_indices, downsample_echarts, downsample_plotly, _decode_plotly_array
+
+
+class TestDownsampling(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.values = rng.normal(size=10000).cumsum()
+        # A single spike that must survive downsampling
+        self.values[4321] = 1000.0
+
+    def test_lttb_keeps_endpoints_and_peaks(self):
+        x = np.arange(len(self.values), dtype=float)
+        indices = lttb_indices(x, self.values, 500)
+        self.assertEqual(len(indices), 500)
+        self.assertEqual(indices[0], 0)
+        self.assertEqual(indices[-1], len(self.values) - 1)
+        self.assertIn(4321, indices)
+        self.assertTrue(np.all(np.diff(indices) > 0))
+
+    def test_lttb_with_nan_values(self):
+        values = self.values.copy()
+        values[100:3000] = np.nan
+        indices = lttb_indices(np.arange(len(values), dtype=float), values, 200)
+        self.assertLessEqual(len(indices), 200)
+        self.assertIn(4321, indices)
+
+    def test_minmax_keeps_bucket_extremes(self):
+        indices = minmax_indices(self.values, 100)
+        self.assertLessEqual(len(indices), 100)
+        self.assertIn(4321, indices)
+        self.assertIn(int(np.argmin(self.values)), indices)
+
+    def test_small_series_are_unchanged(self):
+        config = {"xAxis": {"type": "category", "data": ["a", "b"]},
+                  "series": [{"type": "line", "data": [1, 2]}]}
+        self.assertIsNone(downsample_echarts(config, max_points=10))
+        self.assertEqual(config["series"][0]["data"], [1, 2])
+
+    def test_echarts_shared_category_axis(self):
+        dates = pd.date_range('2024-01-01', periods=len(self.values), freq='h')
+        config = {
+            "xAxis": {"type": "category", "data": [date.isoformat() for date in dates]},
+            "series": [{"type": "line", "data": self.values.tolist()},
+                       {"type": "line", "data": (-self.values).tolist()}]
+        }
+        meta = downsample_echarts(config, max_points=300)
+        kept = len(config["xAxis"]["data"])
+        self.assertEqual(meta["original_points"], 2 * len(self.values))
+        self.assertEqual(meta["points"], 2 * kept)
+        self.assertEqual(meta["methods"], ["lttb"])
+        self.assertTrue(all(len(series["data"]) == kept for series in config["series"]))
+        self.assertIn(1000.0, config["series"][0]["data"])
+
+    def test_echarts_bars_over_unordered_labels_are_unchanged(self):
+        labels = [f"item {i}" for i in range(len(self.values))]
+        config = {"xAxis": {"type": "category", "data": labels},
+                  "series": [{"type": "bar", "data": self.values.tolist()}]}
+        self.assertIsNone(downsample_echarts(config, max_points=300))
+        self.assertEqual(len(config["series"][0]["data"]), len(self.values))
+
+    def test_echarts_pairs_and_ordered_bars(self):
+        x = np.arange(len(self.values))
+        config = {"xAxis": {"type": "value"},
+                  "series": [{"type": "scatter", "data": np.column_stack([x, self.values]).tolist()},
+                             {"type": "bar", "data": np.column_stack([x, self.values]).tolist()}]}
+        meta = downsample_echarts(config, max_points=300)
+        self.assertEqual(meta["methods"], ["lttb", "minmax"])
+        self.assertEqual(len(config["series"][0]["data"]), 300)
+        self.assertLessEqual(len(config["series"][1]["data"]), 300)
+        self.assertIn([4321.0, 1000.0], config["series"][1]["data"])
+
+    def test_plotly_typed_arrays_and_point_attributes(self):
+        dates = pd.date_range('2024-01-01', periods=len(self.values), freq='min')
+        fig = go.Figure(go.Scatter(x=dates, y=self.values, customdata=np.arange(len(self.values)),
+                                   text=[f"point {i}" for i in range(len(self.values))],
+                                   marker={"color": self.values}))
+        figure = fig.to_plotly_json()
+        meta = downsample_plotly(figure, max_points=400)
+        self.assertEqual(meta, {"original_points": len(self.values), "points": 400, "methods": ["lttb"]})
+
+        # The figure is still valid and every per-point attribute was reduced alike
+        go.Figure(figure)
+        trace = figure["data"][0]
+        y = _decode_plotly_array(trace["y"])
+        self.assertEqual(len(trace["x"]), 400)
+        self.assertEqual(len(y), 400)
+        self.assertEqual(len(trace["text"]), 400)
+        self.assertEqual(len(_decode_plotly_array(trace["marker"]["color"])), 400)
+        kept = _decode_plotly_array(trace["customdata"])
+        np.testing.assert_array_equal(y, self.values[kept])
+        np.testing.assert_array_equal(trace["x"], dates.values[kept])
+        self.assertIn(1000.0, y)
+
+    def test_plotly_horizontal_bars_over_categories_are_unchanged(self):
+        labels = [f"item {i}" for i in range(len(self.values))]
+        figure = go.Figure(go.Bar(x=self.values, y=labels, orientation='h')).to_plotly_json()
+        self.assertIsNone(downsample_plotly(figure, max_points=300))
+
+
+if __name__ == '__main__':
+    unittest.main()
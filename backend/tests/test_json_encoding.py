@@ -0,0 +1,68 @@
+import os
+import sys
+import json
+import datetime
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+from flask import Flask, jsonify
+
+# Add the src directory to the path so we can import the modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src import json_encoding
+from src.json_encoding import dumps, ResponseJSONProvider
+
+
+class TestJsonEncoding(unittest.TestCase):
+    def setUp(self):
+        self.value = {
+            "nan": float('nan'),
+            "inf": np.inf,
+            "nat": pd.NaT,
+            "integer": np.int64(7),
+            "flag": np.bool_(True),
+            "floats": np.array([1.5, np.nan]),
+            "labels": np.array(['a', 'b'], dtype=object),
+            "timestamp": pd.Timestamp('2024-03-01 12:30'),
+            "date": datetime.date(2024, 3, 1),
+            "nested": [{"value": np.float32(2.5), "missing": None}]
+        }
+        self.expected = {
+            "nan": None,
+            "inf": None,
+            "nat": None,
+            "integer": 7,
+            "flag": True,
+            "floats": [1.5, None],
+            "labels": ['a', 'b'],
+            "timestamp": '2024-03-01T12:30:00',
+            "date": '2024-03-01',
+            "nested": [{"value": 2.5, "missing": None}]
+        }
+
+    def test_dumps_converts_numpy_pandas_and_nan(self):
+        self.assertEqual(json.loads(dumps(self.value)), self.expected)
+
+    def test_dumps_without_orjson(self):
+        with patch.object(json_encoding, 'ORJSON_AVAILABLE', False):
+            encoded = dumps(self.value)
+        self.assertEqual(json.loads(encoded), self.expected)
+
+    def test_dumps_rejects_unknown_objects(self):
+        with self.assertRaises(TypeError):
+            dumps({"value": object()})
+
+    def test_flask_responses_use_the_encoder(self):
+        app = Flask(__name__)
+        app.json = ResponseJSONProvider(app)
+        with app.app_context():
+            response = jsonify(self.value)
+        self.assertEqual(response.mimetype, 'application/json')
+        self.assertEqual(json.loads(response.get_data()), self.expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
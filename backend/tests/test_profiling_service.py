@@ -0,0 +1,100 @@
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+from unittest.mock import patch
+
+# Add the src directory to the path so we can import the modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.data_exploration_service import build_summary_state, render_summary_state
+from src.dataset_loader import clear_dataset_cache, read_dataset_file
+from src.streaming_summary import load_summary_state
+from src.profiling_service import (
+    build_prompt_context,
+    get_profile_path,
+    get_profiling_status,
+    load_profile,
+    start_profiling,
+    wait_for_profile
+)
+
+class TestProfilingService(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.csv_path = os.path.join(self.temp_dir, 'data.csv')
+        with open(self.csv_path, 'w') as f:
+            f.write("Region;Impegno totale;Pagato totale\n"
+                    "Lazio;100;50\nUmbria;200;150\nLazio;300;250\nMarche;400;350\n")
+        clear_dataset_cache()
+
+    def tearDown(self):
+        clear_dataset_cache()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_background_profile_is_persisted(self):
+        self.assertEqual(get_profiling_status(self.csv_path)['status'], 'missing')
+        self.assertIn(start_profiling(self.csv_path), ['queued', 'running'])
+
+        profile = wait_for_profile(self.csv_path, timeout=30)
+        self.assertIsNotNone(profile)
+        self.assertTrue(os.path.exists(get_profile_path(self.csv_path)))
+        self.assertEqual(profile['exploration']['summary']['num_rows'], 4)
+        self.assertEqual(profile['column_profiles']['Impegno totale']['max'], 400.0)
+        self.assertIn('chart1_bar', profile['exploration']['visualizations'])
+
+        # A fresh profile is not recomputed
+        self.assertEqual(start_profiling(self.csv_path), 'ready')
+        self.assertEqual(get_profiling_status(self.csv_path)['status'], 'ready')
+
+    def test_in_memory_exploration_parses_the_file_once(self):
+        with patch('src.dataset_loader.read_dataset_file', wraps=read_dataset_file) as read, \
+                patch('src.data_exploration_service.iter_csv_chunks', side_effect=AssertionError('parsed in chunks')):
+            start_profiling(self.csv_path)
+            self.assertIsNotNone(wait_for_profile(self.csv_path, timeout=30))
+        self.assertEqual(read.call_count, 1)
+
+        # The summary state built from the loaded frame is that of a chunked pass
+        state = load_summary_state(self.csv_path)
+        self.assertIsNotNone(state)
+        expected, _ = build_summary_state(self.csv_path)
+        result, expected_result = render_summary_state(state, ''), render_summary_state(expected, '')
+        self.assertEqual(result['summary'], expected_result['summary'])
+        self.assertEqual(result['visualizations'], expected_result['visualizations'])
+
+    def test_profile_is_outdated_when_file_changes(self):
+        start_profiling(self.csv_path)
+        self.assertIsNotNone(wait_for_profile(self.csv_path, timeout=30))
+
+        with open(self.csv_path, 'a') as f:
+            f.write("Toscana;500;450\n")
+        self.assertIsNone(load_profile(self.csv_path))
+
+    def test_failed_job_is_reported(self):
+        with patch('src.profiling_service.get_dataset_visualizations', side_effect=RuntimeError('boom')):
+            start_profiling(self.csv_path)
+            wait_for_profile(self.csv_path, timeout=30)
+        status = get_profiling_status(self.csv_path)
+        self.assertEqual(status['status'], 'failed')
+        self.assertIn('boom', status['error'])
+
+    def test_prompt_context(self):
+        summary = {
+            "num_rows": 2,
+            "columns": ['Region', 'Value'],
+            "numeric_columns": ['Value'],
+            "numeric_stats": {'Value': {"mean": 1.5, "std": 0.7, "missing": 0}},
+            "sample_data": [{'Region': 'Nord', 'Value': 1}, {'Region': 'Sud', 'Value': 2}]
+        }
+        compact = build_prompt_context(summary, compact=True)
+        detailed = build_prompt_context(summary, compact=False)
+
+        self.assertIn('Rows: 2', compact)
+        self.assertIn('Nord', compact)
+        self.assertNotIn('Brief summary', compact)
+        self.assertIn('Brief summary', detailed)
+        self.assertIn('mean', detailed)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+# Add the src directory to the path so we can import the modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.column_index import index_frame
+from src.dataset_loader import clear_dataset_cache, load_dataframe
+from src.query_service import QueryError, parse_query, run_query
+from src.rollup_cube import build_rollup_cube, save_rollup_cube
+
+
+class TestQueryService(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        n = 5000
+        df = pd.DataFrame({
+            'Provincia': rng.choice(['Roma', 'Rieti', 'Latina', 'Frosinone'], n),
+            'Tipologia': rng.choice(['Strade', 'Scuole', 'Ospedali'], n),
+            'Anno': rng.integers(2018, 2023, n),
+            'Impegno totale': rng.normal(1000, 200, n).round(2),
+            'Pagato totale': rng.integers(0, 500, n).astype(float)
+        })
+        df.loc[::11, 'Pagato totale'] = np.nan
+        df.loc[::17, 'Tipologia'] = np.nan
+        self.temp_dir = tempfile.mkdtemp()
+        self.data_path = os.path.join(self.temp_dir, 'data.csv')
+        df.to_csv(self.data_path, index=False)
+        clear_dataset_cache()
+        self.df, _ = load_dataframe(self.data_path)
+
+    def tearDown(self):
+        clear_dataset_cache()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_filtered_multi_column_group_by_matches_pandas(self):
+        result = run_query(self.data_path, {
+            "filters": [{"column": "Provincia", "op": "in", "value": ["Roma", "Latina"]},
+                        {"column": "Impegno totale", "op": ">=", "value": 900}],
+            "group_by": ["Tipologia", "Anno"],
+            "aggregations": [{"column": "Impegno totale", "agg": "sum"},
+                             {"column": "Pagato totale", "agg": "mean", "as": "Pagato medio"},
+                             {"column": "Pagato totale", "agg": "max"},
+                             {"agg": "count"}]
+        })
+        self.assertEqual(result["source"], "columns")
+        self.assertIsNone(result["chart"])
+
+        rows = self.df[self.df['Provincia'].isin(['Roma', 'Latina']) & (self.df['Impegno totale'] >= 900)]
+        expected = rows.groupby(['Tipologia', 'Anno'], observed=True).agg(
+            total=('Impegno totale', 'sum'), mean=('Pagato totale', 'mean'),
+            maximum=('Pagato totale', 'max'), count=('Impegno totale', 'size')).reset_index()
+        got = pd.DataFrame(result["data"])
+        self.assertEqual(result["total_rows"], len(expected))
+        self.assertEqual(got['Tipologia'].tolist(), expected['Tipologia'].astype(str).tolist())
+        self.assertEqual(got['Anno'].tolist(), expected['Anno'].tolist())
+        np.testing.assert_allclose(got['sum(Impegno totale)'], expected['total'])
+        np.testing.assert_allclose(got['Pagato medio'], expected['mean'])
+        np.testing.assert_allclose(got['max(Pagato totale)'], expected['maximum'])
+        self.assertEqual(got['count'].tolist(), expected['count'].tolist())
+
+    def test_sort_limit_and_chart(self):
+        result = run_query(self.data_path, {
+            "group_by": ["Provincia"],
+            "aggregations": [{"column": "Impegno totale", "agg": "sum"}],
+            "sort": [{"column": "sum(Impegno totale)", "order": "desc"}],
+            "limit": 2
+        })
+        expected = self.df.groupby('Provincia', observed=True)['Impegno totale'].sum().sort_values(ascending=False)
+        self.assertEqual(result["total_rows"], 4)
+        self.assertEqual(result["data"]["Provincia"], [str(label) for label in expected.index[:2]])
+        np.testing.assert_allclose(result["data"]["sum(Impegno totale)"], expected.values[:2])
+        # The chart comes from the data exploration bar chart generator
+        self.assertEqual(result["chart"]["series"][0]["type"], "bar")
+        self.assertEqual(result["chart"]["xAxis"]["data"], result["data"]["Provincia"])
+
+    def test_chart_follows_query_order(self):
+        # The generators sort by value, descending; a query chart keeps the order and rows of its data
+        aggregations = [{"column": "Impegno totale", "agg": "sum"}, {"column": "Pagato totale", "agg": "sum"}]
+        for chart in ['bar', 'pie', 'stacked_bar']:
+            with self.subTest(chart=chart):
+                result = run_query(self.data_path, {
+                    "group_by": ["Tipologia"], "aggregations": aggregations, "chart": chart,
+                    "sort": [{"column": "sum(Impegno totale)", "order": "asc"}], "limit": 3
+                })
+                labels = result["data"]["Tipologia"]
+                totals = result["data"]["sum(Impegno totale)"]
+                self.assertEqual(totals, sorted(totals))
+                if chart == 'pie':
+                    slices = result["chart"]["series"][0]["data"]
+                    self.assertEqual([item["name"] for item in slices], [str(label) for label in labels])
+                    np.testing.assert_allclose([item["value"] for item in slices], totals)
+                else:
+                    self.assertEqual(result["chart"]["xAxis"]["data"], labels)
+                    np.testing.assert_allclose(result["chart"]["series"][0]["data"], totals)
+
+    def test_ungrouped_aggregation(self):
+        result = run_query(self.data_path, {
+            "filters": [{"column": "Tipologia", "op": "is_null"}],
+            "aggregations": [{"column": "Pagato totale", "agg": "count"}, {"agg": "count"}]
+        })
+        rows = self.df[self.df['Tipologia'].isna()]
+        self.assertEqual(result["data"], {"count(Pagato totale)": [rows['Pagato totale'].count()],
+                                          "count": [len(rows)]})
+
+    def test_rollup_cube_answers_unfiltered_queries(self):
+        save_rollup_cube(self.data_path, build_rollup_cube(self.data_path, index_frame(self.df)))
+        query = {"group_by": ["Provincia"], "aggregations": [{"column": "Pagato totale", "agg": "mean"}],
+                 "chart": "pie"}
+        with patch('src.query_service.load_dataframe_columns', side_effect=AssertionError('rows scanned')):
+            from_cube = run_query(self.data_path, query)
+        self.assertEqual(from_cube["source"], "rollup")
+        self.assertEqual(from_cube["chart"]["series"][0]["type"], "pie")
+
+        query["filters"] = [{"column": "Anno", "op": ">=", "value": 0}]
+        from_rows = run_query(self.data_path, query)
+        self.assertEqual(from_rows["source"], "columns")
+        self.assertEqual(from_cube["data"]["Provincia"], from_rows["data"]["Provincia"])
+        np.testing.assert_allclose(from_cube["data"]["mean(Pagato totale)"], from_rows["data"]["mean(Pagato totale)"])
+
+    def test_invalid_queries(self):
+        with self.assertRaises(QueryError):
+            parse_query({"aggregations": [{"column": "Impegno totale", "agg": "mode"}]})
+        with self.assertRaises(QueryError):
+            parse_query({"filters": [{"column": "Anno", "op": "between", "value": 2019}]})
+        with self.assertRaises(QueryError):
+            parse_query({"group_by": ["Anno"], "sort": ["Provincia"]})
+        with self.assertRaises(QueryError):
+            parse_query({"group_by": ["Anno", "Provincia"], "chart": "bar"})
+        with self.assertRaisesRegex(QueryError, "Provinca"):
+            run_query(self.data_path, {"group_by": ["Provinca"]})
+        with self.assertRaisesRegex(QueryError, "not numeric"):
+            run_query(self.data_path, {"aggregations": [{"column": "Provincia", "agg": "sum"}]})
+
+
+if __name__ == '__main__':
+    unittest.main()
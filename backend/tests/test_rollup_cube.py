@@ -0,0 +1,123 @@
+import io
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+# Add the src directory to the path so we can import the modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src import rollup_cube
+from src.aggregation_cache import aggregate
+from src.column_index import index_frame
+from src.dataset_append import append_rows
+from src.dataset_loader import clear_dataset_cache
+from src.profiling_service import store_profile
+from src.rollup_cube import (
+    RollupCube,
+    build_rollup_cube,
+    get_rollup_path,
+    load_rollup_cube,
+    save_rollup_cube,
+    select_rollup_columns
+)
+from src.upload_store import store_upload
+
+
+class TestRollupCube(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        n = 2000
+        self.df = pd.DataFrame({
+            'Provincia': rng.choice(['Roma', 'Rieti', 'Latina', 'Frosinone'], n),
+            'Tipologia': pd.Categorical(rng.choice(['Strade', 'Scuole', 'Ospedali'], n)),
+            'Impegno totale': rng.normal(1000, 200, n),
+            'Pagato totale': rng.integers(0, 500, n).astype(float),
+            'Codice': [f"C{i}" for i in range(n)]
+        })
+        self.df.loc[::9, 'Pagato totale'] = np.nan
+        self.temp_dir = tempfile.mkdtemp()
+        clear_dataset_cache()
+
+    def tearDown(self):
+        clear_dataset_cache()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _cube(self, df: pd.DataFrame) -> RollupCube:
+        cube = RollupCube(*select_rollup_columns(index_frame(self.df)))
+        cube.update(df)
+        return cube
+
+    def test_selects_low_cardinality_dimensions_and_measures(self):
+        dimensions, measures = select_rollup_columns(index_frame(self.df))
+        self.assertEqual(dimensions, ['Provincia', 'Tipologia'])
+        self.assertEqual(measures, ['Impegno totale', 'Pagato totale'])
+
+    def test_frames_match_pandas(self):
+        cube = self._cube(self.df)
+        value_cols = ['Impegno totale', 'Pagato totale']
+        for agg in ['sum', 'count', 'min', 'max', 'mean']:
+            expected = self.df.groupby('Provincia')[value_cols].agg(agg).reset_index()
+            pd.testing.assert_frame_equal(cube.frame('Provincia', value_cols, agg), expected, check_dtype=False)
+        self.assertEqual(cube.group_sizes('Tipologia').to_dict(), self.df['Tipologia'].value_counts().to_dict())
+        self.assertFalse(cube.covers('Codice', value_cols))
+        with self.assertRaises(KeyError):
+            cube.frame('Provincia', ['Codice'])
+
+    def test_merged_chunks_match_whole_frame(self):
+        whole = self._cube(self.df)
+        merged = self._cube(self.df.iloc[:700]).merge(self._cube(self.df.iloc[700:]))
+        self.assertEqual(merged.num_rows, len(self.df))
+        for agg in ['sum', 'min', 'max', 'mean']:
+            pd.testing.assert_frame_equal(merged.frame('Tipologia', ['Pagato totale'], agg),
+                                          whole.frame('Tipologia', ['Pagato totale'], agg))
+
+    def test_dimension_exceeding_group_limit_is_dropped(self):
+        with patch.object(rollup_cube, 'ROLLUP_MAX_GROUPS', 3):
+            cube = self._cube(self.df)
+        self.assertEqual(cube.dimensions, ['Tipologia'])
+
+    def test_stored_cube_is_invalidated_when_the_file_changes(self):
+        data_path = os.path.join(self.temp_dir, 'data.csv')
+        self.df.to_csv(data_path, index=False)
+        cube = build_rollup_cube(data_path, index_frame(self.df))
+        save_rollup_cube(data_path, cube)
+        self.assertTrue(os.path.exists(get_rollup_path(data_path)))
+
+        loaded = load_rollup_cube(data_path)
+        pd.testing.assert_frame_equal(loaded.frame('Provincia', ['Impegno totale']),
+                                      cube.frame('Provincia', ['Impegno totale']))
+        # Charts read the cube instead of the rows
+        result = aggregate(self.df.iloc[:0], None, 'Provincia', ['Impegno totale'], rollup=loaded)
+        self.assertAlmostEqual(result['Impegno totale'].sum(), self.df['Impegno totale'].sum(), places=4)
+
+        with open(data_path, 'a') as f:
+            f.write("Roma,Strade,1.0,1.0,C9999\n")
+        self.assertIsNone(load_rollup_cube(data_path))
+
+    def test_profiling_builds_cube_and_appends_extend_it(self):
+        upload_folder = os.path.join(self.temp_dir, 'uploads')
+        os.makedirs(upload_folder)
+        history = "Regione;Impegno totale\nLazio;100\nUmbria;250\nLazio;300\n"
+        stored = store_upload(io.BytesIO(history.encode('utf-8')), 'finance.csv', upload_folder)
+        store_profile(stored["path"])
+        cube = load_rollup_cube(stored["path"])
+        self.assertEqual(cube.frame('Regione', ['Impegno totale'])['Impegno totale'].tolist(), [400.0, 250.0])
+
+        delta = "Regione;Impegno totale\nMarche;50\nLazio;10\n"
+        with patch('src.rollup_cube.build_rollup_cube', side_effect=AssertionError('history re-read')):
+            extended = append_rows(stored["path"], io.BytesIO(delta.encode('utf-8')), upload_folder)
+        frame = load_rollup_cube(extended["path"]).frame('Regione', ['Impegno totale'])
+        self.assertEqual(dict(zip(frame['Regione'], frame['Impegno totale'])),
+                         {'Lazio': 410.0, 'Marche': 50.0, 'Umbria': 250.0})
+        # The original dataset's cube is unchanged
+        self.assertEqual(load_rollup_cube(stored["path"]).num_rows, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
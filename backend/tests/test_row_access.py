@@ -0,0 +1,85 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+# Add the src directory to the path so we can import the modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src import row_access
+from src.dataset_loader import clear_dataset_cache, load_dataframe
+from src.row_access import RowAccessError, clear_sort_permutations, get_rows
+
+
+class TestRowAccess(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        n = 1000
+        df = pd.DataFrame({
+            'Provincia': rng.choice(['Roma', 'Rieti', 'Latina', 'Frosinone'], n),
+            'Anno': rng.integers(2018, 2023, n),
+            'Impegno totale': rng.normal(1000, 200, n).round(2),
+            'Data': pd.date_range('2020-01-01', periods=n, freq='D')
+        })
+        df.loc[::7, 'Impegno totale'] = np.nan
+        df.loc[::13, 'Provincia'] = np.nan
+        self.temp_dir = tempfile.mkdtemp()
+        self.data_path = os.path.join(self.temp_dir, 'data.csv')
+        df.to_csv(self.data_path, index=False)
+        clear_dataset_cache()
+        clear_sort_permutations()
+        self.df, _ = load_dataframe(self.data_path)
+
+    def tearDown(self):
+        clear_dataset_cache()
+        clear_sort_permutations()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_pages_in_file_order_with_projection(self):
+        result = get_rows(self.data_path, offset=990, limit=20, columns=['Anno', 'Provincia'])
+        self.assertEqual(result["columns"], ['Anno', 'Provincia'])
+        self.assertEqual(result["total_rows"], 1000)
+        self.assertEqual(result["row_ids"], list(range(990, 1000)))
+        self.assertEqual([row['Anno'] for row in result["rows"]], self.df['Anno'].iloc[990:].tolist())
+        self.assertEqual(list(result["rows"][0]), ['Anno', 'Provincia'])
+        self.assertEqual(get_rows(self.data_path, offset=5000)["rows"], [])
+
+    def test_sorted_pages_match_pandas(self):
+        for column in ['Impegno totale', 'Provincia', 'Data']:
+            for ascending in [True, False]:
+                expected = self.df.sort_values(column, ascending=ascending, kind='stable',
+                                               na_position='last')[column]
+                for offset in [0, 850, 990]:
+                    result = get_rows(self.data_path, offset=offset, limit=50, columns=[column],
+                                      sort=column, ascending=ascending)
+                    page = expected.iloc[offset:offset + 50]
+                    pd.testing.assert_series_equal(
+                        pd.Series([row[column] for row in result["rows"]], name=column, dtype=page.dtype),
+                        page.reset_index(drop=True))
+                    if ascending:
+                        self.assertEqual(result["row_ids"], page.index.tolist())
+
+    def test_sort_permutation_is_computed_once_per_column(self):
+        with patch.object(row_access, 'compute_sort_permutation',
+                          wraps=row_access.compute_sort_permutation) as compute:
+            for offset in range(0, 1000, 100):
+                get_rows(self.data_path, offset=offset, sort='Anno', ascending=offset % 200 == 0)
+        self.assertEqual(compute.call_count, 1)
+
+    def test_invalid_requests(self):
+        with self.assertRaisesRegex(RowAccessError, "Provinca"):
+            get_rows(self.data_path, columns=['Provinca'])
+        with self.assertRaises(RowAccessError):
+            get_rows(self.data_path, sort='Missing')
+        with self.assertRaises(RowAccessError):
+            get_rows(self.data_path, offset=-1)
+        self.assertEqual(get_rows(self.data_path, limit=10 ** 6)["limit"], row_access.ROWS_MAX_LIMIT)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+import pandas as pd
+
+# Add the src directory to the path so we can import the modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.schema_inference import infer_column_schema, infer_schema, apply_schema
+from src.dataset_loader import load_dataframe, get_dataset_schema, clear_dataset_cache
+from src.dataset_store import write_sidecar, read_sidecar_schema
+
+class TestSchemaInference(unittest.TestCase):
+    def test_decimal_comma_numbers(self):
+        spec = infer_column_schema(pd.Series(['1.234,56', '10,00', '987.654,3', '12']))
+        self.assertEqual(spec, {"type": "float", "number_format": "decimal_comma"})
+
+    def test_thousands_comma_numbers(self):
+        spec = infer_column_schema(pd.Series(['1,234.5', '10.25', '2,000']))
+        self.assertEqual(spec, {"type": "float", "number_format": "thousands_comma"})
+
+    def test_plain_integers(self):
+        self.assertEqual(infer_column_schema(pd.Series(['1', '2', '30'])),
+                         {"type": "int", "number_format": "plain"})
+        self.assertEqual(infer_column_schema(pd.Series([1, 2, 3])), {"type": "int"})
+
+    def test_dates(self):
+        spec = infer_column_schema(pd.Series(['31/12/2023', '01/02/2024', '15/06/2024']))
+        self.assertEqual(spec, {"type": "date", "date_format": "%d/%m/%Y"})
+
+    def test_categorical_and_text(self):
+        self.assertEqual(infer_column_schema(pd.Series(['Nord', 'Sud', 'Nord', 'Sud', 'Nord', 'Centro']))['type'],
+                         'categorical')
+        self.assertEqual(infer_column_schema(pd.Series(['alpha', 'beta', 'gamma']))['type'], 'text')
+
+    def test_apply_schema_converts_columns(self):
+        df = pd.DataFrame({
+            'Importo': ['1.234,56', '10,00', None],
+            'Data': ['31/12/2023', '01/02/2024', '15/06/2024'],
+            'Regione': ['Lazio', 'Lazio', 'Umbria'],
+        })
+        df, messages = apply_schema(df, infer_schema(df))
+
+        self.assertAlmostEqual(df['Importo'].iloc[0], 1234.56)
+        self.assertTrue(pd.isna(df['Importo'].iloc[2]))
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(df['Data']))
+        self.assertEqual(df['Regione'].dtype, object)
+        self.assertIn("Converted column 'Importo' to numeric type (decimal comma)", messages)
+
+class TestSchemaInferenceLoader(unittest.TestCase):
+    def setUp(self):
+        # Italian-formatted CSV: semicolon delimiter and decimal-comma amounts
+        self.temp_dir = tempfile.mkdtemp()
+        self.csv_path = os.path.join(self.temp_dir, 'impegni.csv')
+        with open(self.csv_path, 'w', encoding='utf-8') as f:
+            f.write("Regione;Impegno totale;Esercizio Finanziario\n"
+                    "Lazio;1.234,56;2022\n"
+                    "Umbria;987,10;2023\n"
+                    "Lazio;12.000,00;2023\n")
+        clear_dataset_cache()
+
+    def tearDown(self):
+        clear_dataset_cache()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_loader_converts_italian_amounts(self):
+        df, message = load_dataframe(self.csv_path)
+
+        self.assertEqual(df['Impegno totale'].tolist(), [1234.56, 987.10, 12000.0])
+        self.assertIn('decimal comma', message)
+        self.assertEqual(get_dataset_schema(self.csv_path)['Impegno totale']['number_format'], 'decimal_comma')
+
+    def test_schema_is_stored_in_sidecar(self):
+        df, _ = load_dataframe(self.csv_path)
+        schema = get_dataset_schema(self.csv_path)
+        if write_sidecar(self.csv_path, df, schema) is None:
+            self.skipTest('pyarrow is not installed')
+
+        self.assertEqual(read_sidecar_schema(self.csv_path), schema)
+
+if __name__ == '__main__':
+    unittest.main()
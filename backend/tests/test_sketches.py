@@ -0,0 +1,98 @@
+import unittest
+import os
+import sys
+import numpy as np
+import pandas as pd
+from unittest.mock import patch
+
+# Add the src directory to the path so we can import the modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.sketches import HyperLogLog, KLLSketch, SpaceSaving
+from src.data_exploration_service import get_dataset_summary
+
+class TestSketches(unittest.TestCase):
+    def test_hyperloglog_estimates_distinct_count(self):
+        rng = np.random.default_rng(7)
+        values = rng.integers(0, 200000, 500000)
+        left, right = HyperLogLog(), HyperLogLog()
+        left.update(values[:250000])
+        right.update(values[250000:])
+        estimate = left.merge(right).estimate()
+
+        exact = len(np.unique(values))
+        self.assertLess(abs(estimate - exact) / exact, 0.04)
+
+    def test_hyperloglog_small_cardinalities_and_round_trip(self):
+        sketch = HyperLogLog()
+        sketch.update(['Nord', 'Sud', 'Nord', 'Centro'])
+        self.assertEqual(sketch.estimate(), 3)
+        self.assertEqual(HyperLogLog.from_dict(sketch.to_dict()).estimate(), 3)
+        # Labels are compared by their string form
+        sketch.update([1, '1'])
+        self.assertEqual(sketch.estimate(), 4)
+
+    def test_kll_quantiles_within_rank_error(self):
+        rng = np.random.default_rng(3)
+        values = rng.normal(size=300000)
+        sketches = [KLLSketch(seed=i) for i in range(3)]
+        for sketch, part in zip(sketches, np.array_split(values, 3)):
+            sketch.update(part)
+        merged = sketches[0].merge(sketches[1]).merge(sketches[2])
+
+        self.assertEqual(merged.count, len(values))
+        for fraction, estimate in zip([0.25, 0.5, 0.75], merged.quantiles([0.25, 0.5, 0.75])):
+            self.assertLess(abs((values <= estimate).mean() - fraction), 0.0165)
+        self.assertLess(sum(len(items) for items in merged.levels), 1000)
+
+    def test_kll_is_exact_before_compaction(self):
+        sketch = KLLSketch()
+        sketch.update([4.0, 1.0, np.nan, 3.0, 2.0])
+        self.assertEqual(sketch.quantile(0.5), 2.5)
+        self.assertEqual(KLLSketch.from_dict(sketch.to_dict()).quantile(0.5), 2.5)
+        self.assertIsNone(KLLSketch().quantile(0.5))
+
+    def test_space_saving_keeps_heavy_hitters(self):
+        rng = np.random.default_rng(5)
+        values = pd.Series(rng.zipf(1.6, 200000) % 50000)
+        sketch = SpaceSaving(capacity=50)
+        for start in range(0, len(values), 20000):
+            sketch.update(values.iloc[start:start + 20000])
+
+        exact = values.value_counts()
+        self.assertEqual(list(sketch.top(3)), [str(value) for value in exact.index[:3]])
+        bound = len(values) / 50
+        for value, count in sketch.top(10).items():
+            self.assertLessEqual(count - exact[int(value)], bound)
+            self.assertGreaterEqual(count, exact[int(value)])
+
+    def test_space_saving_merge_is_exact_below_capacity(self):
+        left, right = SpaceSaving(), SpaceSaving()
+        left.update(pd.Series(['A', 'B', None, 'A']))
+        right.update(pd.Series(['B', 'A', 'C']))
+        merged = SpaceSaving.from_dict(left.merge(right).to_dict())
+        self.assertEqual(merged.top(), {'A': 3, 'B': 2, 'C': 1})
+        self.assertEqual(merged.floor, 0)
+
+    @patch('src.data_exploration_service.SKETCH_SUMMARY_MIN_ROWS', 1000)
+    @patch('src.streaming_summary.STREAMING_CHUNK_ROWS', 700)
+    def test_large_frames_are_summarized_with_sketches(self):
+        rng = np.random.default_rng(11)
+        df = pd.DataFrame({
+            'Region': rng.choice(['Lazio', 'Umbria', 'Toscana'], 5000),
+            'Amount': rng.normal(100, 10, 5000),
+        })
+        summary = get_dataset_summary(df)
+
+        self.assertEqual(summary['num_rows'], 5000)
+        self.assertEqual(summary['categorical_stats']['Region']['unique_values'], 3)
+        self.assertEqual(summary['categorical_stats']['Region']['top_values'],
+                         {str(k): int(v) for k, v in df['Region'].value_counts().items()})
+        stats = summary['numeric_stats']['Amount']
+        self.assertAlmostEqual(stats['mean'], df['Amount'].mean())
+        self.assertLess(abs((df['Amount'] <= stats['median']).mean() - 0.5), 0.0165)
+        self.assertLess(stats['p25'], stats['median'])
+        self.assertLess(stats['median'], stats['p75'])
+
+if __name__ == '__main__':
+    unittest.main()
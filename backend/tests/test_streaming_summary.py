@@ -0,0 +1,115 @@
+import unittest
+import os
+import json
+import sys
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from unittest.mock import patch
+
+# Add the src directory to the path so we can import the modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.dataset_loader import clear_dataset_cache
+from src.data_exploration_service import load_dataset, get_dataset_summary, get_streaming_visualizations, get_dataset_visualizations
+from src.data_exploration_service import build_summary_state, render_summary_state
+from src.streaming_summary import (
+    NumericAccumulator, CategoricalAccumulator, GroupedSums, should_stream, save_summary_state, load_summary_state
+)
+
+class TestStreamingAccumulators(unittest.TestCase):
+    def test_numeric_accumulator_merges_partials(self):
+        values = pd.Series([1.5, 2.0, np.nan, 10.0, -3.0, 7.25, np.nan, 4.0])
+        left, right = NumericAccumulator(), NumericAccumulator()
+        left.update(values.iloc[:3])
+        right.update(values.iloc[3:])
+        stats = left.merge(right).to_stats()
+
+        self.assertAlmostEqual(stats['mean'], values.mean())
+        self.assertAlmostEqual(stats['std'], values.std())
+        self.assertEqual(stats['min'], values.min())
+        self.assertEqual(stats['max'], values.max())
+        self.assertEqual(stats['median'], values.median())
+        self.assertEqual(stats['missing'], 2)
+
+    def test_categorical_accumulator_merges_counts(self):
+        left, right = CategoricalAccumulator(), CategoricalAccumulator()
+        left.update(pd.Series(['A', 'B', None, 'A']))
+        right.update(pd.Series(['B', 'A', 'C']))
+        stats = left.merge(right).to_stats()
+
+        self.assertEqual(stats['top_values'], {'A': 3, 'B': 2, 'C': 1})
+        self.assertEqual(stats['unique_values'], 3)
+        self.assertEqual(stats['missing'], 1)
+
+    def test_grouped_sums_merge(self):
+        sums = GroupedSums('Region', ['Amount'])
+        sums.update(pd.DataFrame({'Region': ['N', 'S', 'N'], 'Amount': [1.0, 2.0, 3.0]}))
+        sums.update(pd.DataFrame({'Region': ['S', 'E'], 'Amount': [5.0, 1.0]}))
+        totals = sums.to_frame().set_index('Region')['Amount'].to_dict()
+        self.assertEqual(totals, {'E': 1.0, 'N': 4.0, 'S': 7.0})
+
+class TestStreamingVisualizations(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.csv_path = os.path.join(self.temp_dir, 'large.csv')
+        rng = np.random.default_rng(42)
+        df = pd.DataFrame({
+            'Region': rng.choice(['Lazio', 'Umbria', 'Toscana', 'Marche'], 500),
+            'Tipologia': rng.choice(['Strade', 'Scuole', 'Ospedali'], 500),
+            'Impegno totale': rng.integers(100, 10000, 500),
+            'Pagato': rng.integers(0, 100, 500),
+        })
+        df.to_csv(self.csv_path, sep=';', index=False)
+        clear_dataset_cache()
+
+    def tearDown(self):
+        clear_dataset_cache()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    @patch('src.streaming_summary.STREAMING_CHUNK_ROWS', 64)
+    def test_streaming_matches_in_memory_results(self):
+        df, _ = load_dataset(self.csv_path)
+        expected = get_dataset_summary(df)
+        result = get_streaming_visualizations(self.csv_path)
+
+        self.assertIn('8 chunks', result['load_message'])
+        summary = result['summary']
+        self.assertEqual(summary['num_rows'], expected['num_rows'])
+        self.assertEqual(summary['column_types'], expected['column_types'])
+        self.assertEqual(summary['categorical_stats'], expected['categorical_stats'])
+        for key in ['min', 'max', 'mean', 'std', 'missing']:
+            self.assertAlmostEqual(summary['numeric_stats']['Pagato'][key], expected['numeric_stats']['Pagato'][key])
+
+        # Chart data built from merged group sums equals the in-memory groupby
+        chart = result['visualizations']['chart1_bar']
+        totals = df.groupby('Region', observed=True)['Impegno totale'].sum().sort_values(ascending=False)
+        self.assertEqual(chart['xAxis']['data'], totals.index.tolist())
+        self.assertEqual(chart['series'][0]['data'], totals.tolist())
+
+    def test_saved_state_is_standard_json(self):
+        data_path = os.path.join(self.temp_dir, 'dated.csv')
+        with open(data_path, 'w') as f:
+            f.write("Data,Region,Importo,Rapporto\n2024-01-05,Lazio,100,inf\n2024-02-10,Umbria,,1.5\n")
+        state, _ = build_summary_state(data_path)
+        state_path = save_summary_state(data_path, state)
+        with open(state_path) as f:
+            # NaN and infinity are written as null, dates as ISO strings
+            stored = json.loads(f.read(), parse_constant=lambda token: self.fail(f"non-standard token {token}"))
+        self.assertEqual(stored["summary"]["sample_data"][0]["Data"], '2024-01-05T00:00:00')
+
+        loaded = render_summary_state(load_summary_state(data_path), '')['summary']
+        expected = render_summary_state(state, '')['summary']
+        self.assertEqual(loaded['numeric_stats'], expected['numeric_stats'])
+        self.assertEqual(loaded['categorical_stats'], expected['categorical_stats'])
+
+    @patch('src.streaming_summary.STREAMING_THRESHOLD_BYTES', 1024)
+    def test_large_files_use_streaming_mode(self):
+        self.assertTrue(should_stream(self.csv_path))
+        with patch('src.data_exploration_service.load_dataset', side_effect=AssertionError('dataset loaded in memory')):
+            result = get_dataset_visualizations(self.csv_path)
+        self.assertIn('streaming mode', result['load_message'])
+
+if __name__ == '__main__':
+    unittest.main()
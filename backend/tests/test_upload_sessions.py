@@ -0,0 +1,97 @@
+import unittest
+import os
+import sys
+import io
+import time
+import shutil
+import hashlib
+import tempfile
+
+# Add the src directory to the path so we can import the modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.upload_sessions import (
+    UploadSessionError,
+    create_session,
+    write_part,
+    get_session_status,
+    complete_session,
+    expire_sessions
+)
+
+class TestUploadSessions(unittest.TestCase):
+    def setUp(self):
+        self.upload_folder = tempfile.mkdtemp()
+        self.content = b"Region;Value\n" + b"".join(f"R{i};{i}\n".encode() for i in range(100))
+
+    def tearDown(self):
+        shutil.rmtree(self.upload_folder, ignore_errors=True)
+
+    def test_parts_are_assembled_in_order(self):
+        session = create_session(self.upload_folder, 'data.csv', len(self.content))
+        upload_id = session['upload_id']
+        parts = [self.content[i:i + 200] for i in range(0, len(self.content), 200)]
+
+        # Send the parts out of order
+        for index in reversed(range(len(parts))):
+            write_part(self.upload_folder, upload_id, index, io.BytesIO(parts[index]))
+
+        stored = complete_session(self.upload_folder, upload_id, len(parts))
+        with open(stored['path'], 'rb') as f:
+            self.assertEqual(f.read(), self.content)
+        self.assertEqual(stored['sha256'], hashlib.sha256(self.content).hexdigest())
+        self.assertEqual(stored['filename'], 'data.csv')
+
+        # The session is gone once completed
+        with self.assertRaises(UploadSessionError):
+            get_session_status(self.upload_folder, upload_id)
+
+    def test_resume_after_interruption(self):
+        upload_id = create_session(self.upload_folder, 'data.csv')['upload_id']
+        write_part(self.upload_folder, upload_id, 0, io.BytesIO(self.content[:300]))
+        write_part(self.upload_folder, upload_id, 2, io.BytesIO(self.content[600:]))
+
+        status = get_session_status(self.upload_folder, upload_id)
+        self.assertEqual(sorted(status['parts']), [0, 2])
+        with self.assertRaises(UploadSessionError):
+            complete_session(self.upload_folder, upload_id, 3)
+
+        # Only the missing part is sent again
+        write_part(self.upload_folder, upload_id, 1, io.BytesIO(self.content[300:600]))
+        stored = complete_session(self.upload_folder, upload_id, 3)
+        with open(stored['path'], 'rb') as f:
+            self.assertEqual(f.read(), self.content)
+
+    def test_size_mismatch_is_rejected(self):
+        upload_id = create_session(self.upload_folder, 'data.csv', len(self.content) + 1)['upload_id']
+        write_part(self.upload_folder, upload_id, 0, io.BytesIO(self.content))
+        with self.assertRaises(UploadSessionError):
+            complete_session(self.upload_folder, upload_id)
+
+    def test_invalid_announced_size_is_rejected(self):
+        for size in ["100", 1.5, True, -1]:
+            with self.assertRaises(UploadSessionError):
+                create_session(self.upload_folder, 'data.csv', size)
+        self.assertEqual(create_session(self.upload_folder, 'data.csv', 0)['total_size'], 0)
+
+    def test_invalid_expected_parts_are_rejected(self):
+        upload_id = create_session(self.upload_folder, 'data.csv')['upload_id']
+        write_part(self.upload_folder, upload_id, 0, io.BytesIO(self.content))
+        for parts in ["1", 1.0, True, -1, 10 ** 12]:
+            with self.assertRaises(UploadSessionError):
+                complete_session(self.upload_folder, upload_id, parts)
+        self.assertEqual(complete_session(self.upload_folder, upload_id, 1)['size'], len(self.content))
+
+    def test_invalid_upload_id(self):
+        with self.assertRaises(UploadSessionError):
+            write_part(self.upload_folder, '../../etc', 0, io.BytesIO(b'x'))
+
+    def test_expire_sessions(self):
+        upload_id = create_session(self.upload_folder, 'data.csv')['upload_id']
+        past = time.time() - 100
+        session_dir = os.path.join(self.upload_folder, '.sessions', upload_id)
+        os.utime(session_dir, (past, past))
+        self.assertEqual(expire_sessions(self.upload_folder, ttl_seconds=10), [upload_id])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+import os
+import sys
+import io
+import time
+import shutil
+import hashlib
+import tempfile
+
+# Add the src directory to the path so we can import the modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.upload_store import (
+    store_upload,
+    find_dataset_file,
+    get_dataset_hash,
+    get_artifact_path,
+    touch_dataset,
+    list_datasets,
+    enforce_quota
+)
+
+class TestUploadStore(unittest.TestCase):
+    def setUp(self):
+        self.upload_folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.upload_folder, ignore_errors=True)
+
+    def _store(self, content, filename='data.csv'):
+        return store_upload(io.BytesIO(content), filename, self.upload_folder)
+
+    def test_store_by_content_hash(self):
+        content = b"Region;Value\nNord;1\nSud;2\n"
+        stored = self._store(content)
+
+        self.assertEqual(stored['sha256'], hashlib.sha256(content).hexdigest())
+        self.assertEqual(stored['size'], len(content))
+        self.assertFalse(stored['deduplicated'])
+        self.assertTrue(stored['path'].endswith(os.path.join(stored['sha256'], 'dataset.csv')))
+        with open(stored['path'], 'rb') as f:
+            self.assertEqual(f.read(), content)
+        self.assertEqual(get_dataset_hash(stored['path']), stored['sha256'])
+        self.assertEqual(find_dataset_file(self.upload_folder, stored['sha256']), stored['path'])
+
+    def test_identical_content_is_deduplicated(self):
+        first = self._store(b"a,b\n1,2\n", 'first.csv')
+        second = self._store(b"a,b\n1,2\n", 'second.csv')
+
+        self.assertTrue(second['deduplicated'])
+        self.assertEqual(first['path'], second['path'])
+        self.assertEqual(len(list_datasets(self.upload_folder)), 1)
+        # No temporary files are left behind
+        self.assertEqual(sorted(os.listdir(self.upload_folder)), [first['sha256']])
+
+    def test_same_name_different_content_is_kept_apart(self):
+        first = self._store(b"a,b\n1,2\n")
+        second = self._store(b"a,b\n3,4\n")
+        self.assertNotEqual(first['path'], second['path'])
+        self.assertTrue(os.path.exists(first['path']))
+
+    def test_artifact_paths(self):
+        stored = self._store(b"a,b\n1,2\n")
+        self.assertEqual(get_artifact_path(stored['path'], 'profile.json'),
+                         os.path.join(os.path.dirname(stored['path']), 'profile.json'))
+        self.assertEqual(get_artifact_path('/data/default.csv', 'profile.json'), '/data/default.csv.profile.json')
+
+    def test_quota_evicts_least_recently_used(self):
+        old = self._store(b"x" * 100)
+        recent = self._store(b"y" * 100)
+        newest = self._store(b"z" * 100)
+
+        # Make the first dataset the oldest, then use it again so the second one is evicted
+        for offset, stored in [(30, old), (20, recent), (10, newest)]:
+            past = time.time() - offset
+            os.utime(os.path.dirname(stored['path']), (past, past))
+        touch_dataset(old['path'])
+
+        # Room for two of the three datasets
+        sizes = [dataset['size'] for dataset in list_datasets(self.upload_folder)]
+        evicted = enforce_quota(self.upload_folder, max_bytes=sum(sizes) - min(sizes), keep=newest['sha256'])
+
+        self.assertEqual(evicted, [recent['path']])
+        self.assertTrue(os.path.exists(old['path']))
+        self.assertTrue(os.path.exists(newest['path']))
+
+if __name__ == '__main__':
+    unittest.main()
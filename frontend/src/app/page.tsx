@@ -46,6 +46,8 @@ const API_BASE_URL = "http://localhost:5001/api"; // Backend runs on port 5001
 
 export default function Home() {
   const [file, setFile] = useState<File | null>(null);
+  // ID of the uploaded dataset, sent with every request so concurrent users do not share one dataset
+  const [datasetId, setDatasetId] = useState<string | null>(null);
   // Update state types to use the generic VegaSpec
   const [visualizations, setVisualizations] = useState<EChartsConfig[]>([]);
   const [promptedVisualizations, setPromptedVisualizations] = useState<EChartsConfig[]>([]);
@@ -367,9 +369,11 @@ export default function Home() {
       if (!uploadResponse.ok || uploadData.error) {
         throw new Error(uploadData.error || `File upload failed with status: ${uploadResponse.status}`);
       }
+      setDatasetId(uploadData.dataset_id);
+      sessionStorage.setItem('dataset_id', uploadData.dataset_id);
 
       // Fetch initial visualizations with selected models
-      const vizResponse = await fetch(`${API_BASE_URL}/visualizations?analyst_model=${selectedAnalystModel}&coder_model=${selectedCoderModel}&manager_model=${selectedManagerModel}`, {
+      const vizResponse = await fetch(`${API_BASE_URL}/visualizations?analyst_model=${selectedAnalystModel}&coder_model=${selectedCoderModel}&manager_model=${selectedManagerModel}&dataset_id=${uploadData.dataset_id}`, {
         headers
       });
       const vizData = await vizResponse.json();
@@ -465,6 +469,7 @@ export default function Home() {
         headers,
         body: JSON.stringify({
           prompt: promptText,
+          dataset_id: datasetId || undefined, // Omitted before an upload: the backend uses its default dataset
           analyst_model_id: selectedAnalystModel, // Pass analyst model
           coder_model_id: selectedCoderModel,    // Pass coder model
           manager_model_id: selectedManagerModel  // Pass manager model
@@ -587,7 +592,7 @@ export default function Home() {
       const response = await fetch(`${API_BASE_URL}/execute_code`, {
         method: 'POST',
         headers: getRequestHeaders('application/json'),
-        body: JSON.stringify({ code })
+        body: JSON.stringify({ code, dataset_id: datasetId || undefined })
       });
 
       const data = await response.json();
@@ -674,6 +679,7 @@ export default function Home() {
             <DataExplorationPageDebug
               apiKey={apiKey}
               useOllama={useOllama}
+              datasetId={datasetId}
               onBack={() => setShowDataExploration(false)}
             />
           </div>
@@ -750,8 +756,8 @@ export default function Home() {
             <CardContent className="space-y-4">
               {/* File Input */}
               <div className="grid w-full items-center gap-1.5">
-                <Label htmlFor="csv-file">CSV File (Optional if using default)</Label>
-                <Input id="csv-file" type="file" accept=".csv" onChange={handleFileChange} />
+                <Label htmlFor="csv-file">Dataset File: CSV, Parquet or Feather (Optional if using default)</Label>
+                <Input id="csv-file" type="file" accept=".csv,.parquet,.feather,.arrow" onChange={handleFileChange} />
               </div>
 
               {/* Model Selectors */}
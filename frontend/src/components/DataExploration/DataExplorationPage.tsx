@@ -33,7 +33,8 @@ const DataExplorationPage: React.FC<DataExplorationProps> = ({ onBack }) => {
       const useOllama = localStorage.getItem('useOllama') === 'true';
       console.log(`DataExplorationPage: Using Ollama: ${useOllama}`);
 
-      const url = `${API_BASE_URL}/data_exploration?limit=${limit}`;
+      const datasetId = sessionStorage.getItem('dataset_id');
+      const url = `${API_BASE_URL}/data_exploration?limit=${limit}${datasetId ? `&dataset_id=${datasetId}` : ''}`;
       console.log(`DataExplorationPage: Fetching from URL: ${url}`);
 
       const headers = {
@@ -43,11 +44,24 @@ const DataExplorationPage: React.FC<DataExplorationProps> = ({ onBack }) => {
       };
       console.log("DataExplorationPage: Request headers:", headers);
 
-      const response = await fetch(url, {
+      let response = await fetch(url, {
         method: 'GET',
         headers,
       });
 
+      // 202 means the dataset is still being profiled in the background; poll until ready
+      for (let attempt = 0; response.status === 202 && attempt < 120; attempt++) {
+        console.log("DataExplorationPage: Dataset profiling in progress, retrying");
+        await new Promise((resolve) => setTimeout(resolve, 1000));
+        response = await fetch(url, {
+          method: 'GET',
+          headers,
+        });
+      }
+      if (response.status === 202) {
+        throw new Error("Dataset profiling is taking longer than expected. Please try again later.");
+      }
+
       console.log(`DataExplorationPage: Response status: ${response.status}`);
 
       if (!response.ok) {
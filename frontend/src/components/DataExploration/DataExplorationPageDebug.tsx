@@ -15,9 +15,10 @@ interface DataExplorationProps {
   onBack?: () => void;
   apiKey: string | null; // Add apiKey prop
   useOllama: boolean; // Add useOllama prop
+  datasetId?: string | null; // Uploaded dataset to explore; the backend default is used when missing
 }
 
-const DataExplorationPageDebug: React.FC<DataExplorationProps> = ({ onBack, apiKey, useOllama }) => {
+const DataExplorationPageDebug: React.FC<DataExplorationProps> = ({ onBack, apiKey, useOllama, datasetId }) => {
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
   const [data, setData] = useState<any>(null);
@@ -36,7 +37,7 @@ const DataExplorationPageDebug: React.FC<DataExplorationProps> = ({ onBack, apiK
       console.log(`DataExplorationPage: Using Ollama: ${useOllama}`);
       console.log(`DataExplorationPage: API Key: ${apiKey ? 'Present' : 'Missing'}`);
 
-      const url = `${API_BASE_URL}/data_exploration?limit=${limit}`;
+      const url = `${API_BASE_URL}/data_exploration?limit=${limit}${datasetId ? `&dataset_id=${datasetId}` : ''}`;
       console.log(`DataExplorationPage: Fetching from URL: ${url}`);
 
       const headers = {
@@ -46,11 +47,24 @@ const DataExplorationPageDebug: React.FC<DataExplorationProps> = ({ onBack, apiK
       };
       console.log("DataExplorationPage: Request headers:", headers);
 
-      const response = await fetch(url, {
+      let response = await fetch(url, {
         method: 'GET',
         headers,
       });
 
+      // 202 means the dataset is still being profiled in the background; poll until ready
+      for (let attempt = 0; response.status === 202 && attempt < 120; attempt++) {
+        console.log("DataExplorationPage: Dataset profiling in progress, retrying");
+        await new Promise((resolve) => setTimeout(resolve, 1000));
+        response = await fetch(url, {
+          method: 'GET',
+          headers,
+        });
+      }
+      if (response.status === 202) {
+        throw new Error("Dataset profiling is taking longer than expected. Please try again later.");
+      }
+
       console.log(`DataExplorationPage: Response status: ${response.status}`);
 
       if (!response.ok) {